@@ -39,6 +39,9 @@ def create_app(config_class=Config):
     app.register_blueprint(admin_bp)
     app.register_blueprint(analytics_bp)
     app.register_blueprint(public_bp)
+
+    from app.cli import register_commands
+    register_commands(app)
     
     # Legacy Routes - Disabled for Refactoring
     # from app.routes import bp as main_bp
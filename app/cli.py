@@ -0,0 +1,17 @@
+"""Maintenance commands, run as flask <command>."""
+import click
+from flask.cli import with_appcontext
+
+from app.models import db, EventSummary, rebuild_event_summaries
+
+@click.command('rebuild-event-summaries')
+@with_appcontext
+def rebuild_event_summaries_command():
+    """Recompute the event_summaries rollup (after bulk imports or raw SQL edits)."""
+    before = EventSummary.query.count()
+    rebuild_event_summaries(db.session.connection())
+    db.session.commit()
+    click.echo(f"{EventSummary.query.count()} summary rows (was {before})")
+
+def register_commands(app):
+    app.cli.add_command(rebuild_event_summaries_command)
@@ -1,6 +1,9 @@
 
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
+from sqlalchemy import event, select, func, extract, case, distinct, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
 from datetime import datetime
 
 # Initialize SQLAlchemy
@@ -78,7 +81,7 @@ class StudentActivity(db.Model):
     urls_json = db.Column(db.Text, nullable=True)
     ids_json = db.Column(db.Text, nullable=True)
     
-    status = db.Column(db.String(50), default='pending', index=True) # pending, auto_verified, faculty_verified, rejected
+    status = db.Column(db.String(50), default='pending', index=True) # verifying, pending, auto_verified, faculty_verified, rejected
     auto_decision = db.Column(db.String(255), nullable=True)
     
     # New: Public Verification Token
@@ -95,10 +98,13 @@ class StudentActivity(db.Model):
     faculty_comment = db.Column(db.Text, nullable=True)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     prev_activity_id = db.Column(db.Integer, db.ForeignKey('student_activities.id'), nullable=True)
     
+    # Analytics: unique event identity, maintained on insert/update (see event_identity)
+    event_identity = db.Column(db.String(512), nullable=True, index=True)
+    
     # Relationships
     student = db.relationship('User', foreign_keys=[student_id], backref=db.backref('activities', lazy=True, cascade="all, delete-orphan"))
     activity_type = db.relationship('ActivityType', backref=db.backref('student_activities', lazy=True))
@@ -107,3 +113,284 @@ class StudentActivity(db.Model):
 
     def __repr__(self):
         return f'<StudentActivity {self.id} - {self.title}>'
+
+def event_identity(activity_type_id, custom_category, title, start_date):
+    """
+    Unique Event Identity - STRICT RULE
+    - IF Activity Type is Defined: 'TYPE-' + ID + '-' + Date
+    - ELSE (Custom): 'CUSTOM-' + Category + '-' + lower(trim(Title)) + '-' + Date
+    Date is start_date as YYYY-MM-DD, or 'nodate'.
+    """
+    date_part = str(start_date) if start_date else 'nodate'
+    if activity_type_id is not None:
+        return f"TYPE-{activity_type_id}-{date_part}"
+    category = 'other' if custom_category is None else custom_category
+    return f"CUSTOM-{category}-{(title or '').strip(' ').lower()}-{date_part}"
+
+@event.listens_for(StudentActivity, 'before_insert')
+@event.listens_for(StudentActivity, 'before_update')
+def _set_event_identity(mapper, connection, target):
+    target.event_identity = event_identity(target.activity_type_id, target.custom_category,
+                                           target.title, target.start_date)
+
+class VerificationJob(db.Model):
+    __tablename__ = 'verification_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    activity_id = db.Column(db.Integer, db.ForeignKey('student_activities.id', ondelete='CASCADE'), nullable=False, index=True)
+    file_path = db.Column(db.String(512), nullable=False)
+
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True) # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text, nullable=True)
+
+    # Worker that currently holds the job (hostname:pid)
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    activity = db.relationship('StudentActivity', backref=db.backref('verification_jobs', lazy=True, cascade="all, delete-orphan"))
+
+    def __repr__(self):
+        return f'<VerificationJob {self.id} - activity {self.activity_id} ({self.status})>'
+
+class ExtractionCache(db.Model):
+    __tablename__ = 'extraction_cache'
+    __table_args__ = (
+        db.UniqueConstraint('file_hash', 'extractor_version', name='uq_extraction_cache_hash_version'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    file_hash = db.Column(db.String(64), nullable=False, index=True)
+    extractor_version = db.Column(db.String(20), nullable=False)
+
+    # JSON: cert_text, qr_values, urls, ids, candidate_names
+    payload = db.Column(db.Text, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ExtractionCache {self.file_hash[:12]} v{self.extractor_version}>'
+
+class AnalyticsVersion(db.Model):
+    """
+    Data versions shared by all processes: 'total', 'epoch' and
+    'department:<name>', bumped after each commit that changes analytics
+    inputs (see analytics_cache).
+    """
+    __tablename__ = 'analytics_versions'
+
+    scope = db.Column(db.String(120), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<AnalyticsVersion {self.scope}={self.version}>'
+
+class EventSummary(db.Model):
+    """
+    Rollup of student_activities per event identity x department x batch x
+    year. Every flush that touches an activity (or a student's department
+    or batch) applies its changes as deltas (see _apply_summary_deltas);
+    rebuild_event_summaries recomputes the whole table.
+    """
+    __tablename__ = 'event_summaries'
+    __table_args__ = (
+        db.UniqueConstraint('event_identity', 'department', 'batch_year', 'year', name='uq_event_summaries_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_identity = db.Column(db.String(512), nullable=False, index=True)
+    # '' / 0 for a missing department, batch or year, so that the key stays unique
+    department = db.Column(db.String(100), nullable=False, default='')
+    batch_year = db.Column(db.String(20), nullable=False, default='')
+    year = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+    # Descriptive columns (constant within an event, apart from the case and spacing of custom titles)
+    activity_type_id = db.Column(db.Integer, nullable=True)
+    custom_category = db.Column(db.String(100), nullable=True)
+    title = db.Column(db.String(200), nullable=True)
+    event_date = db.Column(db.Date, nullable=True)
+
+    participations = db.Column(db.Integer, nullable=False, default=0)
+    unique_students = db.Column(db.Integer, nullable=False, default=0)
+    # Students whose first year of this event is this row's year (nodate events span years)
+    new_students = db.Column(db.Integer, nullable=False, default=0)
+    verified_count = db.Column(db.Integer, nullable=False, default=0)
+    pending_count = db.Column(db.Integer, nullable=False, default=0)
+    rejected_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<EventSummary {self.event_identity} {self.department}/{self.batch_year}/{self.year}>'
+
+# Changes to these attributes move an activity between (or within) summary rows
+SUMMARY_ACTIVITY_FIELDS = ('status', 'title', 'activity_type_id', 'custom_category', 'start_date',
+                           'created_at', 'student_id')
+SUMMARY_STUDENT_FIELDS = ('department', 'batch_year')
+
+SUMMARY_KEY = ('event_identity', 'department', 'batch_year', 'year')
+SUMMARY_DESCRIPTIVE = ('activity_type_id', 'custom_category', 'title', 'event_date')
+SUMMARY_COUNTS = ('participations', 'unique_students', 'new_students', 'verified_count', 'pending_count',
+                  'rejected_count')
+
+_UPSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+def upsert(connection, table):
+    """INSERT for the connection's dialect, supporting on_conflict_do_update (Postgres, SQLite)."""
+    return _UPSERTS[connection.dialect.name](table)
+
+def _summary_expressions():
+    """Event date, row key and status count expressions shared by the rebuild and the deltas."""
+    activities, users = StudentActivity.__table__, User.__table__
+    # Same as AnalyticsService._get_event_date_expr
+    event_date = func.coalesce(activities.c.start_date, func.date(activities.c.created_at))
+    key = (activities.c.event_identity, func.coalesce(users.c.department, ''),
+           func.coalesce(users.c.batch_year, ''), func.coalesce(extract('year', event_date), 0))
+    status = activities.c.status
+    counts = (func.sum(case((status.in_(('faculty_verified', 'auto_verified')), 1), else_=0)),
+              func.sum(case((status == 'pending', 1), else_=0)),
+              func.sum(case((status == 'rejected', 1), else_=0)))
+    descriptive = (func.max(activities.c.activity_type_id), func.max(activities.c.custom_category),
+                   func.max(activities.c.title), func.max(event_date))
+    return activities, users, key, descriptive, counts
+
+def rebuild_event_summaries(connection):
+    """
+    Recompute the whole event_summaries table from student_activities
+    (flask rebuild-event-summaries: after bulk imports or raw SQL edits).
+    """
+    activities, users, key, descriptive, counts = _summary_expressions()
+    year = key[3]
+    first_years = select(activities.c.event_identity, activities.c.student_id, func.min(year).label('year')) \
+        .group_by(activities.c.event_identity, activities.c.student_id).subquery()
+    rollup = select(
+        *key, *descriptive,
+        func.count(activities.c.id), func.count(distinct(activities.c.student_id)),
+        func.count(distinct(case((year == first_years.c.year, activities.c.student_id)))),
+        *counts
+    ).select_from(activities.join(users, activities.c.student_id == users.c.id).join(
+        first_years, (first_years.c.event_identity == activities.c.event_identity)
+        & (first_years.c.student_id == activities.c.student_id))) \
+     .where(activities.c.event_identity.isnot(None)) \
+     .group_by(*key)
+
+    summaries = EventSummary.__table__
+    connection.execute(summaries.delete())
+    connection.execute(summaries.insert().from_select([*SUMMARY_KEY, *SUMMARY_DESCRIPTIVE, *SUMMARY_COUNTS], rollup))
+
+def _summary_contributions(connection, pairs):
+    """
+    {row key: {column: value}} that the activities of the given
+    (event identity, student id) pairs add to event_summaries.
+    """
+    pairs = {pair for pair in pairs if None not in pair}
+    if not pairs:
+        return {}
+    activities, users, key, descriptive, counts = _summary_expressions()
+    rows = connection.execute(
+        select(activities.c.student_id, *key, *descriptive, func.count(activities.c.id), *counts)
+        .select_from(activities.join(users, activities.c.student_id == users.c.id))
+        .where(activities.c.event_identity.in_({identity for identity, _ in pairs}),
+               activities.c.student_id.in_({student_id for _, student_id in pairs}))
+        .group_by(activities.c.student_id, *key)
+    ).all()
+
+    by_pair = {}
+    for row in rows:
+        if (row[1], row[0]) in pairs:
+            by_pair.setdefault((row[1], row[0]), []).append(row[1:])
+    contributions = {}
+    for student_rows in by_pair.values():
+        first_year = min(int(r[3]) for r in student_rows)
+        for r in student_rows:
+            row_key = (r[0], r[1], r[2], int(r[3]))
+            entry = contributions.get(row_key)
+            if entry is None:
+                entry = contributions[row_key] = dict(zip(SUMMARY_DESCRIPTIVE, r[4:8]), **dict.fromkeys(SUMMARY_COUNTS, 0))
+            else:
+                for name, value in zip(SUMMARY_DESCRIPTIVE, r[4:8]):
+                    if value is not None and (entry[name] is None or value > entry[name]):
+                        entry[name] = value
+            entry['participations'] += r[8]
+            entry['unique_students'] += 1
+            entry['new_students'] += int(row_key[3] == first_year)
+            entry['verified_count'] += r[9] or 0
+            entry['pending_count'] += r[10] or 0
+            entry['rejected_count'] += r[11] or 0
+    return contributions
+
+def _apply_summary_deltas(connection, before, after):
+    """
+    Add after - before to event_summaries with one upsert per changed row,
+    so concurrent writers only meet on the rows they both change; rows
+    left without participations are removed.
+    """
+    summaries = EventSummary.__table__
+    emptied = set()
+    for row_key in before.keys() | after.keys():
+        old, new = before.get(row_key), after.get(row_key)
+        delta = {name: (new[name] if new else 0) - (old[name] if old else 0) for name in SUMMARY_COUNTS}
+        if not any(delta.values()):
+            continue
+        values = dict(zip(SUMMARY_KEY, row_key), **{name: (new or old)[name] for name in SUMMARY_DESCRIPTIVE}, **delta)
+        stmt = upsert(connection, summaries).values(values)
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=list(SUMMARY_KEY),
+            set_={name: summaries.c[name] + stmt.excluded[name] for name in SUMMARY_COUNTS}))
+        if delta['participations'] < 0:
+            emptied.add(row_key[0])
+    if emptied:
+        connection.execute(summaries.delete().where(summaries.c.event_identity.in_(emptied),
+                                                    summaries.c.participations <= 0))
+
+def _changed(obj, fields):
+    attrs = inspect(obj).attrs
+    return any(attrs[name].history.has_changes() for name in fields)
+
+def _previous(obj, name):
+    history = inspect(obj).attrs[name].history
+    return history.deleted[0] if history.deleted else getattr(obj, name)
+
+@event.listens_for(Session, 'before_flush')
+def _collect_summary_changes(session, flush_context, instances):
+    # (event identity, student) pairs the flush can change, and what they contribute before it
+    connection = session.connection()
+    pairs = set()
+    for obj in session.new:
+        if isinstance(obj, StudentActivity):
+            student_id = obj.student_id if obj.student_id is not None else getattr(obj.student, 'id', None)
+            pairs.add((event_identity(obj.activity_type_id, obj.custom_category, obj.title, obj.start_date), student_id))
+    for obj in session.deleted:
+        if isinstance(obj, StudentActivity):
+            pairs.add((obj.event_identity, _previous(obj, 'student_id')))
+        elif isinstance(obj, ActivityType):
+            # The flush nulls activity_type_id on its activities, which become custom events
+            activities = StudentActivity.__table__
+            for row in connection.execute(select(
+                    activities.c.event_identity, activities.c.student_id, activities.c.custom_category,
+                    activities.c.title, activities.c.start_date).where(activities.c.activity_type_id == obj.id)):
+                pairs.add((row.event_identity, row.student_id))
+                pairs.add((event_identity(None, row.custom_category, row.title, row.start_date), row.student_id))
+    for obj in session.dirty:
+        if isinstance(obj, StudentActivity) and _changed(obj, SUMMARY_ACTIVITY_FIELDS):
+            # event_identity still holds the old identity; _set_event_identity updates it during the flush
+            pairs.add((obj.event_identity, _previous(obj, 'student_id')))
+            pairs.add((event_identity(obj.activity_type_id, obj.custom_category, obj.title, obj.start_date),
+                       obj.student_id))
+        elif isinstance(obj, User) and _changed(obj, SUMMARY_STUDENT_FIELDS):
+            activities = StudentActivity.__table__
+            pairs.update((identity, obj.id) for identity in connection.execute(
+                select(activities.c.event_identity).distinct().where(activities.c.student_id == obj.id)).scalars())
+    pairs = {pair for pair in pairs if None not in pair}
+    # A flush that wrote nothing never reached after_flush; its pairs are replaced
+    session.info['event_summary_changes'] = (pairs, _summary_contributions(connection, pairs))
+
+@event.listens_for(Session, 'after_flush')
+def _apply_summary_changes(session, flush_context):
+    pairs, before = session.info.pop('event_summary_changes', (set(), {}))
+    # Activities of students created in this flush had no student id before it
+    pairs.update((obj.event_identity, obj.student_id) for obj in session.new if isinstance(obj, StudentActivity))
+    if pairs:
+        connection = session.connection()
+        _apply_summary_deltas(connection, before, _summary_contributions(connection, pairs))
@@ -1,6 +1,10 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, abort
+import os
+import time
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, jsonify
 from flask_login import login_required, current_user
 from app.models import User, db, ActivityType, StudentActivity
+from app.services.verification.host_health import get_host_health, read_snapshots, CLOSED
+from app.services.verification import metrics
 from werkzeug.security import generate_password_hash
 from functools import wraps
 
@@ -227,3 +231,24 @@ def delete_activity_type(at_id):
     db.session.commit()
     flash('Activity Type deleted.')
     return redirect(url_for('admin.activity_types'))
+
+# --- Verification Health ---
+@admin_bp.route('/admin/verification/hosts')
+@role_required('admin')
+def verification_hosts():
+    """Issuer host circuit breaker state of this process and of published queue workers."""
+    pid = os.getpid()
+    processes = [{"pid": pid, "updated_at": time.time(), "hosts": get_host_health().snapshot()}]
+    processes += [s for s in read_snapshots() if s.get("pid") != pid]
+    unhealthy = sorted({host for p in processes for host, state in p["hosts"].items()
+                        if state["state"] != CLOSED or state.get("dns_retry_in")})
+    return jsonify({"unhealthy_hosts": unhealthy, "processes": processes})
+
+@admin_bp.route('/admin/verification/timings')
+@role_required('admin')
+def verification_timings():
+    """p50/p95/p99 wall time per pipeline stage, URL fetch and whole verification, across processes."""
+    pid = os.getpid()
+    published = [s for s in metrics.read_published() if s.get("pid") != pid]
+    raw_sets = [metrics.get_metrics().to_dict()] + [s["histograms"] for s in published]
+    return jsonify({"processes": 1 + len(published), "stages": metrics.summarize(raw_sets)})
@@ -1,12 +1,21 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, make_response, jsonify, send_file
+from flask import Blueprint, render_template, redirect, url_for, flash, request, abort, make_response, jsonify, send_file, current_app
 from flask_login import login_required, current_user
 from app.services.analytics_service import AnalyticsService
+from app.services import analytics_memo, analytics_cache
 from functools import wraps
 from datetime import datetime
 from app.models import db, User
 
 analytics_bp = Blueprint('analytics', __name__)
 
+@analytics_bp.after_request
+def log_memo_stats(response):
+    stats = analytics_memo.request_stats()
+    if stats:
+        current_app.logger.debug(f"Analytics memo for {request.path}: {stats['computed']} computed, "
+                                 f"{stats['saved']} recomputations saved")
+    return response
+
 # --- Helper ---
 def get_filters():
     return {
@@ -125,6 +134,11 @@ def get_comparison():
         return jsonify({"status": "disabled", "reason": "Select Academic Year"})
     return jsonify(data)
 
+@analytics_bp.route('/analytics/api/cache-stats')
+@role_required('admin')
+def get_cache_stats():
+    return jsonify(analytics_cache.get_analytics_cache().stats())
+
 @analytics_bp.route('/analytics/test-students/<int:id>')
 def test_students(id):
     return jsonify(AnalyticsService.get_test_student_list(id))
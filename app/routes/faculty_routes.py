@@ -92,6 +92,9 @@ def reject_request(act_id):
     activity.faculty_id = current_user.id
     activity.faculty_comment = comment
     
+    if activity.certificate_hash:
+        hashstore.store_rejected_hash(activity.certificate_hash)
+
     db.session.commit()
     flash(f"Activity #{act_id} Rejected.")
     return redirect(url_for('faculty.dashboard'))
@@ -1,14 +1,12 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, make_response, send_from_directory, abort
 from flask_login import login_required, current_user
 from app.models import ActivityType, StudentActivity, db, User
-from app.services.verification.verification_service import VerificationService
 from app.verification import extract, hashstore
+from app.verification import queue as verification_queue
 from werkzeug.utils import secure_filename
 from xhtml2pdf import pisa
 import os
 import io
-import json
-import secrets
 from datetime import datetime
 import uuid
 import uuid
@@ -22,11 +20,8 @@ ALLOWED_MIME_TYPES = {'application/pdf', 'image/png', 'image/jpeg', 'image/jpg'}
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def validate_mime_type(file_stream):
-    # Read first 2048 bytes for signature checking
-    header = file_stream.read(2048)
-    file_stream.seek(0) # Reset stream pointer
-    
+def validate_mime_header(header):
+    # Signature check on the first 2048 bytes
     kind = filetype.guess(header)
     if kind is None:
         return False
@@ -84,10 +79,6 @@ def dashboard():
             
         # Secure Upload Logic
         if file and allowed_file(file.filename):
-            if not validate_mime_type(file.stream):
-               flash('Invalid file type detected. Please upload a valid PDF or Image.')
-               return redirect(request.url)
-
             original_filename = secure_filename(file.filename)
             unique_filename = f"{uuid.uuid4().hex}_{original_filename}"
             
@@ -95,48 +86,12 @@ def dashboard():
             os.makedirs(upload_folder, exist_ok=True)
             
             filepath = os.path.join(upload_folder, unique_filename)
-            file.save(filepath)
-            
-            # --- Verification Logic (Refactored) ---
-            # 1. New Auto-Verifier Service
-            verifier = VerificationService()
-            verification = verifier.verify(filepath)
-            print("AUTO VERIFICATION RESULT:", verification)
-            
-            # 2. Defaults
-            status = 'pending'
-            auto_decision = verification['auto_decision']
-            decision = auto_decision 
-            
-            # 3. Hash Checks
-            file_hash = hashstore.calculate_file_hash(filepath)
-            approved_record = hashstore.lookup_hash(file_hash)
-            
-            if approved_record:
-                status = 'auto_verified'
-                decision = "Verified by previously stored hash (tamper-proof)."
-                auto_decision = decision
-            elif verification['strong_auto']:
-                status = 'auto_verified'
-                # auto_decision already set from module
-            
-            print("Final status for this activity:", status)
-            
-            # --- Routing Logic (Assigned Reviewer) ---
-            assigned_reviewer_id = None
-            if status == 'pending':
-                # 1. Specific Activity In-Charge
-                if selected_activity and selected_activity.faculty_incharge_id:
-                    assigned_reviewer_id = selected_activity.faculty_incharge_id
-                else:
-                    # 2. Routing to HOD (Generic/Other)
-                    hod = User.query.filter_by(
-                        department=current_user.department, 
-                        role='faculty',
-                        position='hod'
-                    ).first()
-                    if hod:
-                        assigned_reviewer_id = hod.id
+
+            # Signature check, save and SHA-256 in a single pass over the upload stream
+            file_hash = hashstore.save_and_hash(file.stream, filepath, header_check=validate_mime_header)
+            if file_hash is None:
+               flash('Invalid file type detected. Please upload a valid PDF or Image.')
+               return redirect(request.url)
 
             # --- Create StudentActivity Record ---
             start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else None
@@ -146,6 +101,7 @@ def dashboard():
             prev_activity = StudentActivity.query.filter_by(student_id=current_user.id).order_by(StudentActivity.created_at.desc()).first()
             prev_id = prev_activity.id if prev_activity else None
 
+            # Verification runs in the background worker; the record starts as 'verifying'
             new_activity = StudentActivity(
                 student_id=current_user.id,
                 activity_type_id=selected_activity.id if selected_activity else None,
@@ -156,25 +112,23 @@ def dashboard():
                 end_date=end_date,
                 certificate_file=unique_filename,
                 certificate_hash=file_hash,
-                urls_json=json.dumps(verification['urls']),
-                ids_json=json.dumps(verification['ids']),
-                status=status,
-                auto_decision=auto_decision,
-                prev_activity_id=prev_id,
-                assigned_reviewer_id=assigned_reviewer_id,
-                verification_token=secrets.token_urlsafe(16) if status == 'auto_verified' else None,
-                verification_mode=verification.get('verification_mode', 'text_only'),
-                auto_details=verification.get('auto_details')
+                status='verifying',
+                prev_activity_id=prev_id
             )
             db.session.add(new_activity)
+            job = verification_queue.enqueue(new_activity, filepath)
             db.session.commit()
-            
-            msg_status = "Verified!" if status == "auto_verified" else "Queued for Faculty."
-            flash(f"Activity '{title}' Recorded. {msg_status}")
-
-            return redirect(url_for('student.dashboard'))
 
-            msg_status = "Verified!" if status == "auto_verified" else "Queued for Faculty."
+            if not current_app.config.get('VERIFICATION_ASYNC', True):
+                # Inline mode (development): run the job in this request
+                verification_queue.run_inline(job)
+                status = new_activity.status
+                if status == "verifying":
+                    msg_status = "Verification in progress."  # a worker claimed the job first
+                else:
+                    msg_status = "Verified!" if status == "auto_verified" else "Queued for Faculty."
+            else:
+                msg_status = "Verification in progress."
             flash(f"Activity '{title}' Recorded. {msg_status}")
 
             return redirect(url_for('student.dashboard'))
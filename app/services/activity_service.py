@@ -1,4 +1,5 @@
-from app.models import db, StudentActivity
+from app.models import db, StudentActivity, User
+from app.verification import hashstore
 import secrets
 import json
 
@@ -8,3 +9,53 @@ class ActivityService:
         # Logic to create StudentActivity record
          # ... (Implementation to be migrated from routes)
          pass # Placeholder for now, will implement fully when migrating routes
+
+    @staticmethod
+    def find_reviewer_id(activity_type, department):
+        """
+        Routing for pending activities:
+          1. Specific Activity In-Charge
+          2. HOD of the student's department (Generic/Other)
+        """
+        if activity_type and activity_type.faculty_incharge_id:
+            return activity_type.faculty_incharge_id
+
+        hod = User.query.filter_by(
+            department=department,
+            role='faculty',
+            position='hod'
+        ).first()
+        return hod.id if hod else None
+
+    @staticmethod
+    def apply_verification(activity, verification):
+        """
+        Write the result of VerificationService.verify back onto an activity:
+        status, auto_decision, verification_mode, auto_details and routing.
+        """
+        # Stored-hash matches are decided inside the pipeline (hash_lookup stage)
+        status = 'auto_verified' if verification['strong_auto'] else 'pending'
+
+        activity.status = status
+        activity.auto_decision = verification['auto_decision']
+        activity.verification_mode = verification.get('verification_mode', 'text_only')
+        activity.auto_details = verification.get('auto_details')
+        activity.urls_json = json.dumps(verification['urls'])
+        activity.ids_json = json.dumps(verification['ids'])
+
+        if status == 'auto_verified':
+            if not activity.verification_token:
+                activity.verification_token = secrets.token_urlsafe(16)
+            if activity.certificate_hash:
+                hashstore.store_approved_hash(
+                    file_hash=activity.certificate_hash,
+                    roll_no=activity.student.institution_id,
+                    filename=activity.certificate_file,
+                    request_id=activity.id,
+                    faculty_comment=None
+                )
+        else:
+            activity.assigned_reviewer_id = ActivityService.find_reviewer_id(
+                activity.activity_type, activity.student.department
+            )
+        return status
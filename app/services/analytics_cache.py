@@ -0,0 +1,245 @@
+"""
+Process-wide cache of analytics results, invalidated by writes.
+
+Dashboard endpoints recompute every aggregate on each refresh although the
+data changes only a few times a minute. Results of the memoized
+AnalyticsService aggregates (see analytics_memo) are kept here under
+(method, canonical filters, role scope, data version).
+
+The data version comes from counters bumped by SQLAlchemy hooks on
+StudentActivity, User and ActivityType (on flush and again on commit):
+one per department plus a total, and an epoch for activity type changes,
+which can affect every scope. A department-filtered result only goes stale
+when that department's data changes. Stale entries are never read again
+and age out of the LRU.
+
+These counters see this process's writes as soon as they are flushed.
+After each commit the same counters are also bumped in the shared
+analytics_versions table, which every process reads once per request (or
+per call outside one) and adds to the key, so writes by other processes
+(verification workers) invalidate results once committed. If that bump
+fails, entries still expire after ANALYTICS_CACHE_TTL_SECONDS.
+"""
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional
+
+from flask import g, has_request_context
+from flask_login import current_user
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+
+from app.models import db, User, StudentActivity, ActivityType, AnalyticsVersion, SUMMARY_ACTIVITY_FIELDS, upsert
+from app.services.verification.settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+# User attributes the aggregates read (student counts, department and batch filters)
+USER_FIELDS = ('department', 'batch_year', 'is_active', 'role')
+
+class DataVersions:
+    def __init__(self):
+        self.epoch = 0
+        self.total = 0
+        self.departments: Dict[Optional[str], int] = {}
+        self.bumps = 0
+        self._lock = threading.Lock()
+
+    def bump(self, departments: Iterable[Optional[str]] = (), everything: bool = False):
+        with self._lock:
+            if everything:
+                self.epoch += 1
+            self.total += 1
+            for department in set(departments):
+                self.departments[department] = self.departments.get(department, 0) + 1
+            self.bumps += 1
+
+    def current(self, department: Optional[str] = None):
+        """Version of the data behind a result, filtered to department if given."""
+        with self._lock:
+            if department:
+                return self.epoch, self.departments.get(department, 0)
+            return self.epoch, self.total
+
+class ResultCache:
+    def __init__(self):
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.versions = DataVersions()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key: tuple, department: Optional[str], compute: Callable):
+        key = key + (self.versions.current(department),)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] < get_setting('ANALYTICS_CACHE_TTL_SECONDS', 60):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return copy.deepcopy(entry[1])
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+
+        result = compute()
+        max_entries = get_setting('ANALYTICS_CACHE_MAX_ENTRIES', 512)
+        with self._lock:
+            self._entries[key] = (now, copy.deepcopy(result))
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.versions.bumps
+            }
+
+_cache = ResultCache()
+
+def get_analytics_cache() -> ResultCache:
+    return _cache
+
+def reset_analytics_cache():
+    """Drop all results and versions (tests, DB switches)."""
+    global _cache
+    _cache = ResultCache()
+
+def role_scope() -> str:
+    """
+    What AnalyticsService._apply_role_scope restricts the query to, so users
+    with the same scope (all admins, HODs of one department with the same
+    in-charge activities) share results. Also keys the per-request memo
+    scopes (analytics_memo).
+    """
+    if not has_request_context():
+        return "system"
+    scope = g.get('analytics_cache_scope')
+    if scope is not None:
+        return scope
+    if not current_user or not current_user.is_authenticated:
+        scope = "none"
+    elif current_user.role == 'admin':
+        scope = "admin"
+    elif current_user.role == 'faculty':
+        department = None
+        if current_user.position and current_user.position.lower() == 'hod':
+            department = current_user.department
+        managed = sorted(t.id for t in ActivityType.query.filter_by(faculty_incharge_id=current_user.id))
+        scope = f"faculty:{department or ''}:{','.join(map(str, managed))}" if department or managed else "none"
+    elif current_user.role == 'student':
+        scope = f"student:{current_user.id}"
+    else:
+        scope = "none"
+    g.analytics_cache_scope = scope
+    return scope
+
+def shared_versions() -> Dict[str, int]:
+    """analytics_versions as {scope: version}; read once per request."""
+    if has_request_context() and 'analytics_versions' in g:
+        return g.analytics_versions
+    versions = dict(db.session.query(AnalyticsVersion.scope, AnalyticsVersion.version).all())
+    if has_request_context():
+        g.analytics_versions = versions
+    return versions
+
+def shared_version(department: Optional[str] = None):
+    """Shared counterpart of DataVersions.current."""
+    versions = shared_versions()
+    return versions.get('epoch', 0), versions.get(f"department:{department}" if department else 'total', 0)
+
+def cached(method: str, canonical: str, department: Optional[str], compute: Callable):
+    """compute() through the result cache, unless ANALYTICS_CACHE_ENABLED is off."""
+    if not get_setting('ANALYTICS_CACHE_ENABLED', True):
+        return compute()
+    return _cache.get_or_compute((method, canonical, role_scope(), shared_version(department)), department, compute)
+
+# --- Write-driven invalidation ---
+
+def _invalidate(target, departments=(), everything=False):
+    # Now, for reads later in the same transaction; again on commit, since a
+    # concurrent read may have cached the pre-commit data under the new version
+    _cache.versions.bump(departments, everything)
+    session = object_session(target)
+    if session is not None:
+        pending = session.info.setdefault('analytics_invalidations', [set(), False])
+        pending[0].update(departments)
+        pending[1] = pending[1] or everything
+
+def _changed(target, fields):
+    attrs = inspect(target).attrs
+    return any(attrs[name].history.has_changes() for name in fields)
+
+def _activity_written(mapper, connection, target):
+    # The student's department, and the previous student's if it was reassigned
+    students = {target.student_id, *inspect(target).attrs.student_id.history.deleted}
+    departments = connection.execute(select(User.department).where(User.id.in_(students))).scalars().all()
+    _invalidate(target, departments or [None])
+
+def _activity_updated(mapper, connection, target):
+    if _changed(target, SUMMARY_ACTIVITY_FIELDS):
+        _activity_written(mapper, connection, target)
+
+def _user_written(mapper, connection, target):
+    history = inspect(target).attrs.department.history
+    _invalidate(target, [*history.added, *history.deleted, *history.unchanged])
+
+def _user_updated(mapper, connection, target):
+    if _changed(target, USER_FIELDS):
+        _user_written(mapper, connection, target)
+
+def _activity_type_written(mapper, connection, target):
+    _invalidate(target, everything=True)
+
+for _model, _written, _updated in ((StudentActivity, _activity_written, _activity_updated),
+                                   (User, _user_written, _user_updated),
+                                   (ActivityType, _activity_type_written, _activity_type_written)):
+    event.listen(_model, 'after_insert', _written)
+    event.listen(_model, 'after_update', _updated)
+    event.listen(_model, 'after_delete', _written)
+
+def _bump_shared(engine, departments, everything):
+    versions = AnalyticsVersion.__table__
+    scopes = {'total', *(f"department:{department or ''}" for department in departments)}
+    if everything:
+        scopes.add('epoch')
+    try:
+        # Own short transaction: the committed one cannot run SQL any more
+        with engine.begin() as connection:
+            # Sorted, so concurrent bumps lock the rows in the same order
+            for scope in sorted(scopes):
+                stmt = upsert(connection, versions).values(scope=scope, version=1)
+                connection.execute(stmt.on_conflict_do_update(
+                    index_elements=['scope'], set_={'version': versions.c.version + 1}))
+    except Exception as e:
+        logger.warning(f"Analytics versions not bumped (other processes rely on the TTL): {e}")
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    pending = session.info.pop('analytics_invalidations', None)
+    if pending is not None:
+        _cache.versions.bump(pending[0], pending[1])
+        _bump_shared(session.get_bind(), pending[0], pending[1])
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_invalidations(session, previous_transaction):
+    session.info.pop('analytics_invalidations', None)
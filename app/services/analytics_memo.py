@@ -0,0 +1,127 @@
+"""
+Memoization of analytics aggregates for one request or export job.
+
+A dashboard request or an export calls the same aggregates several times:
+get_admin_insights reuses the department, event, distribution and KPI
+queries, and the snapshot export calls the KPIs again for the sheet and the
+year comparison. Inside a memo scope each aggregate is computed once per
+(method, canonical filters, analytics_cache.role_scope()) and later calls
+get a copy of the stored result.
+
+A scope lives on flask.g for the duration of a request, or is opened with
+memo_scope() by an export job running outside one. Nested memo_scope()
+calls share the enclosing scope. Every memoized call also goes through
+the process-wide result cache (analytics_cache), which spans requests.
+"""
+import copy
+import json
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+from flask import g, has_request_context
+
+from app.services import analytics_cache
+
+logger = logging.getLogger(__name__)
+
+# Filters whose values arrive as ints from the routes but as strings from other callers
+_INT_FILTERS = ('year', 'batch', 'activity_type_id')
+
+class MemoScope:
+    def __init__(self):
+        self._results: Dict = {}
+        self.computed = 0
+        self.saved = 0
+
+    def get_or_compute(self, key, compute: Callable):
+        if key in self._results:
+            self.saved += 1
+        else:
+            self._results[key] = compute()
+            self.computed += 1
+        # Callers may mutate what they get back; the stored result must not change
+        return copy.deepcopy(self._results[key])
+
+    def stats(self) -> Dict:
+        return {"computed": self.computed, "saved": self.saved}
+
+_scope: ContextVar = ContextVar('analytics_memo_scope', default=None)
+
+def current_scope() -> Optional[MemoScope]:
+    """The open memo scope: an explicit memo_scope(), else the current request's."""
+    scope = _scope.get()
+    if scope is None and has_request_context():
+        scope = g.get('analytics_memo')
+        if scope is None:
+            scope = g.analytics_memo = MemoScope()
+    return scope
+
+def request_stats() -> Optional[Dict]:
+    """Stats of the current request's scope, None if it computed no aggregates."""
+    scope = g.get('analytics_memo') if has_request_context() else None
+    return scope.stats() if scope is not None else None
+
+@contextmanager
+def memo_scope():
+    """Share aggregate results for the duration of the block (an export job)."""
+    scope = current_scope()
+    if scope is not None:
+        yield scope
+        return
+    scope = MemoScope()
+    token = _scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _scope.reset(token)
+        logger.debug(f"Analytics memo: {scope.computed} computed, {scope.saved} recomputations saved")
+
+def canonical_filters(filters: Optional[Dict]) -> str:
+    """
+    Filters as _apply_filters sees them: empty values dropped (they do not
+    filter), event_type_id folded into activity_type_id, numbers as ints.
+    """
+    filters = dict(filters or {})
+    type_id = filters.pop('activity_type_id', None) or filters.pop('event_type_id', None)
+    filters.pop('event_type_id', None)
+    filters['activity_type_id'] = type_id
+    canonical = {}
+    for name, value in filters.items():
+        if value is None or value == '' or value is False:
+            continue
+        if name in _INT_FILTERS:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                pass
+        canonical[name] = value
+    return json.dumps(canonical, sort_keys=True, default=str)
+
+def memoized(fn: Callable) -> Callable:
+    """
+    Memoize an aggregate taking only filters within the open memo scope,
+    and across requests in the analytics result cache.
+    """
+    @wraps(fn)
+    def wrapper(filters=None, *args, **kwargs):
+        if args or kwargs:
+            return fn(filters, *args, **kwargs)
+        canonical = canonical_filters(filters)
+        department = (filters or {}).get('department') or None
+        compute = lambda: analytics_cache.cached(fn.__name__, canonical, department, lambda: fn(filters))
+        scope = current_scope()
+        if scope is None:
+            return compute()
+        return scope.get_or_compute((fn.__name__, canonical, analytics_cache.role_scope()), compute)
+    return wrapper
+
+def scoped(fn: Callable) -> Callable:
+    """Run fn (an export job) inside a memo scope."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with memo_scope():
+            return fn(*args, **kwargs)
+    return wrapper
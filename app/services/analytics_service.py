@@ -1,7 +1,9 @@
-from app.models import db, User, StudentActivity, ActivityType
+from app.models import db, User, StudentActivity, ActivityType, EventSummary
 from sqlalchemy import func, case, or_, and_, distinct, extract, Integer, tuple_, literal
+from sqlalchemy.orm import aliased
 from flask_login import current_user
 from flask import url_for
+from app.services.analytics_memo import memoized, scoped
 from datetime import datetime
 import pandas as pd
 import io
@@ -318,8 +320,9 @@ class AnalyticsService:
         """
         Helper: Coalesce start_date or created_at (cast to date)
         MANDATORY: Use this everywhere for date logic.
+        date() rather than CAST(... AS DATE), which SQLite turns into the bare year.
         """
-        return func.coalesce(StudentActivity.start_date, func.cast(StudentActivity.created_at, db.Date))
+        return func.coalesce(StudentActivity.start_date, func.date(StudentActivity.created_at))
 
     @staticmethod
     def _get_event_identity_expr():
@@ -327,17 +330,10 @@ class AnalyticsService:
         Helper: Unique Event Identity - STRICT RULE
         - IF Activity Type is Defined (ID Not None): 'TYPE-' + ID + '-' + Date
         - ELSE (Custom): 'CUSTOM-' + Clean Title + '-' + Date
+        Stored and indexed on student_activities (models.event_identity), so
+        grouping and drilldown use the column instead of rebuilding it per row.
         """
-        # Logic: Case when ActivityTypeID is NOT NULL -> Use TYPE-ID-Date
-        # Logic: Case when ActivityTypeID IS NULL -> Use CUSTOM-Title-Date
-        
-        event_date = str(func.coalesce(StudentActivity.start_date, literal('nodate')))
-        
-        return case(
-            (StudentActivity.activity_type_id.isnot(None),
-             func.concat('TYPE-', StudentActivity.activity_type_id, '-', func.coalesce(func.cast(StudentActivity.start_date, db.String), 'nodate'))),
-            else_=func.concat('CUSTOM-', func.coalesce(StudentActivity.custom_category, 'other'), '-', func.lower(func.trim(StudentActivity.title)), '-', func.coalesce(func.cast(StudentActivity.start_date, db.String), 'nodate'))
-        )
+        return StudentActivity.event_identity
 
     @staticmethod
     def _apply_filters(query, filters):
@@ -415,6 +411,7 @@ class AnalyticsService:
         return []
 
     @staticmethod
+    @memoized
     def get_institution_kpis(filters=None):
         """
         [FIXED] KPIs with Strict Identity & Zero State
@@ -424,25 +421,27 @@ class AnalyticsService:
         # 1. Total Students (Active) - Sourced from User table directly for normalization
         # Note: 'Total Students' in KPI usually means relevant students context. 
         # But per request, let's keep it scoped to Active students in DB matching Dept/Batch filters.
-        total_students_q = db.session.query(func.count(User.id)).filter(User.role == 'student', User.is_active == True)
+        # Aliased so the subquery does not correlate with the User joined in base_q
+        students = aliased(User)
+        total_students_q = db.session.query(func.count(students.id)).filter(students.role == 'student', students.is_active == True)
         if filters:
             if filters.get('department'):
-                total_students_q = total_students_q.filter(User.department == filters['department'])
+                total_students_q = total_students_q.filter(students.department == filters['department'])
             if filters.get('batch'):
-                total_students_q = total_students_q.filter(User.batch_year == str(filters['batch']))
-        total_students = total_students_q.scalar() or 0
+                total_students_q = total_students_q.filter(students.batch_year == str(filters['batch']))
+
+        # 2-4 + 7. One scan of the filtered join with conditional aggregates,
+        # plus the student total as a scalar subquery: a single round trip.
+        is_verified = StudentActivity.status.in_(('faculty_verified', 'auto_verified'))
+        row = base_q.with_entities(
+            func.count(distinct(AnalyticsService._get_event_identity_expr())),  # Total Events - Strict Identity
+            func.count(StudentActivity.id),                                     # Total Participations
+            func.count(distinct(StudentActivity.student_id)),                   # Unique Students
+            func.sum(case((is_verified, 1), else_=0)),                          # Verified Count
+            total_students_q.scalar_subquery()
+        ).one()
+        total_events, total_participations, unique_students, verified_count, total_students = (v or 0 for v in row)
 
-        # 2. Total Events - Strict Identity
-        total_events = base_q.with_entities(
-            func.count(distinct(AnalyticsService._get_event_identity_expr()))
-        ).scalar() or 0
-        
-        # 3. Total Participations
-        total_participations = base_q.with_entities(func.count(StudentActivity.id)).scalar() or 0
-        
-        # 4. Unique Students
-        unique_students = base_q.with_entities(func.count(distinct(StudentActivity.student_id))).scalar() or 0
-        
         # 5. Engagement Rate
         engagement_rate = round((unique_students / total_students * 100), 1) if total_students > 0 else 0
         
@@ -450,15 +449,8 @@ class AnalyticsService:
         avg_activities_per_student = round((total_participations / unique_students), 2) if unique_students > 0 else 0
         
         # 7. Verified Rate
-        verified_count = base_q.filter(or_(
-            StudentActivity.status == 'faculty_verified',
-            StudentActivity.status == 'auto_verified'
-        )).with_entities(func.count(StudentActivity.id)).scalar() or 0
-        
         verified_rate = round((verified_count / total_participations * 100), 1) if total_participations > 0 else 0
 
-        print(f"DEBUG KPI: Events={total_events}, Part={total_participations}, Unique={unique_students}")
-
         return {
             "total_students": total_students,
             "total_events": total_events,
@@ -470,6 +462,7 @@ class AnalyticsService:
         }
 
     @staticmethod
+    @memoized
     def get_event_distribution(filters=None):
         """
         [FIXED] Group by Category with Strict Identity
@@ -496,6 +489,7 @@ class AnalyticsService:
         } for r in results]
 
     @staticmethod
+    @memoized
     def get_department_participation(filters=None):
         """
         [FIXED] Dept Participation
@@ -540,6 +534,7 @@ class AnalyticsService:
         return sorted(data, key=lambda x: x['engagement_percent'], reverse=True)
 
     @staticmethod
+    @memoized
     def get_yearly_trend(filters=None):
         """
         [FIXED] Yearly Trend with Null Handling (Year 0)
@@ -566,6 +561,7 @@ class AnalyticsService:
         } for r in results]
 
     @staticmethod
+    @memoized
     def get_verification_summary(filters=None):
         """
         [FIXED] Verification Logic
@@ -689,11 +685,16 @@ class AnalyticsService:
         }
 
     @staticmethod
+    @memoized
     def _get_event_summary_list(filters=None):
         """
         Helper for Sheet 2: Event Summary
         Groups strictly by Identity.
+        Served from the event_summaries rollup when the filters allow it.
         """
+        if AnalyticsService._can_use_event_summaries(filters):
+            return AnalyticsService._get_event_summary_rollup(filters)
+
         base_q = AnalyticsService._get_base_query(filters)
         base_q = base_q.outerjoin(ActivityType, StudentActivity.activity_type_id == ActivityType.id)
         
@@ -715,9 +716,68 @@ class AnalyticsService:
             identity_expr
         )
         
-        results = q.all()
-        
-        # Formatting for Excel
+        return AnalyticsService._format_event_summary(q.all())
+
+    # Filters answerable from event_summaries (event x department x batch x year)
+    EVENT_SUMMARY_FILTERS = ('year', 'department', 'batch', 'activity_type_id', 'event_type_id')
+
+    @staticmethod
+    def _can_use_event_summaries(filters=None):
+        """
+        The rollup holds all students' activities, so it serves only unscoped
+        users (admin, CLI) and filters on its grain.
+        """
+        from flask import has_request_context
+        if has_request_context() and not (current_user and current_user.is_authenticated
+                                          and current_user.role == 'admin'):
+            return False
+        return all(name in AnalyticsService.EVENT_SUMMARY_FILTERS
+                   for name, value in (filters or {}).items() if value)
+
+    @staticmethod
+    def _get_event_summary_rollup(filters=None):
+        """
+        _get_event_summary_list from event_summaries: sums its rows per identity.
+        A student has one department and batch, so unique students add up
+        within a year. A nodate event takes each activity's year from
+        created_at, so across years each student is counted in their first
+        year only (new_students).
+        """
+        filters = filters or {}
+        year = None
+        if filters.get('year'):
+            try:
+                year = int(filters['year'])
+            except (TypeError, ValueError): pass
+        students = EventSummary.unique_students if year is not None else EventSummary.new_students
+        q = db.session.query(
+            func.max(func.coalesce(ActivityType.name, EventSummary.custom_category)).label('category'),
+            func.max(case((ActivityType.id.isnot(None), literal('')), else_=func.lower(func.trim(EventSummary.title)))).label('title_key'),
+            func.max(EventSummary.title).label('raw_title'),
+            func.max(EventSummary.event_date).label('date'),
+            func.sum(EventSummary.participations).label('participations'),
+            func.sum(students).label('unique_students'),
+            func.sum(EventSummary.verified_count).label('verified_count'),
+            func.sum(EventSummary.pending_count).label('pending_count')
+        ).outerjoin(ActivityType, EventSummary.activity_type_id == ActivityType.id)
+
+        if year is not None:
+            q = q.filter(EventSummary.year == year)
+        if filters.get('department'):
+            q = q.filter(EventSummary.department == filters['department'])
+        if filters.get('batch'):
+            q = q.filter(EventSummary.batch_year == str(filters['batch']))
+        tid = filters.get('activity_type_id') or filters.get('event_type_id')
+        if tid:
+            try:
+                q = q.filter(EventSummary.activity_type_id == int(tid))
+            except (TypeError, ValueError): pass
+
+        return AnalyticsService._format_event_summary(q.group_by(EventSummary.event_identity).all())
+
+    @staticmethod
+    def _format_event_summary(results):
+        """Formatting for Excel"""
         data = []
         for r in results:
             display_title = r.category if r.title_key == '' else r.raw_title
@@ -771,6 +831,7 @@ class AnalyticsService:
         }
 
     @staticmethod
+    @memoized
     def get_admin_insights(filters=None):
         """
         [NEW] Administrative Insights 
@@ -833,6 +894,7 @@ class AnalyticsService:
         return insights
 
     @staticmethod
+    @scoped
     def generate_naac_excel(filters=None, export_type='full'):
         """
         [FIXED] 4 Clean Sheets using Pandas & Service Reusability
@@ -924,6 +986,7 @@ class AnalyticsService:
     # ============================================================
 
     @staticmethod
+    @memoized
     def get_comparative_stats(filters=None):
         """
         Year-over-Year comparison. Requires 'year' in filters.
@@ -1023,6 +1086,7 @@ class AnalyticsService:
         return output
 
     @staticmethod
+    @scoped
     def generate_snapshot_export(filters=None):
         """
         Lightweight 3-sheet export: KPIs, Insights, Comparison.
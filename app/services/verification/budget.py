@@ -0,0 +1,79 @@
+"""
+Wall-clock budget for verifying one certificate.
+
+Extraction, OCR, QR decoding and one request per link can each take
+seconds; together a pathological file could hold a queue worker for
+minutes. Every verification gets VERIFICATION_BUDGET_SECONDS:
+
+- the pipeline starts no stage once the budget is spent
+- blocking work inside a stage is bounded by what is left: PDF pages and
+  QR passes stop at the deadline, OCR waits at most the remainder, and
+  each link request gets connect/read timeouts capped by it
+- a stage that could not finish raises BudgetExhausted and is recorded
+  as cancelled
+
+A verification cut short is marked partial in auto_details and, unless a
+strong match was already found, left for faculty review.
+"""
+import time
+from typing import Dict, Optional, Tuple
+
+from .settings import get_setting
+
+BUDGET_EXHAUSTED = "time budget exhausted"
+
+class BudgetExhausted(Exception):
+    """Raised when a stage stops early because the verification ran out of time."""
+
+class VerificationBudget:
+    def __init__(self, seconds: float = None, min_slice: float = None):
+        if seconds is None:
+            seconds = get_setting('VERIFICATION_BUDGET_SECONDS', 45)
+        if min_slice is None:
+            min_slice = get_setting('VERIFICATION_BUDGET_MIN_SLICE', 0.5)
+        self.seconds = seconds
+        self.min_slice = min_slice
+        self.started = time.monotonic()
+        # time.monotonic() value, comparable across processes; None = unlimited
+        self.deadline: Optional[float] = self.started + seconds if seconds else None
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        if self.deadline is None:
+            return float('inf')
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def exhausted(self) -> bool:
+        """True once too little is left to start any more work."""
+        return self.remaining() < self.min_slice
+
+    def check(self, what: str = None):
+        if self.exhausted:
+            raise BudgetExhausted(f"{BUDGET_EXHAUSTED} ({what})" if what else BUDGET_EXHAUSTED)
+
+    def timeout(self, limit: float) -> float:
+        """limit capped by the time left; raises BudgetExhausted if too little is left."""
+        self.check()
+        return min(limit, self.remaining())
+
+    def http_timeouts(self) -> Tuple[float, float]:
+        """(connect, read) timeouts for one request, capped by the time left."""
+        self.check()
+        remaining = self.remaining()
+        connect = get_setting('VERIFICATION_CONNECT_TIMEOUT', 3.05)
+        read = get_setting('VERIFICATION_READ_TIMEOUT', 5)
+        return min(connect, remaining), min(read, remaining)
+
+    def as_dict(self) -> Dict:
+        return {
+            "seconds": self.seconds,
+            "elapsed_ms": round(self.elapsed() * 1000, 1),
+            "exhausted": self.deadline is not None and self.exhausted
+        }
+
+def past(deadline: Optional[float]) -> bool:
+    """True if a time.monotonic() deadline (None = none) has passed."""
+    return deadline is not None and time.monotonic() >= deadline
@@ -0,0 +1,98 @@
+"""
+Decoded certificate shared by every stage of one verification.
+
+Without it, an image certificate is read and JPEG-decoded once for QR
+decoding and again for OCR, and a PDF is parsed once for text and again
+for embedded images. DecodedDocument reads the file once and decodes
+lazily, on first use:
+
+    raw            file bytes
+    gray           decoded grayscale pixels (image files); no consumer
+                   needs color, so the BGR buffer is never materialized
+    downscaled(n)  gray with its longest side capped at n, cached per n
+    pdf_reader     one PdfReader over raw (PDF files)
+
+The raw bytes of an image are dropped once its pixels are decoded, and
+release() drops everything, so peak memory is one compressed copy plus
+the grayscale variants.
+"""
+import io
+import os
+import logging
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+from PyPDF2 import PdfReader
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+class DecodedDocument:
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.ext = os.path.splitext(file_path)[1].lower()
+        self._raw: Optional[bytes] = None
+        self._gray: Optional[np.ndarray] = None
+        self._gray_failed = False
+        self._downscaled: Dict[int, np.ndarray] = {}
+        self._pdf_reader: Optional[PdfReader] = None
+
+    @property
+    def is_image(self) -> bool:
+        return self.ext in IMAGE_EXTENSIONS
+
+    @property
+    def is_pdf(self) -> bool:
+        return self.ext == '.pdf'
+
+    @property
+    def raw(self) -> bytes:
+        if self._raw is None:
+            with open(self.file_path, 'rb') as f:
+                self._raw = f.read()
+        return self._raw
+
+    @property
+    def gray(self) -> Optional[np.ndarray]:
+        """Grayscale pixels of an image file, or None if it cannot be decoded."""
+        if self._gray is None and not self._gray_failed:
+            try:
+                self._gray = cv2.imdecode(np.frombuffer(self.raw, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+            except (OSError, cv2.error) as e:
+                logger.warning(f"Cannot decode {self.file_path}: {e}")
+            if self._gray is None:
+                self._gray_failed = True
+            elif self.is_image:
+                self._raw = None  # pixels are all that image consumers need
+        return self._gray
+
+    def downscaled(self, max_side: int) -> Optional[np.ndarray]:
+        """gray with its longest side at most max_side (the same array if already small)."""
+        gray = self.gray
+        if gray is None:
+            return None
+        if max_side not in self._downscaled:
+            height, width = gray.shape
+            scale = max_side / max(height, width)
+            if scale >= 1:
+                self._downscaled[max_side] = gray
+            else:
+                self._downscaled[max_side] = cv2.resize(
+                    gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+        return self._downscaled[max_side]
+
+    @property
+    def pdf_reader(self) -> PdfReader:
+        if self._pdf_reader is None:
+            self._pdf_reader = PdfReader(io.BytesIO(self.raw))
+        return self._pdf_reader
+
+    def release(self):
+        """Drop all buffers; the document can still be re-read afterwards."""
+        self._raw = None
+        self._gray = None
+        self._gray_failed = False
+        self._downscaled.clear()
+        self._pdf_reader = None
@@ -0,0 +1,42 @@
+"""
+Persistent cache of extraction results keyed by certificate SHA-256.
+
+Byte-identical files (re-uploads, the same certificate shared by several
+students, re-verification runs) skip PDF parsing, OCR and QR decoding.
+Entries are stored per EXTRACTOR_VERSION: bump it whenever TextExtractor,
+QRExtractor or URL/ID/name parsing changes, and older entries stop matching.
+"""
+import json
+import logging
+from typing import Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.models import db, ExtractionCache
+
+logger = logging.getLogger(__name__)
+
+EXTRACTOR_VERSION = "6"
+
+def load(file_hash: str) -> Optional[Dict]:
+    """Cached {cert_text, qr_values, urls, ids, candidate_names} or None."""
+    entry = ExtractionCache.query.filter_by(file_hash=file_hash, extractor_version=EXTRACTOR_VERSION).first()
+    if entry is None:
+        return None
+    try:
+        return json.loads(entry.payload)
+    except ValueError:
+        logger.warning(f"Corrupt extraction cache entry for {file_hash}")
+        return None
+
+def store(file_hash: str, payload: Dict):
+    """Save an extraction result; a concurrent insert of the same key is ignored."""
+    db.session.add(ExtractionCache(
+        file_hash=file_hash,
+        extractor_version=EXTRACTOR_VERSION,
+        payload=json.dumps(payload)
+    ))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
@@ -0,0 +1,181 @@
+"""
+TTL + LRU cache of issuer page fetches.
+
+Many certificates from the same event embed the same issuer URL. Entries are
+keyed by a normalized URL and hold the status code plus a compact
+(lowercased, whitespace-collapsed) page text, so repeat link checks are
+answered without network I/O. An optional on-disk tier is shared by all
+worker processes.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from .settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+# Only click/campaign trackers: generic names such as 'ref' often carry the certificate ID
+TRACKING_PARAMS = {
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'utm_id',
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid'
+}
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical cache key for a URL:
+    - trailing punctuation from certificate text stripped, bare www. gets https://
+    - scheme and host lowercased, default ports and fragments dropped
+    - tracking query params (utm_*, fbclid, ...) removed
+    """
+    url = url.strip().rstrip('.,;)')
+    if url.lower().startswith('www.'):
+        url = 'https://' + url
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS
+    ])
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+def compact_text(page_text: str, max_chars: int = None) -> str:
+    """Lowercase and collapse whitespace; optionally cap the length."""
+    text = _WHITESPACE.sub(' ', page_text.lower())
+    if max_chars is not None:
+        text = text[:max_chars]
+    return text
+
+class FetchCache:
+    def __init__(self, max_entries: int = 512, ttl: float = 3600, disk_dir: str = None, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self._clock = clock
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return {"status_code", "text", "complete", "fetched_at"} for a fresh entry, else None."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry['fetched_at'] < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                del self._entries[key]
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is not None:
+                self.disk_hits += 1
+                self._store(key, entry)
+            else:
+                self.misses += 1
+        return entry
+
+    def put(self, key: str, status_code: int, text: str, complete: bool = True):
+        """
+        Store a fetch. complete=False marks text from a download that stopped
+        early (matches found), which may not answer checks for other names/IDs.
+        """
+        entry = {"status_code": status_code, "text": text, "complete": complete, "fetched_at": self._clock()}
+        with self._lock:
+            self._store(key, entry)
+        self._write_disk(key, entry)
+
+    def _store(self, key: str, entry: Dict):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def _read_disk(self, key: str, now: float) -> Optional[Dict]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('url') != key or now - entry.get('fetched_at', 0) >= self.ttl:
+            return None
+        return {
+            "status_code": entry['status_code'],
+            "text": entry['text'],
+            "complete": entry.get('complete', True),
+            "fetched_at": entry['fetched_at']
+        }
+
+    def _write_disk(self, key: str, entry: Dict):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(entry, url=key), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write fetch cache entry: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_fetch_cache() -> FetchCache:
+    """Process-wide fetch cache configured from Config."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FetchCache(
+                    max_entries=get_setting('VERIFICATION_FETCH_CACHE_ENTRIES', 512),
+                    ttl=get_setting('VERIFICATION_FETCH_CACHE_TTL', 3600),
+                    disk_dir=get_setting('VERIFICATION_FETCH_CACHE_DIR')
+                )
+    return _cache
@@ -20,3 +20,13 @@ class HashValidator:
         if not file_hash:
             return None
         return hashstore.lookup_hash(file_hash)
+
+    @staticmethod
+    def find_rejected(file_hash: str):
+        """
+        Check if this exact file was previously rejected by faculty.
+        Returns the rejected record if found, else None.
+        """
+        if not file_hash:
+            return None
+        return hashstore.find_rejected_by_hash(file_hash)
@@ -0,0 +1,175 @@
+"""
+Per-issuer-host health tracking for link checks.
+
+Circuit breaker per host:
+
+    closed     requests go through; consecutive failures are counted
+    open       after VERIFICATION_HOST_FAILURE_THRESHOLD consecutive failures
+               (connection errors, timeouts, 5xx) the host is skipped for
+               VERIFICATION_HOST_COOLDOWN_SECONDS with "host circuit open"
+    half_open  after the cool-down one probe request is let through;
+               success closes the circuit, failure re-opens it, and a probe
+               that ends without either (budget ran out, bad body) is
+               released so the next request probes instead
+
+Hosts whose name did not resolve are skipped for
+VERIFICATION_DNS_NEGATIVE_TTL seconds without another lookup.
+
+State is per process. Queue workers publish a JSON snapshot to
+VERIFICATION_HOST_HEALTH_DIR (instance/host_health by default) after every
+job, and the admin endpoint shows those of live processes next to its own
+(see read_snapshots).
+"""
+import time
+import socket
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from .settings import get_setting
+from . import snapshots
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_OPEN_ERROR = "host circuit open"
+DNS_CACHED_ERROR = "DNS lookup failed (cached)"
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class HostUnavailable(Exception):
+    """Raised instead of a request to a host that is being skipped."""
+
+def is_dns_failure(exc: BaseException) -> bool:
+    """True if a requests/urllib3 error was caused by a failed name lookup."""
+    seen = set()
+    pending = [exc]
+    while pending:
+        e = pending.pop()
+        if e is None or id(e) in seen:
+            continue
+        seen.add(id(e))
+        if isinstance(e, socket.gaierror) or type(e).__name__ == 'NameResolutionError':
+            return True
+        pending.extend([e.__cause__, e.__context__, getattr(e, 'reason', None)])
+        pending.extend(a for a in getattr(e, 'args', ()) if isinstance(a, BaseException))
+    return False
+
+class HostHealth:
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 120, dns_ttl: float = 300,
+                 clock=time.time):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.dns_ttl = dns_ttl
+        self._clock = clock
+        self._hosts: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host: str) -> Dict:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = {
+                "state": CLOSED, "consecutive_failures": 0, "opened_at": None,
+                "probe_in_flight": False, "dns_failed_until": None, "last_error": None,
+                "successes": 0, "failures": 0, "skipped": 0
+            }
+        return state
+
+    def acquire(self, host: str) -> bool:
+        """
+        Raise HostUnavailable if host must be skipped; otherwise the request
+        may proceed. True if it is the half-open probe, which the caller must
+        release() when done.
+        """
+        now = self._clock()
+        with self._lock:
+            h = self._host(host)
+            if h["dns_failed_until"] and now < h["dns_failed_until"]:
+                h["skipped"] += 1
+                raise HostUnavailable(DNS_CACHED_ERROR)
+            if h["state"] == OPEN and now - h["opened_at"] >= self.cooldown:
+                h["state"] = HALF_OPEN
+                h["probe_in_flight"] = False
+            if h["state"] == OPEN or (h["state"] == HALF_OPEN and h["probe_in_flight"]):
+                h["skipped"] += 1
+                raise HostUnavailable(CIRCUIT_OPEN_ERROR)
+            if h["state"] == HALF_OPEN:
+                h["probe_in_flight"] = True
+                return True
+            return False
+
+    def release(self, host: str):
+        """End a probe; neutral unless record_success/record_failure already decided."""
+        with self._lock:
+            h = self._host(host)
+            if h["state"] == HALF_OPEN:
+                h["probe_in_flight"] = False
+
+    def record_success(self, host: str):
+        with self._lock:
+            h = self._host(host)
+            if h["state"] != CLOSED:
+                logger.info(f"Circuit closed for {host}")
+            h.update(state=CLOSED, consecutive_failures=0, opened_at=None, probe_in_flight=False,
+                     dns_failed_until=None)
+            h["successes"] += 1
+
+    def record_failure(self, host: str, error: str, dns: bool = False):
+        now = self._clock()
+        with self._lock:
+            h = self._host(host)
+            h["failures"] += 1
+            h["consecutive_failures"] += 1
+            h["last_error"] = error
+            h["probe_in_flight"] = False
+            if dns:
+                h["dns_failed_until"] = now + self.dns_ttl
+            if h["state"] == HALF_OPEN or h["consecutive_failures"] >= self.failure_threshold:
+                if h["state"] != OPEN:
+                    logger.warning(f"Circuit opened for {host} after {h['consecutive_failures']} failures: {error}")
+                h["state"] = OPEN
+                h["opened_at"] = now
+
+    def snapshot(self) -> Dict[str, Dict]:
+        now = self._clock()
+        with self._lock:
+            out = {}
+            for host, h in self._hosts.items():
+                entry = {k: v for k, v in h.items() if k != "probe_in_flight"}
+                if h["state"] == OPEN:
+                    entry["retry_in"] = round(max(0.0, h["opened_at"] + self.cooldown - now), 1)
+                if h["dns_failed_until"]:
+                    entry["dns_retry_in"] = round(max(0.0, h["dns_failed_until"] - now), 1)
+                out[host] = entry
+            return out
+
+    def clear(self):
+        with self._lock:
+            self._hosts.clear()
+
+    def publish(self, directory: Optional[str] = None):
+        """Write this process's snapshot to directory/hosts-<pid>.json (atomic replace)."""
+        directory = directory or get_setting('VERIFICATION_HOST_HEALTH_DIR')
+        if directory:
+            snapshots.publish(directory, "hosts", {"updated_at": self._clock(), "hosts": self.snapshot()})
+
+def read_snapshots(directory: Optional[str] = None) -> List[Dict]:
+    """Published snapshots of live processes; files of exited processes are removed."""
+    return snapshots.read(directory or get_setting('VERIFICATION_HOST_HEALTH_DIR'), "hosts")
+
+_health = None
+_health_lock = threading.Lock()
+
+def get_host_health() -> HostHealth:
+    """Process-wide host health configured from Config."""
+    global _health
+    if _health is None:
+        with _health_lock:
+            if _health is None:
+                _health = HostHealth(
+                    failure_threshold=get_setting('VERIFICATION_HOST_FAILURE_THRESHOLD', 3),
+                    cooldown=get_setting('VERIFICATION_HOST_COOLDOWN_SECONDS', 120),
+                    dns_ttl=get_setting('VERIFICATION_DNS_NEGATIVE_TTL', 300)
+                )
+    return _health
@@ -0,0 +1,67 @@
+"""
+Process-wide pooled HTTP session shared by every link checker.
+
+One requests.Session per process keeps TCP/TLS connections alive per issuer
+host, so consecutive certificates from NPTEL, Coursera or the college site
+reuse connections instead of handshaking for every URL.
+"""
+import os
+import threading
+import logging
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+# User Agent to avoid bot blocking
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+_session = None
+_session_pid = None
+_lock = threading.Lock()
+
+def _build_session(pool_hosts: int, pool_maxsize: int) -> requests.Session:
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    # Certificates are checked independently; never carry issuer cookies across them
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def get_session() -> requests.Session:
+    """
+    Return the pooled session for this process.
+    Rebuilt after fork so worker processes never share sockets with the parent.
+    """
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+
+    with _lock:
+        if _session is None or _session_pid != pid:
+            _session = _build_session(
+                get_setting('VERIFICATION_HTTP_POOL_HOSTS', 32),
+                get_setting('VERIFICATION_HTTP_POOL_MAXSIZE', 8)
+            )
+            _session_pid = pid
+            logger.debug(f"Created pooled HTTP session for pid {pid}")
+        return _session
+
+def reset_session():
+    """Close pooled connections (tests, config changes)."""
+    global _session, _session_pid
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_pid = None
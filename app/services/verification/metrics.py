@@ -0,0 +1,142 @@
+"""
+In-process latency histograms for the verification pipeline.
+
+Every verification records the wall time of each pipeline stage that ran,
+of each URL fetch ("url_fetch"), of the decision ("decision") and of the
+whole run ("total"). Times go into fixed, log-spaced buckets (each about
+19% wider than the last, 0.05 ms to ~10 min), so histograms from different
+processes merge by adding counts and p50/p95/p99 are read off the
+cumulative counts to within one bucket.
+
+Queue workers publish their histograms to VERIFICATION_METRICS_DIR
+(instance/metrics by default) after every job; the admin endpoint merges
+those of live processes with its own.
+"""
+import os
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+
+from .settings import get_setting
+from . import snapshots
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+def _bucket_bounds() -> List[float]:
+    bounds = []
+    bound = 0.05
+    while bound < 600_000:
+        bounds.append(round(bound, 4))
+        bound *= 2 ** 0.25
+    return bounds
+
+# Upper bounds in milliseconds; one overflow bucket follows the last
+BUCKET_BOUNDS_MS = _bucket_bounds()
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float):
+        self.counts[bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def merge(self, raw: Dict):
+        """Add the counts of another histogram's to_dict()."""
+        for i, n in enumerate(raw["counts"]):
+            self.counts[i] += n
+        self.count += raw["count"]
+        self.sum_ms += raw["sum_ms"]
+        self.max_ms = max(self.max_ms, raw["max_ms"])
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th sample (capped at the max seen)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                bound = BUCKET_BOUNDS_MS[i] if i < len(BUCKET_BOUNDS_MS) else self.max_ms
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict:
+        return {"counts": list(self.counts), "count": self.count, "sum_ms": self.sum_ms, "max_ms": self.max_ms}
+
+    def summary(self) -> Dict:
+        out = {"count": self.count, "mean_ms": round(self.sum_ms / self.count, 1) if self.count else 0.0}
+        for q in QUANTILES:
+            out[f"p{round(q * 100)}_ms"] = round(self.quantile(q), 1)
+        out["max_ms"] = round(self.max_ms, 1)
+        return out
+
+class PipelineMetrics:
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, ms: float):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.record(ms)
+
+    def record_verification(self, stage_log: Iterable[Dict], link_checks: Iterable[Dict],
+                            decision_ms: float, total_ms: float):
+        """Record one verification: its timed stages, URL fetches, decision and total."""
+        for entry in stage_log:
+            if "ms" in entry:
+                self.record(entry["stage"], entry["ms"])
+        for check in link_checks:
+            if "ms" in check:
+                self.record("url_fetch", check["ms"])
+        self.record("decision", decision_ms)
+        self.record("total", total_ms)
+
+    def to_dict(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: h.to_dict() for name, h in self._histograms.items()}
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def publish(self, directory: Optional[str] = None):
+        """Write this process's histograms to directory/metrics-<pid>.json."""
+        directory = directory or get_setting('VERIFICATION_METRICS_DIR')
+        if directory:
+            snapshots.publish(directory, "metrics", {"histograms": self.to_dict()})
+
+def summarize(raw_sets: Iterable[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """Merge several to_dict() results and summarize each stage (count, mean, p50/p95/p99, max)."""
+    merged: Dict[str, Histogram] = {}
+    for raw in raw_sets:
+        for name, histogram in raw.items():
+            merged.setdefault(name, Histogram()).merge(histogram)
+    return {name: merged[name].summary() for name in sorted(merged)}
+
+def read_published(directory: Optional[str] = None) -> List[Dict]:
+    """Published histograms of live processes."""
+    return snapshots.read(directory or get_setting('VERIFICATION_METRICS_DIR'), "metrics")
+
+_metrics = None
+_metrics_pid = None
+_metrics_lock = threading.Lock()
+
+def get_metrics() -> PipelineMetrics:
+    """This process's histograms (a forked child starts empty rather than re-counting its parent's)."""
+    global _metrics, _metrics_pid
+    pid = os.getpid()
+    with _metrics_lock:
+        if _metrics is None or _metrics_pid != pid:
+            _metrics = PipelineMetrics()
+            _metrics_pid = pid
+        return _metrics
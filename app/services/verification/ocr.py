@@ -0,0 +1,228 @@
+"""
+OCR for image certificates.
+
+Images are preprocessed (grayscale, downscaled to VERIFICATION_OCR_TARGET_DPI
+assuming the certificate fills the photo, Otsu binarization) and recognized
+in a bounded, process-wide pool of OCR worker processes, so concurrent
+uploads and batch jobs never run more than VERIFICATION_OCR_WORKERS
+recognitions at once. A recognition cannot be interrupted from its own
+process, so when one outlives VERIFICATION_OCR_TIMEOUT the pool is
+terminated (killing the stuck worker) and rebuilt on next use.
+
+Engines, best first (both optional, and not in requirements.txt since they
+need the native Tesseract library):
+- tesserocr: one warm Tesseract API per worker process, End()ed when the
+  worker exits
+- pytesseract: one tesseract subprocess per image
+
+Without either (or without the tesseract binary) OCR is reported as
+unavailable and every call returns "" so that no placeholder text reaches
+URL/ID extraction. Daemonic processes may not start children; those
+recognize in-process.
+"""
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from multiprocessing.util import Finalize
+from typing import List, Optional, Union
+
+import cv2
+import numpy as np
+
+from .settings import get_setting
+
+# Optional OCR engines
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+logger = logging.getLogger(__name__)
+
+# Long edge of an A4 page in inches; photos carry no reliable DPI
+A4_LONG_EDGE_INCHES = 11.69
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+# This process's warm tesserocr API and the finalizer that End()s it
+_api = None
+_api_end = None
+_api_lock = threading.Lock()
+_available = None
+
+def is_available() -> bool:
+    """True if an OCR engine and its Tesseract data can actually be used (checked once)."""
+    global _available
+    if _available is None:
+        _available = False
+        if tesserocr is not None:
+            try:
+                _available = bool(tesserocr.get_languages()[1])
+            except Exception as e:
+                logger.warning(f"tesserocr unusable: {e}")
+        if not _available and pytesseract is not None:
+            try:
+                pytesseract.get_tesseract_version()
+                _available = True
+            except Exception as e:
+                logger.warning(f"tesseract binary unusable: {e}")
+        if not _available:
+            logger.warning("OCR unavailable (install tesseract and pytesseract/tesserocr); image certificates get no text")
+    return _available
+
+def max_side(target_dpi: int = None) -> int:
+    """Longest image side OCR works at: an A4 page at target_dpi."""
+    if target_dpi is None:
+        target_dpi = get_setting('VERIFICATION_OCR_TARGET_DPI', 300)
+    return int(target_dpi * A4_LONG_EDGE_INCHES)
+
+def preprocess(img: np.ndarray, target_dpi: int = None) -> np.ndarray:
+    """Grayscale, downscale so the long edge is A4 at target_dpi (never upscale), binarize."""
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    max_side_px = max_side(target_dpi)
+    height, width = img.shape
+    if max(height, width) > max_side_px:
+        scale = max_side_px / max(height, width)
+        img = cv2.resize(img, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+    _, binary = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return binary
+
+def _get_api(lang: str):
+    """This process's warm tesserocr API (pool workers run one recognition at a time)."""
+    global _api, _api_end
+    if _api is None:
+        _api = tesserocr.PyTessBaseAPI(lang=lang)
+        # Runs at normal process exit, including pool workers (which skip atexit)
+        _api_end = Finalize(_api, _api.End, exitpriority=10)
+    return _api
+
+def _end_api():
+    global _api, _api_end
+    with _api_lock:
+        if _api_end is not None:
+            _api_end()
+        _api = None
+        _api_end = None
+
+def _init_worker(lang: str):
+    """Pool worker start: warm up the engine before the first image arrives."""
+    if tesserocr is not None:
+        _get_api(lang)
+
+def _recognize(img: np.ndarray, timeout: float, lang: str) -> str:
+    if tesserocr is not None:
+        from PIL import Image
+        with _api_lock:
+            api = _get_api(lang)
+            api.SetImage(Image.fromarray(img))
+            return api.GetUTF8Text()
+    return pytesseract.image_to_string(img, lang=lang, timeout=timeout)
+
+def _load(image: Union[str, np.ndarray]) -> Optional[np.ndarray]:
+    if isinstance(image, np.ndarray):
+        return image
+    if not os.path.exists(image):
+        logger.warning(f"OCR image not found: {image}")
+        return None
+    img = cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        logger.warning(f"Failed to load {image} for OCR")
+    return img
+
+def _job(image: Union[str, np.ndarray], timeout: float, lang: str, target_dpi: int) -> str:
+    """Load, preprocess and recognize one image; also the pool entry point."""
+    img = _load(image)
+    if img is None:
+        return ""
+    return _recognize(preprocess(img, target_dpi), timeout, lang)
+
+def _get_pool(workers: int, lang: str):
+    """Lazily created per-process pool (rebuilt after fork, like the HTTP session)."""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            _pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(lang,))
+            _pool_pid = pid
+        return _pool
+
+def _kill_pool(pool):
+    """Terminate pool's workers, stuck recognitions included; the next batch starts a new pool."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+            _pool_pid = None
+    pool.terminate()
+
+def shutdown_pool():
+    """Let the workers finish and exit (ending their engines), and end this process's engine."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        pool = _pool if _pool_pid == os.getpid() else None
+        _pool = None
+        _pool_pid = None
+    if pool is not None:
+        pool.close()
+        pool.join()
+    _end_api()
+
+def _label(image: Union[str, np.ndarray]) -> str:
+    return image if isinstance(image, str) else "image"
+
+def ocr_batch(images: List[Union[str, np.ndarray]], timeout: float = None) -> List[str]:
+    """
+    OCR image paths or arrays concurrently on the shared pool.
+    Results keep input order; a failed or timed-out image yields "".
+    """
+    if not images or not is_available():
+        return [""] * len(images)
+    if timeout is None:
+        timeout = get_setting('VERIFICATION_OCR_TIMEOUT', 30)
+    workers = get_setting('VERIFICATION_OCR_WORKERS', 2)
+    args = (timeout, get_setting('VERIFICATION_OCR_LANG', 'eng'), get_setting('VERIFICATION_OCR_TARGET_DPI', 300))
+
+    if multiprocessing.current_process().daemon:
+        results = []
+        for image in images:
+            try:
+                results.append(_job(image, *args) or "")
+            except Exception as e:
+                logger.error(f"OCR Error for {_label(image)}: {e}")
+                results.append("")
+        return results
+
+    pool = _get_pool(workers, args[1])
+    pending = [pool.apply_async(_job, (image,) + args) for image in images]
+    # Jobs queue behind each other: allow one timeout per round of workers
+    rounds = -(-len(images) // workers)
+    deadline = time.monotonic() + timeout * rounds
+    results = []
+    timed_out = False
+    for image, job in zip(images, pending):
+        try:
+            results.append(job.get(timeout=max(0, deadline - time.monotonic())) or "")
+        except multiprocessing.TimeoutError:
+            timed_out = True
+            logger.warning(f"OCR timed out after {timeout}s: {_label(image)}")
+            results.append("")
+        except Exception as e:
+            logger.error(f"OCR Error for {_label(image)}: {e}")
+            results.append("")
+    if timed_out:
+        _kill_pool(pool)
+    return results
+
+def ocr_image(image: Union[str, np.ndarray], timeout: float = None) -> str:
+    """OCR a single image path or array; "" if OCR is unavailable or fails."""
+    return ocr_batch([image], timeout)[0]
@@ -0,0 +1,161 @@
+"""
+Multi-pattern matching of candidate names and IDs against issuer pages.
+
+A CertificateMatcher is built once per certificate from its candidate names
+and IDs and shared by every link check of that certificate. Each page is
+scanned in a single streaming pass that reports which patterns occurred.
+
+Large pattern sets (transcripts can yield hundreds of ID-like tokens) use an
+Aho-Corasick automaton, whose cost is one step per page character however
+many patterns there are. Small sets use str `in` per pending pattern:
+CPython's substring search is fast enough that a Python-level
+automaton only wins above roughly AUTOMATON_MIN_PATTERNS patterns
+(see benchmarks/bench_pattern_matcher.py).
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+AUTOMATON_MIN_PATTERNS = 600
+
+class MultiPatternMatcher:
+    def __init__(self, patterns: Iterable[str], automaton_min_patterns: int = AUTOMATON_MIN_PATTERNS):
+        self.patterns = tuple(dict.fromkeys(p for p in patterns if p))
+        self.max_length = max((len(p) for p in self.patterns), default=0)
+        self.uses_automaton = len(self.patterns) >= automaton_min_patterns
+        if self.uses_automaton:
+            self._build_automaton()
+
+    def _build_automaton(self):
+        goto: List[Dict[str, int]] = [{}]
+        output: List[Set[str]] = [set()]
+        for pattern in self.patterns:
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    output.append(set())
+                    nxt = len(goto) - 1
+                    goto[state][ch] = nxt
+                state = nxt
+            output[state].add(pattern)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if state else 0
+                output[nxt] |= output[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = [frozenset(o) for o in output]
+
+    def stream(self) -> "MatchStream":
+        """Fresh scan state; feed it page text chunk by chunk."""
+        return MatchStream(self)
+
+    def find_all(self, text: str) -> Set[str]:
+        """Patterns occurring anywhere in text."""
+        s = self.stream()
+        s.feed(text)
+        return s.found
+
+class MatchStream:
+    def __init__(self, matcher: MultiPatternMatcher):
+        self.matcher = matcher
+        self.found: Set[str] = set()
+        self._pending = set(matcher.patterns)
+        self._state = 0
+        self._tail = ""
+
+    def feed(self, text: str) -> Set[str]:
+        """Scan the next chunk; returns patterns newly found in it."""
+        if not self._pending:
+            return set()
+        if self.matcher.uses_automaton:
+            new = self._feed_automaton(text)
+        else:
+            new = self._feed_substring(text)
+        self.found |= new
+        self._pending -= new
+        return new
+
+    def _feed_automaton(self, text: str) -> Set[str]:
+        goto, fail, output = self.matcher._goto, self.matcher._fail, self.matcher._output
+        root = goto[0]
+        state = self._state
+        new = set()
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0) if state else root.get(ch, 0)
+            if output[state]:
+                new |= output[state]
+        self._state = state
+        return new - self.found
+
+    def _feed_substring(self, text: str) -> Set[str]:
+        # Keep the last max_length-1 chars so matches spanning chunks are found
+        window = self._tail + text
+        new = {p for p in self._pending if p in window}
+        overlap = self.matcher.max_length - 1
+        self._tail = window[-overlap:] if overlap > 0 else ""
+        return new
+
+class CertificateMatcher:
+    """
+    Name/ID rules used by link checking:
+    - name_match: every part of ANY candidate name occurs in the page.
+    - id_match: ANY id (6+ chars) occurs in the page.
+    Matching is case-insensitive; feed lowercased page text.
+    """
+    def __init__(self, candidate_names: List[str], ids: List[str]):
+        # Split names into parts to be more flexible
+        self.names = [parts for parts in
+                      ([p.strip().lower() for p in full_name.split() if p.strip()] for full_name in candidate_names)
+                      if parts]
+        self.ids = list(dict.fromkeys(i.lower() for i in ids if len(i) >= 6))
+        self.matcher = MultiPatternMatcher([p for parts in self.names for p in parts] + self.ids)
+
+    def scan(self) -> "CertificateScan":
+        return CertificateScan(self)
+
+    def match(self, page_text: str) -> "CertificateScan":
+        """One-shot scan of a whole (lowercased) page."""
+        s = self.scan()
+        s.feed(page_text)
+        return s
+
+class CertificateScan:
+    def __init__(self, certificate: CertificateMatcher):
+        self.certificate = certificate
+        self.reset()
+
+    def reset(self):
+        self._stream = self.certificate.matcher.stream()
+        self.name_match = False
+        self.id_match = False
+
+    @property
+    def found(self) -> Set[str]:
+        return self._stream.found
+
+    @property
+    def done(self) -> bool:
+        """Nothing left that could change the result."""
+        c = self.certificate
+        return (self.name_match or not c.names) and (self.id_match or not c.ids)
+
+    def feed(self, text: str):
+        if not self._stream.feed(text):
+            return
+        found = self._stream.found
+        c = self.certificate
+        self.name_match = self.name_match or any(all(p in found for p in parts) for parts in c.names)
+        self.id_match = self.id_match or any(i in found for i in c.ids)
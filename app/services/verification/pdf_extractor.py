@@ -0,0 +1,267 @@
+"""
+Page-bounded PDF text extraction.
+
+Names, certificate IDs and verification links sit on the first and last
+pages, so long documents (transcripts, brochures) are read head-first and
+tail-last up to VERIFICATION_PDF_MAX_PAGES instead of page by page to the
+end. When many pages are selected they are split into contiguous chunks and
+extracted in a process pool; each worker opens the file itself since
+PdfReader objects cannot be pickled.
+
+Every extracted page is timed so expensive documents show up in
+auto_details. With a deadline (the verification budget's), no page is
+started after it and BudgetExhausted reports the pages left unread.
+
+Embedded images (QR codes on certificates are image XObjects) are pulled
+straight out of the first pages without rasterizing anything; see
+iter_images.
+"""
+import os
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PyPDF2 import PdfReader
+
+from .settings import get_setting
+from .budget import BudgetExhausted, past
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+def select_pages(page_count: int, max_pages: int, tail_pages: int) -> List[int]:
+    """
+    Page indices to read, in document order.
+    Everything when the document fits, otherwise the first
+    (max_pages - tail_pages) pages plus the last tail_pages.
+    """
+    if max_pages <= 0 or page_count <= max_pages:
+        return list(range(page_count))
+    tail_pages = min(tail_pages, max_pages)
+    head = list(range(max_pages - tail_pages))
+    tail = list(range(page_count - tail_pages, page_count))
+    return head + tail
+
+def _extract_pages(file_path: str, indices: List[int], reader: PdfReader = None,
+                   deadline: float = None) -> List[Tuple[int, str, float]]:
+    """
+    (index, text, milliseconds) for each page read before the
+    time.monotonic() deadline; also the process pool entry point.
+    """
+    if reader is None:
+        reader = PdfReader(file_path)
+    results = []
+    for i in indices:
+        if past(deadline):
+            break
+        started = time.perf_counter()
+        try:
+            text = reader.pages[i].extract_text() or ""
+        except Exception as e:
+            logger.warning(f"Page {i + 1} of {file_path} failed: {e}")
+            text = ""
+        results.append((i, text, (time.perf_counter() - started) * 1000))
+    return results
+
+def _chunk(indices: List[int], parts: int) -> List[List[int]]:
+    size = -(-len(indices) // parts)
+    return [indices[i:i + size] for i in range(0, len(indices), size)]
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """Lazily created per-process pool (rebuilt after fork, like the HTTP session)."""
+    global _pool, _pool_pid
+    pid = os.getpid()
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_pid = pid
+        return _pool
+
+def shutdown_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False)
+        _pool = None
+        _pool_pid = None
+
+def extract_text(file_path: str, page_timings: Optional[List[Dict]] = None,
+                 max_pages: int = None, tail_pages: int = None,
+                 parallel_min_pages: int = None, workers: int = None,
+                 reader: PdfReader = None, deadline: float = None) -> str:
+    """
+    Extract text from the selected pages of a PDF, joined with newlines.
+    Appends {"page", "ms", "chars"} per page read to page_timings if given.
+    reader: an already open PdfReader for file_path (serial extraction only;
+    pool workers always open the file themselves).
+    deadline: time.monotonic() value after which no page is started;
+    BudgetExhausted is raised if pages were left unread.
+    """
+    if max_pages is None:
+        max_pages = get_setting('VERIFICATION_PDF_MAX_PAGES', 8)
+    if tail_pages is None:
+        tail_pages = get_setting('VERIFICATION_PDF_TAIL_PAGES', 2)
+    if parallel_min_pages is None:
+        parallel_min_pages = get_setting('VERIFICATION_PDF_PARALLEL_MIN_PAGES', 8)
+    if workers is None:
+        workers = get_setting('VERIFICATION_PDF_WORKERS', 2)
+
+    if reader is None:
+        reader = PdfReader(file_path)
+    page_count = len(reader.pages)
+    indices = select_pages(page_count, max_pages, tail_pages)
+    if len(indices) < page_count:
+        logger.info(f"Reading {len(indices)} of {page_count} pages from {file_path}")
+
+    results = None
+    # Daemonic processes may not start children; those extract serially
+    can_fork = not multiprocessing.current_process().daemon
+    if can_fork and workers > 1 and len(indices) >= parallel_min_pages:
+        try:
+            pool = _get_pool(workers)
+            futures = [pool.submit(_extract_pages, file_path, chunk, None, deadline)
+                       for chunk in _chunk(indices, workers)]
+            results = []
+            for f in futures:
+                wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+                results.extend(f.result(timeout=wait))
+        except FutureTimeout:
+            for f in futures:
+                f.cancel()
+            raise BudgetExhausted(f"PDF text extraction of {len(indices)} pages")
+        except BrokenProcessPool:
+            logger.warning("PDF process pool broke; extracting serially")
+            shutdown_pool()
+            results = None
+    if results is None:
+        results = _extract_pages(file_path, indices, reader, deadline)
+
+    parts = []
+    for i, text, ms in results:
+        if text:
+            parts.append(text)
+        if page_timings is not None:
+            page_timings.append({"page": i + 1, "ms": round(ms, 1), "chars": len(text)})
+    if len(results) < len(indices):
+        raise BudgetExhausted(f"read {len(results)} of {len(indices)} PDF pages")
+    return "\n".join(parts)
+
+# Image XObjects nested in form XObjects are followed this deep
+MAX_FORM_DEPTH = 2
+# Filters whose decoded data is still an encoded image file
+ENCODED_IMAGE_FILTERS = ('/DCTDecode', '/JPXDecode', '/CCITTFaxDecode')
+
+def _image_xobjects(resources, seen, depth=0):
+    """Yield image XObjects of a resource dictionary, each shared object once."""
+    if resources is None:
+        return
+    xobjects = resources.get_object().get('/XObject')
+    if xobjects is None:
+        return
+    xobjects = xobjects.get_object()
+    for name in xobjects:
+        ref = xobjects.raw_get(name)
+        key = getattr(ref, 'idnum', None)
+        if key is not None:
+            if key in seen:
+                continue
+            seen.add(key)
+        xobj = xobjects[name].get_object()
+        subtype = xobj.get('/Subtype')
+        if subtype == '/Image':
+            yield xobj
+        elif subtype == '/Form' and depth < MAX_FORM_DEPTH:
+            yield from _image_xobjects(xobj.get('/Resources'), seen, depth + 1)
+
+def _channels(color_space) -> Optional[int]:
+    if color_space is None:
+        return 1
+    color_space = color_space.get_object()
+    if isinstance(color_space, list):
+        if color_space[0] == '/ICCBased':
+            return int(color_space[1].get_object().get('/N', 0)) or None
+        return None  # Indexed, Separation, ...
+    return {'/DeviceGray': 1, '/CalGray': 1, '/DeviceRGB': 3, '/CalRGB': 3}.get(color_space)
+
+def _image_array(xobj) -> Optional[np.ndarray]:
+    """Decode an image XObject to a grayscale/BGR array, or None if unsupported."""
+    filters = xobj.get('/Filter')
+    if filters is not None and not isinstance(filters, list):
+        filters = [filters]
+    data = xobj.get_data()
+
+    if filters and filters[-1] in ENCODED_IMAGE_FILTERS:
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+
+    width, height = int(xobj['/Width']), int(xobj['/Height'])
+    if xobj.get('/ImageMask'):
+        bits, channels = 1, 1
+    else:
+        bits = int(xobj.get('/BitsPerComponent', 8))
+        channels = _channels(xobj.get('/ColorSpace'))
+    if channels not in (1, 3):
+        return None
+
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if bits == 8:
+        if raw.size < width * height * channels:
+            return None
+        img = raw[:width * height * channels].reshape(height, width, channels)
+        img = img[:, :, 0] if channels == 1 else img[:, :, ::-1]  # RGB -> BGR
+    elif bits == 1 and channels == 1:
+        row_bytes = (width + 7) // 8
+        if raw.size < row_bytes * height:
+            return None
+        rows = raw[:row_bytes * height].reshape(height, row_bytes)
+        img = np.unpackbits(rows, axis=1)[:, :width] * 255
+    else:
+        return None
+
+    decode = xobj.get('/Decode')
+    if decode is not None and float(decode[0]) == 1:
+        img = 255 - img
+    return np.ascontiguousarray(img)
+
+def iter_images(file_path: str, max_pages: int = None, min_size: int = None, max_images: int = None,
+                reader: PdfReader = None):
+    """
+    Yield (page_number, image array) for embedded images on the first
+    max_pages pages whose shorter side is at least min_size pixels.
+    Sizes come from the XObject dictionary, so small logos and icons are
+    skipped without decoding their streams.
+    """
+    if max_pages is None:
+        max_pages = get_setting('VERIFICATION_PDF_QR_PAGES', 2)
+    if min_size is None:
+        min_size = get_setting('VERIFICATION_PDF_QR_MIN_SIZE', 64)
+    if max_images is None:
+        max_images = get_setting('VERIFICATION_PDF_QR_MAX_IMAGES', 8)
+
+    if reader is None:
+        reader = PdfReader(file_path)
+    seen = set()
+    found = 0
+    for index in range(min(len(reader.pages), max_pages)):
+        for xobj in _image_xobjects(reader.pages[index].get('/Resources'), seen):
+            if min(int(xobj.get('/Width', 0)), int(xobj.get('/Height', 0))) < min_size:
+                continue
+            try:
+                img = _image_array(xobj)
+            except Exception as e:
+                logger.debug(f"Skipping undecodable image on page {index + 1} of {file_path}: {e}")
+                continue
+            if img is None:
+                continue
+            yield index + 1, img
+            found += 1
+            if found >= max_images:
+                return
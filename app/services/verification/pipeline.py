@@ -0,0 +1,122 @@
+"""
+Staged verification pipeline.
+
+A certificate is verified by running an ordered list of stages over a shared
+VerificationContext. Each stage declares its cost class and the conditions
+under which it can be skipped; a stage may also finish the pipeline early
+(e.g. a stored-hash match makes every later stage pointless). Every stage
+outcome, run, skipped or cancelled, is recorded for auto_details, with the
+wall time of stages that ran and the key sizes they report (pages, URLs,
+bytes, ...).
+
+Every run is bounded by the context's VerificationBudget (see budget.py):
+no stage starts once it is spent, and a stage that stops early raises
+BudgetExhausted. Either way the context is marked partial.
+"""
+import time
+import logging
+from typing import Dict, List, Optional
+
+from .document import DecodedDocument
+from .budget import VerificationBudget, BudgetExhausted, BUDGET_EXHAUSTED
+
+logger = logging.getLogger(__name__)
+
+# Cost classes, cheapest first
+COST_DB = "db"
+COST_CPU = "cpu"
+COST_NETWORK = "network"
+
+class VerificationContext:
+    """Mutable state shared by the stages verifying one certificate."""
+    def __init__(self, file_path: str, file_hash: str = None, budget: VerificationBudget = None):
+        self.file_path = file_path
+        self.file_hash = file_hash
+        self.budget = budget if budget is not None else VerificationBudget()
+        # Read and decoded at most once, on first use by a stage
+        self.document = DecodedDocument(file_path)
+
+        self.cert_text = ""
+        self.qr_values_raw: List[str] = []
+        self.clean_qr_values: List[str] = []
+        self.qr_urls: List[str] = []
+        self.text_urls: List[str] = []
+        self.ids: List[str] = []
+        self.candidate_names: List[str] = []
+        self.urls_for_check: List[str] = []
+        self.link_checks: Dict[str, Dict] = {}
+        self.page_timings: List[Dict] = []
+        self.qr_attempts: List[Dict] = []
+
+        self.extraction_cached = False
+        self.hash_match = None
+        self.rejected_match = None
+
+        self.finished = False
+        self.finish_reason: Optional[str] = None
+        # Some stage was cancelled or not started for lack of time
+        self.partial = False
+        self.stage_log: List[Dict] = []
+
+    def finish(self, reason: str):
+        """Stop the pipeline; remaining stages are recorded as skipped."""
+        self.finished = True
+        self.finish_reason = reason
+
+    def ordered_link_checks(self) -> List[Dict]:
+        """Link checks in urls_for_check order (only URLs actually checked)."""
+        return [self.link_checks[u] for u in self.urls_for_check if u in self.link_checks]
+
+    def strong_link(self, urls: List[str]) -> Optional[Dict]:
+        """First reachable check among urls with a name or ID match."""
+        for u in urls:
+            lc = self.link_checks.get(u)
+            if lc and lc["reachable"] and (lc["name_match"] or lc["id_match"]):
+                return lc
+        return None
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+class Stage:
+    name = "stage"
+    cost = COST_CPU
+
+    def skip_reason(self, ctx: VerificationContext) -> Optional[str]:
+        """Return why this stage should not run, or None to run it."""
+        return None
+
+    def run(self, ctx: VerificationContext) -> Optional[Dict]:
+        """Do the work; may return key sizes (counts, bytes) for the stage log."""
+        raise NotImplementedError
+
+class Pipeline:
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+
+    def run(self, ctx: VerificationContext) -> VerificationContext:
+        for stage in self.stages:
+            reason = ctx.finish_reason if ctx.finished else stage.skip_reason(ctx)
+            if not reason and ctx.budget.exhausted:
+                reason = BUDGET_EXHAUSTED
+                ctx.partial = True
+            if reason:
+                logger.debug(f"Skipping {stage.name}: {reason}")
+                ctx.stage_log.append({"stage": stage.name, "cost": stage.cost, "status": "skipped", "reason": reason})
+                continue
+
+            logger.debug(f"Running {stage.name}...")
+            started = time.perf_counter()
+            try:
+                sizes = stage.run(ctx)
+            except BudgetExhausted as e:
+                logger.warning(f"Cancelled {stage.name} for {ctx.file_path}: {e}")
+                ctx.partial = True
+                ctx.stage_log.append({"stage": stage.name, "cost": stage.cost, "status": "cancelled", "reason": str(e),
+                                      "ms": _elapsed_ms(started)})
+                continue
+            entry = {"stage": stage.name, "cost": stage.cost, "status": "ran", "ms": _elapsed_ms(started)}
+            if sizes:
+                entry["sizes"] = sizes
+            ctx.stage_log.append(entry)
+        return ctx
@@ -1,34 +1,92 @@
 import logging
 import os
 import re
-from typing import List
-from app.verification.qr_reader import extract_qr_data as _extract_qr_data
+from typing import Dict, List, Optional
+from app.verification.qr_reader import extract_qr_data as _extract_qr_data, decode_qr_image
+from . import pdf_extractor
+from .document import DecodedDocument
+from .settings import get_setting
+from .budget import BudgetExhausted
 
 logger = logging.getLogger(__name__)
 
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+# PDFs are scanned through their embedded images
+SUPPORTED_EXTENSIONS = IMAGE_EXTENSIONS + ('.pdf',)
+
 class QRExtractor:
     @staticmethod
-    def extract(file_path: str) -> List[str]:
+    def supports(file_path: str) -> bool:
+        return os.path.splitext(file_path)[1].lower() in SUPPORTED_EXTENSIONS
+
+    @staticmethod
+    def extract(file_path: str, attempts: Optional[List[Dict]] = None,
+                document: Optional[DecodedDocument] = None, deadline: float = None) -> List[str]:
         """
         Wrapper around existing QR reader.
+        Per-pass decode timings are appended to attempts if given.
+        document: the verification's shared DecodedDocument, reused instead
+        of decoding the file again.
+        deadline: time.monotonic() value after which decoding stops with
+        BudgetExhausted.
         """
-        ext = os.path.splitext(file_path)[1].lower()
-        
-        # For now, only processing images for QR.
-        if ext not in ['.jpg', '.jpeg', '.png']:
+        if not QRExtractor.supports(file_path):
             return []
-            
+        if file_path.lower().endswith('.pdf'):
+            return QRExtractor.extract_from_pdf(file_path, attempts, document, deadline)
+        if document is not None:
+            return QRExtractor.extract_from_document(document, attempts, deadline)
+
         try:
              # Using the existing module
              # We could migrate the logic here entirely, but wrapping is safer for now.
              # However, the user asked to "Split logic into... QRExtractor".
              # app.verification.qr_reader deals with OpenCV.
-             values = _extract_qr_data(file_path)
+             values = _extract_qr_data(file_path, attempts, deadline)
              return values
+        except BudgetExhausted:
+            raise
         except Exception as e:
             logger.error(f"QR Extraction Error: {e}")
             return []
             
+    @staticmethod
+    def extract_from_document(document: DecodedDocument, attempts: Optional[List[Dict]] = None,
+                              deadline: float = None) -> List[str]:
+        """Decode QR codes from an image document's shared grayscale pixels."""
+        try:
+            if document.gray is None:
+                return []
+            fast_max_side = get_setting('VERIFICATION_QR_FAST_MAX_SIDE', 1000)
+            return decode_qr_image(document.gray, attempts, fast_max_side=fast_max_side,
+                                   small=document.downscaled(fast_max_side), deadline=deadline)
+        except BudgetExhausted:
+            raise
+        except Exception as e:
+            logger.error(f"QR Extraction Error: {e}")
+            return []
+
+    @staticmethod
+    def extract_from_pdf(file_path: str, attempts: Optional[List[Dict]] = None,
+                         document: Optional[DecodedDocument] = None, deadline: float = None) -> List[str]:
+        """
+        Decode QR codes from images embedded in the first pages of a PDF
+        (no page rasterization). Values are deduplicated in page order.
+        """
+        values = []
+        try:
+            reader = document.pdf_reader if document is not None else None
+            for page, img in pdf_extractor.iter_images(file_path, reader=reader):
+                for value in decode_qr_image(img, attempts, deadline=deadline):
+                    if value not in values:
+                        logger.debug(f"QR on page {page}: {value}")
+                        values.append(value)
+        except BudgetExhausted:
+            raise
+        except Exception as e:
+            logger.error(f"PDF QR Extraction Error: {e}")
+        return values
+
     @staticmethod
     def clean_url(raw: str) -> str:
         # Same cleaning logic as TextExtractor to ensure consistency
@@ -0,0 +1,12 @@
+from flask import current_app, has_app_context
+from config import Config
+
+def get_setting(name: str, default=None):
+    """
+    Read a verification setting from the active app config, falling back to
+    the Config class so the pipeline also works outside an app context
+    (worker bootstrap, tests, benchmarks).
+    """
+    if has_app_context():
+        return current_app.config.get(name, getattr(Config, name, default))
+    return getattr(Config, name, default)
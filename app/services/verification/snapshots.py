@@ -0,0 +1,61 @@
+"""
+Per-process JSON snapshots shared through a directory.
+
+Verification runs in several processes (web workers, queue workers), each
+with its own in-memory state. A process publishes its state as
+<prefix>-<pid>.json (atomic replace); readers collect the files of live
+processes and remove those of processes that have exited.
+"""
+import os
+import json
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+def _pid_alive(pid: int) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def publish(directory: str, prefix: str, payload: Dict):
+    """Write payload plus this process's pid to directory/<prefix>-<pid>.json."""
+    pid = os.getpid()
+    path = os.path.join(directory, f"{prefix}-{pid}.json")
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(dict(payload, pid=pid), f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not publish {prefix} snapshot: {e}")
+
+def read(directory: str, prefix: str) -> List[Dict]:
+    """Published snapshots of live processes; files of exited processes are removed."""
+    if not directory or not os.path.isdir(directory):
+        return []
+    snapshots = []
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith(f"{prefix}-") and name.endswith(".json")):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not _pid_alive(snapshot.get("pid", 0)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        snapshots.append(snapshot)
+    return snapshots
@@ -0,0 +1,227 @@
+"""
+Concrete verification stages, in pipeline order:
+
+    hash_lookup -> load_extraction -> extract_text -> extract_qr -> parse
+        -> store_extraction -> check_qr_links -> check_text_links
+
+Short-circuit rules:
+- a stored verified hash finishes the pipeline before any extraction
+  (URLs and IDs are copied from the matched activity)
+- a previously rejected hash finishes it too (left for faculty review)
+- a cached extraction for the same hash skips text/QR extraction and parsing
+- a strong QR link match skips the remaining text URLs
+- once the time budget is spent no stage starts (see budget.py); a
+  cancelled extraction is not stored
+"""
+import os
+import json
+
+from flask import has_app_context
+
+from .pipeline import Stage, VerificationContext, COST_DB, COST_CPU, COST_NETWORK
+from .budget import BudgetExhausted
+from .text_extractor import TextExtractor
+from .qr_extractor import QRExtractor
+from .hash_validator import HashValidator
+from .url_validator import URLValidator
+from . import extraction_cache, text_scanner
+
+def _file_size(file_path: str) -> int:
+    try:
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
+
+def _has_db(ctx):
+    return bool(ctx.file_hash) and has_app_context()
+
+def _merge_urls(ctx: VerificationContext):
+    ctx.clean_qr_values = [QRExtractor.clean_url(v) for v in ctx.qr_values_raw]
+
+    # Filter QR values that are URLs
+    ctx.qr_urls = QRExtractor.filter_urls(ctx.clean_qr_values)
+
+    # Merge and deduplicate URLs for checking (text first, then QR)
+    ctx.urls_for_check = list(dict.fromkeys(ctx.text_urls + ctx.qr_urls))
+
+def _copy_parsed_fields(ctx: VerificationContext, record):
+    """The pipeline ends before parsing; reuse the URLs/IDs stored on the matched activity."""
+    try:
+        ctx.urls_for_check = json.loads(record.urls_json or '[]')
+        ctx.ids = json.loads(record.ids_json or '[]')
+    except ValueError:
+        return
+    ctx.text_urls = list(ctx.urls_for_check)
+
+def _record_link_checks(ctx: VerificationContext, urls, checks):
+    done = {u: c for u, c in zip(urls, checks) if c is not None}
+    ctx.link_checks.update(done)
+    if len(done) < len(urls):
+        raise BudgetExhausted(f"{len(urls) - len(done)} of {len(urls)} links not checked")
+    return {"urls": len(urls), "bytes": sum(c.get("bytes", 0) for c in done.values()),
+            "cached": sum(1 for c in done.values() if c.get("cached"))}
+
+class HashLookupStage(Stage):
+    name = "hash_lookup"
+    cost = COST_DB
+
+    def skip_reason(self, ctx):
+        if not ctx.file_hash:
+            return "no file hash"
+        if not has_app_context():
+            return "no database (app context)"
+        return None
+
+    def run(self, ctx):
+        record = HashValidator.validate(ctx.file_hash)
+        if record:
+            ctx.hash_match = record
+            _copy_parsed_fields(ctx, record)
+            ctx.finish(f"hash matches verified activity #{record.id}")
+            return
+
+        # Known-rejected file: never auto-verify, hand straight to faculty
+        rejected = HashValidator.find_rejected(ctx.file_hash)
+        if rejected:
+            ctx.rejected_match = rejected
+            _copy_parsed_fields(ctx, rejected)
+            ctx.finish(f"hash matches rejected activity #{rejected.id}")
+
+class LoadExtractionStage(Stage):
+    name = "load_extraction"
+    cost = COST_DB
+
+    def skip_reason(self, ctx):
+        if not _has_db(ctx):
+            return "no file hash or database"
+        return None
+
+    def run(self, ctx):
+        cached = extraction_cache.load(ctx.file_hash)
+        if cached is None:
+            return
+        ctx.extraction_cached = True
+        ctx.cert_text = cached["cert_text"]
+        ctx.qr_values_raw = cached["qr_values"]
+        ctx.text_urls = cached["urls"]
+        ctx.ids = cached["ids"]
+        ctx.candidate_names = cached["candidate_names"]
+        _merge_urls(ctx)
+        return {"chars": len(ctx.cert_text), "urls": len(ctx.urls_for_check)}
+
+class ExtractTextStage(Stage):
+    name = "extract_text"
+    cost = COST_CPU
+
+    def skip_reason(self, ctx):
+        if ctx.extraction_cached:
+            return "extraction cache hit"
+        return None
+
+    def run(self, ctx):
+        # Already cleaned line by line by the extractor
+        ctx.cert_text = TextExtractor.extract_from_file(ctx.file_path, page_timings=ctx.page_timings,
+                                                        document=ctx.document, budget=ctx.budget)
+        return {"file_bytes": _file_size(ctx.file_path), "pages": len(ctx.page_timings), "chars": len(ctx.cert_text)}
+
+class ExtractQRStage(Stage):
+    name = "extract_qr"
+    cost = COST_CPU
+
+    def skip_reason(self, ctx):
+        if ctx.extraction_cached:
+            return "extraction cache hit"
+        if not QRExtractor.supports(ctx.file_path):
+            return "file type has no QR support"
+        return None
+
+    def run(self, ctx):
+        # Note: qr_values_raw are already strings from the reader
+        ctx.qr_values_raw = QRExtractor.extract(ctx.file_path, attempts=ctx.qr_attempts, document=ctx.document,
+                                                deadline=ctx.budget.deadline)
+        return {"passes": len(ctx.qr_attempts), "values": len(ctx.qr_values_raw)}
+
+class ParseStage(Stage):
+    name = "parse"
+    cost = COST_CPU
+
+    def skip_reason(self, ctx):
+        if ctx.extraction_cached:
+            return "extraction cache hit"
+        return None
+
+    def run(self, ctx):
+        # URLs, IDs and names in one pass over the text
+        parsed = text_scanner.scan(ctx.cert_text)
+        ctx.text_urls = parsed.urls
+        ctx.ids = parsed.ids
+        ctx.candidate_names = parsed.names
+        _merge_urls(ctx)
+        return {"chars": len(ctx.cert_text), "urls": len(ctx.urls_for_check), "ids": len(ctx.ids),
+                "names": len(ctx.candidate_names)}
+
+class StoreExtractionStage(Stage):
+    name = "store_extraction"
+    cost = COST_DB
+
+    def skip_reason(self, ctx):
+        if ctx.extraction_cached:
+            return "extraction cache hit"
+        if ctx.partial:
+            return "extraction incomplete"
+        if not _has_db(ctx):
+            return "no file hash or database"
+        return None
+
+    def run(self, ctx):
+        extraction_cache.store(ctx.file_hash, {
+            "cert_text": ctx.cert_text,
+            "qr_values": ctx.qr_values_raw,
+            "urls": ctx.text_urls,
+            "ids": ctx.ids,
+            "candidate_names": ctx.candidate_names
+        })
+
+class CheckQRLinksStage(Stage):
+    name = "check_qr_links"
+    cost = COST_NETWORK
+
+    def skip_reason(self, ctx):
+        if not ctx.qr_urls:
+            return "no QR URLs"
+        return None
+
+    def run(self, ctx):
+        checks = URLValidator.check_urls(ctx.qr_urls, ctx.candidate_names, ctx.ids, budget=ctx.budget)
+        return _record_link_checks(ctx, ctx.qr_urls, checks)
+
+class CheckTextLinksStage(Stage):
+    name = "check_text_links"
+    cost = COST_NETWORK
+
+    def remaining_urls(self, ctx: VerificationContext):
+        return [u for u in ctx.urls_for_check if u not in ctx.link_checks]
+
+    def skip_reason(self, ctx):
+        if not self.remaining_urls(ctx):
+            return "no unchecked URLs"
+        if ctx.strong_link(ctx.qr_urls):
+            return "strong QR link match"
+        return None
+
+    def run(self, ctx):
+        urls = self.remaining_urls(ctx)
+        checks = URLValidator.check_urls(urls, ctx.candidate_names, ctx.ids, budget=ctx.budget)
+        return _record_link_checks(ctx, urls, checks)
+
+def default_stages():
+    return [
+        HashLookupStage(),
+        LoadExtractionStage(),
+        ExtractTextStage(),
+        ExtractQRStage(),
+        ParseStage(),
+        StoreExtractionStage(),
+        CheckQRLinksStage(),
+        CheckTextLinksStage(),
+    ]
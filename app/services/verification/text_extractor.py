@@ -1,16 +1,11 @@
 import os
-import re
 import logging
-from typing import List, Dict
-from PyPDF2 import PdfReader
+from typing import List, Dict, Optional
 
-# Optional imports for OCR
-try:
-    from PIL import Image
-    import pytesseract
-except ImportError:
-    Image = None
-    pytesseract = None
+from . import ocr, pdf_extractor, text_scanner
+from .settings import get_setting
+from .document import DecodedDocument
+from .budget import VerificationBudget, BudgetExhausted
 
 logger = logging.getLogger(__name__)
 
@@ -25,60 +20,58 @@ class TextExtractor:
         return cleaned.replace(" ", "")
 
     @staticmethod
-    def extract_from_file(file_path: str) -> str:
+    def extract_from_file(file_path: str, page_timings: Optional[List[Dict]] = None,
+                          document: Optional[DecodedDocument] = None,
+                          budget: Optional[VerificationBudget] = None) -> str:
         """
-        If file_path ends with .pdf -> use PyPDF2 to extract text.
-        If image (jpg/png) -> use Pillow + pytesseract.
-        Return full extracted text as a string (can be empty).
+        If file_path ends with .pdf -> use PyPDF2 to extract text
+        (page-bounded, see pdf_extractor; per-page timings go to page_timings).
+        If image (jpg/png) -> OCR on the shared pool (see ocr; "" without tesseract).
+        document: the verification's shared DecodedDocument, reused instead
+        of reading and decoding the file again.
+        budget: the verification's time budget; PDF pages stop and OCR waits
+        no longer than it allows (BudgetExhausted is raised when cut short).
+        Return full extracted text as a string (can be empty), one line per
+        text line so name detection can work line by line.
         """
         ext = os.path.splitext(file_path)[1].lower()
         text = ""
         
         try:
             if ext == '.pdf':
-                reader = PdfReader(file_path)
-                for page in reader.pages:
-                    extracted = page.extract_text()
-                    if extracted:
-                        text += extracted + "\n"
+                reader = document.pdf_reader if document is not None else None
+                deadline = budget.deadline if budget is not None else None
+                text = pdf_extractor.extract_text(file_path, page_timings, reader=reader, deadline=deadline)
             elif ext in ['.jpg', '.jpeg', '.png']:
-                if Image and pytesseract:
-                    try:
-                        img = Image.open(file_path)
-                        text = pytesseract.image_to_string(img)
-                    except Exception as e:
-                        logger.error(f"OCR Error: {e}")
-                        text = "TODO: OCR not configured correctly or failed."
-                else:
-                     text = "TODO: Install Pillow and pytesseract for image OCR."
+                image = file_path
+                if document is not None and document.gray is not None:
+                    image = document.downscaled(ocr.max_side())
+                timeout = None
+                if budget is not None:
+                    timeout = budget.timeout(get_setting('VERIFICATION_OCR_TIMEOUT', 30))
+                text = ocr.ocr_image(image, timeout)
+                if not text and budget is not None and budget.exhausted:
+                    raise BudgetExhausted("OCR")
             else:
                  text = "" # Unsupported format
+        except BudgetExhausted:
+            raise
         except Exception as e:
             logger.error(f"Error extracting text from {file_path}: {e}")
             return ""
             
-        return TextExtractor.clean_text(text)
+        return text_scanner.clean_lines(text)
 
     @staticmethod
     def extract_urls_and_ids(cert_text: str) -> Dict[str, List[str]]:
         """
         From cert_text:
           - Find all URLs with a regex like r'(?:https?://|www\\.)\\S+'.
-          - Find ID-like tokens.
+          - Find ID-like tokens (deduplicated, most ID-like first).
         Return dict: { "urls": [...], "ids": [...] }
         """
-        # Regex for URLs
-        url_pattern = r'(?:https?://|www\.)\S+'
-        urls = re.findall(url_pattern, cert_text)
-        
-        # Simple ID extraction: Look for "Id: XXXXX" or generic long tokens
-        id_pattern = r'\b[A-Za-z0-9\-]{10,40}\b'
-        ids = re.findall(id_pattern, cert_text)
-        
-        return {
-            "urls": [TextExtractor.clean_url(u) for u in urls],
-            "ids": [TextExtractor.clean_text(i) for i in ids]
-        }
+        result = text_scanner.scan(cert_text, max_names=0)
+        return {"urls": result.urls, "ids": result.ids}
 
     @staticmethod
     def guess_candidate_names(cert_text: str) -> List[str]:
@@ -87,25 +80,4 @@ class TextExtractor:
           - Look for 2–4 capitalized words that look like names.
           - Return up to 3 best guesses.
         """
-        lines = cert_text.split('\n')
-        candidates = []
-        
-        blocklist = ['CERTIFICATE', 'UNIVERSITY', 'PROFESSOR', 'COMPLETION', 'OF', 'THE', 'BY', 'DEPARTMENT', 'EDUCATION']
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            words = line.split()
-            if 2 <= len(words) <= 4:
-                is_title = all(w[0].isupper() and w[1:].islower() for w in words if len(w) > 1)
-                is_upper = line.isupper()
-                
-                if any(b in line.upper() for b in blocklist):
-                    continue
-                    
-                if is_title or is_upper:
-                    candidates.append(TextExtractor.clean_text(line))
-                    
-        return candidates[:3]
+        return text_scanner.scan(cert_text).names
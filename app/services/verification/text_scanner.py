@@ -0,0 +1,113 @@
+"""
+Compiled certificate text scanner.
+
+scan() produces URLs, ID candidates and name candidates together from one
+call over the text. Patterns are compiled once at import and run with
+findall/finditer, so the walk over the text happens inside the regex
+engine and Python only touches the matches:
+
+    URL_RE   verification links, in text order
+    ID_RE    ID-like tokens (also those inside URLs), deduplicated
+
+Names come from lines short enough to hold 2-4 words, found with a C-level
+split and length filter before the per-line heuristics run. A single
+alternation of URL, ID and line patterns was measured at about half the
+throughput of these separate passes (it defeats the engine's
+literal-prefix search); see benchmarks/bench_text_scanner.py.
+
+IDs are ranked: tokens right after an ID label ("Certificate ID:",
+"Roll No.") first, then tokens mixing letters and digits, then the rest,
+each group in text order.
+
+TextExtractor.extract_urls_and_ids and guess_candidate_names are thin
+wrappers over scan().
+"""
+import re
+from typing import List, NamedTuple
+
+URL_RE = re.compile(r'(?:https?://|www\.)\S+')
+ID_RE = re.compile(r'\b[A-Za-z0-9\-]{10,40}\b')
+ID_LABELS = frozenset(('id', 'no', 'number', 'credential', 'certificate', 'cert', 'serial', 'reg', 'registration', 'roll'))
+ID_LABEL_WINDOW = 24
+# Longest line considered for a name (4 words)
+MAX_NAME_LINE = 80
+
+# Characters dropped by clean_lines without a per-character scan: ASCII
+# controls other than newline, plus common invisible formatting characters
+_DROP_TABLE = dict.fromkeys([c for c in range(32) if c not in (9, 10)] + [127, 0xAD, 0x200B, 0x200C, 0x200D, 0x2060, 0xFEFF])
+_LINE_EDGES_RE = re.compile(r'[^\S\n]*\n\s*')
+_DIGITS = frozenset("0123456789")
+
+NAME_BLOCKLIST = ('CERTIFICATE', 'UNIVERSITY', 'PROFESSOR', 'COMPLETION', 'OF', 'THE', 'BY', 'DEPARTMENT', 'EDUCATION')
+NAME_BLOCK_RE = re.compile(r'(?i)\b(?:' + '|'.join(NAME_BLOCKLIST) + r')\b')
+MAX_NAMES = 3
+
+class ScanResult(NamedTuple):
+    urls: List[str]
+    ids: List[str]
+    names: List[str]
+
+def _printable(s: str) -> str:
+    # isprintable() is a C-level check; the per-character filter only runs on dirty tokens
+    if s.isprintable():
+        return s
+    return "".join(ch for ch in s if ch.isprintable())
+
+def clean_lines(text: str) -> str:
+    """Drop non-printable characters and blank lines, keeping the line structure names rely on."""
+    text = text.translate(_DROP_TABLE).replace("\t", " ")
+    if not text.replace("\n", "").isprintable():
+        text = "\n".join(_printable(line) for line in text.split("\n"))
+    return _LINE_EDGES_RE.sub("\n", text).strip()
+
+def _name_from_line(line: str):
+    line = line.strip()
+    words = line.split()
+    if not 2 <= len(words) <= 4:
+        return None
+    is_title = all(w[0].isupper() and w[1:].islower() for w in words if len(w) > 1)
+    if not (is_title or line.isupper()):
+        return None
+    if NAME_BLOCK_RE.search(line):
+        return None
+    return _printable(line)
+
+def _is_labeled(text: str, start: int) -> bool:
+    """True if the token at start follows an ID label on the same line."""
+    window = text[max(0, start - ID_LABEL_WINDOW):start]
+    window = window[window.rfind("\n") + 1:].rstrip(" :#.-")
+    words = window.rsplit(None, 1)
+    return bool(words) and words[-1].lower() in ID_LABELS
+
+def _id_rank(text: str, token: str, start: int) -> int:
+    if _is_labeled(text, start):
+        return 0
+    has_digit = not _DIGITS.isdisjoint(token)
+    has_alpha = token.upper() != token.lower()
+    return 1 if has_digit and has_alpha else 2
+
+def scan(text: str, max_names: int = MAX_NAMES) -> ScanResult:
+    """URLs (text order), ranked unique IDs and up to max_names candidate names."""
+    urls = [_printable(u).replace(" ", "") for u in URL_RE.findall(text)]
+
+    # Ranked at each token's first match, so ranking needs no further pass over the text
+    ranks = {}
+    for match in ID_RE.finditer(text):
+        token = match.group()
+        if token not in ranks:
+            ranks[token] = _id_rank(text, token, match.start())
+    ids = sorted(ranks, key=ranks.get)
+
+    names: List[str] = []
+    if max_names > 0:
+        for line in text.split("\n"):
+            # Cheap rejections first: too long, one word, or lowercase start
+            if len(line) > MAX_NAME_LINE or " " not in line or line[:1].islower():
+                continue
+            name = _name_from_line(line)
+            if name and name not in names:
+                names.append(name)
+                if len(names) >= max_names:
+                    break
+
+    return ScanResult(urls, ids, names)
@@ -1,23 +1,230 @@
+import time
+import codecs
 import logging
+import threading
 import requests
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib3.exceptions import ReadTimeoutError
+
+from .settings import get_setting
+from .http_client import get_session
+from .fetch_cache import get_fetch_cache, normalize_url, compact_text
+from .host_health import get_host_health, is_dns_failure
+from .budget import VerificationBudget, BudgetExhausted
+from .pattern_matcher import CertificateMatcher, CertificateScan
 
 logger = logging.getLogger(__name__)
 
+# Consider these status codes as reachable
+REACHABLE_STATUS_CODES = (200, 201, 202, 204, 301, 302, 303, 307, 308)
+
+CHUNK_SIZE = 16 * 1024
+
+# Rate limits; like 5xx responses they are transient, so never cached
+TRANSIENT_STATUS_CODES = (429,)
+
+# Content types worth scanning for names/IDs; anything else (PDF, video, images) is not downloaded
+TEXT_CONTENT_TYPES = ('text/', 'application/xhtml', 'application/xml', 'application/json')
+
+def is_timeout(exc: BaseException) -> bool:
+    """True for connect/read timeouts, including read timeouts raised while streaming the body."""
+    # iter_content reports them as a ConnectionError wrapping urllib3's ReadTimeoutError
+    return isinstance(exc, requests.Timeout) or any(isinstance(a, ReadTimeoutError) for a in exc.args)
+
+def is_text_content(content_type: str) -> bool:
+    if not content_type:
+        return True
+    return content_type.split(';', 1)[0].strip().lower().startswith(TEXT_CONTENT_TYPES)
+
+# Per-host semaphores shared by every certificate verified in this process,
+# one per (host, limit) so a different per_host or config value takes effect
+_host_slots: Dict[Tuple[str, int], threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
+
+def _host_slot(host: str, limit: int) -> threading.BoundedSemaphore:
+    with _host_slots_lock:
+        slot = _host_slots.get((host, limit))
+        if slot is None:
+            slot = threading.BoundedSemaphore(limit)
+            _host_slots[(host, limit)] = slot
+        return slot
+
 class URLValidator:
     @staticmethod
-    def check_url_with_text(url: str, candidate_names: List[str], ids: List[str]) -> Dict:
+    def prepare_url(url: str) -> str:
         """
-        Generic link checker:
-        - Checks reachability (timeout=5).
-        - Scans page content for ANY candidate name OR ANY id.
+        Pre-cleaning applied before any request: strip trailing punctuation
+        picked up from the certificate text and add a scheme to bare www. links.
         """
-        
-        # Pre-cleaning
         target_url = url.strip().rstrip('.,;)')
         if target_url.startswith('www.'):
             target_url = 'https://' + target_url
-            
+        return target_url
+
+    @staticmethod
+    def check_urls(urls: List[str], candidate_names: List[str], ids: List[str],
+                   max_workers: int = None, per_host: int = None,
+                   budget: VerificationBudget = None) -> List[Optional[Dict]]:
+        """
+        Check several URLs concurrently.
+        - At most max_workers requests in flight for this certificate.
+        - At most per_host requests in flight per issuer host (process-wide,
+          among checks using the same limit).
+        - With a budget, request timeouts are capped by the time left; a URL
+          not checked before it ran out gets None instead of a result.
+        Results are returned in the same order as urls.
+        """
+        if max_workers is None:
+            max_workers = get_setting('VERIFICATION_LINK_MAX_WORKERS', 6)
+        if per_host is None:
+            per_host = get_setting('VERIFICATION_LINK_PER_HOST', 2)
+
+        # Built once per certificate, shared by every URL check
+        matcher = CertificateMatcher(candidate_names, ids)
+
+        def check(url):
+            host = urlsplit(URLValidator.prepare_url(url)).hostname or ''
+            try:
+                with _host_slot(host, per_host):
+                    return URLValidator.check_url_with_text(url, candidate_names, ids, matcher=matcher,
+                                                            budget=budget)
+            except BudgetExhausted:
+                return None
+
+        if len(urls) <= 1 or max_workers <= 1:
+            return [check(u) for u in urls]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(urls)), thread_name_prefix='link-check') as pool:
+            return list(pool.map(check, urls))
+
+    @staticmethod
+    def fetch_page(target_url: str, scan: CertificateScan, budget: VerificationBudget = None,
+                   stats: Optional[Dict] = None) -> int:
+        """
+        Fetch a page and feed its compact text to scan; return the status code.
+
+        The body is streamed: non-text content types are not read at all,
+        reading stops at VERIFICATION_FETCH_MAX_BYTES, and it stops as soon
+        as the scan has everything it is looking for. A cached entry is
+        used when it is complete or already satisfies the scan.
+        Network errors are raised, not cached, and counted against the
+        host's circuit breaker (other errors do not count either way); a
+        host being skipped raises HostUnavailable.
+        With a budget, connect/read timeouts are capped by the time left and
+        BudgetExhausted is raised once it runs out, including when a capped
+        timeout fires (not counted against the host).
+        stats, if given, gets "bytes" (body bytes read) and "cached".
+        """
+        if stats is None:
+            stats = {}
+        stats.update(bytes=0, cached=False)
+        cache = get_fetch_cache()
+        key = normalize_url(target_url)
+        cached = cache.get(key)
+        if cached is not None:
+            scan.feed(cached["text"])
+            if cached["complete"] or scan.done:
+                stats["cached"] = True
+                return cached["status_code"]
+            scan.reset()
+
+        timeout = (get_setting('VERIFICATION_CONNECT_TIMEOUT', 3.05), get_setting('VERIFICATION_READ_TIMEOUT', 5))
+        capped = False
+        if budget is not None:
+            budget_timeout = budget.http_timeouts()
+            capped = budget_timeout != timeout
+            timeout = budget_timeout
+
+        host = urlsplit(target_url).hostname or ''
+        health = get_host_health()
+        probe = health.acquire(host)
+        try:
+            return URLValidator._download(target_url, key, scan, host, timeout, budget, stats)
+        except requests.RequestException as e:
+            if capped and is_timeout(e):
+                # The budget's shortened timeout ran out, which says nothing about the host
+                raise BudgetExhausted(f"timed out on {target_url}") from e
+            health.record_failure(host, str(e) or type(e).__name__, dns=is_dns_failure(e))
+            raise
+        finally:
+            if probe:
+                health.release(host)
+
+    @staticmethod
+    def _download(target_url: str, key: str, scan: CertificateScan, host: str, timeout,
+                  budget: VerificationBudget = None, stats: Optional[Dict] = None) -> int:
+        cache = get_fetch_cache()
+        health = get_host_health()
+        max_bytes = get_setting('VERIFICATION_FETCH_MAX_BYTES', 2 * 1024 * 1024)
+        max_chars = get_setting('VERIFICATION_FETCH_CACHE_MAX_TEXT')
+
+        # Pooled keep-alive session (User-Agent set on the session)
+        with get_session().get(target_url, timeout=timeout, allow_redirects=True, stream=True) as resp:
+            if resp.status_code >= 500:
+                health.record_failure(host, f"HTTP {resp.status_code}")
+            else:
+                health.record_success(host)
+
+            if resp.status_code not in REACHABLE_STATUS_CODES or not is_text_content(resp.headers.get('Content-Type')):
+                # An outage answered from the cache would outlast the breaker's cool-down
+                if resp.status_code < 500 and resp.status_code not in TRANSIENT_STATUS_CODES:
+                    cache.put(key, resp.status_code, "")
+                return resp.status_code
+
+            decoder = codecs.getincrementaldecoder(resp.encoding or 'utf-8')(errors='replace')
+            pieces = []
+            kept_chars = 0
+            bytes_read = 0
+            complete = True
+            for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                if budget is not None:
+                    budget.check(f"reading {target_url}")
+                chunk = chunk[:max_bytes - bytes_read]
+                bytes_read += len(chunk)
+                if stats is not None:
+                    stats["bytes"] = bytes_read
+
+                text = compact_text(decoder.decode(chunk))
+                if pieces and pieces[-1].endswith(' ') and text.startswith(' '):
+                    text = text[1:]
+                scan.feed(text)
+                kept = text[:max(0, max_chars - kept_chars)]
+                if kept:
+                    pieces.append(kept)
+                    kept_chars += len(kept)
+                if len(kept) < len(text):
+                    # The cached text is cut short; it cannot answer checks for other names/IDs
+                    complete = False
+
+                if scan.done:
+                    complete = False
+                    break
+                if bytes_read >= max_bytes:
+                    logger.info(f"Stopped reading {target_url} at {max_bytes} bytes")
+                    break
+
+        cache.put(key, resp.status_code, "".join(pieces), complete=complete)
+        return resp.status_code
+
+    @staticmethod
+    def check_url_with_text(url: str, candidate_names: List[str], ids: List[str],
+                            matcher: CertificateMatcher = None, budget: VerificationBudget = None) -> Dict:
+        """
+        Generic link checker:
+        - Checks reachability (VERIFICATION_CONNECT_TIMEOUT/READ_TIMEOUT,
+          capped by the budget's time left if given).
+        - Scans page content for ANY candidate name OR ANY id.
+        Pass a prebuilt matcher to reuse it across URLs of one certificate.
+        Raises BudgetExhausted if the budget ran out before the check finished.
+        The result carries the check's wall time ("ms"), the body bytes read
+        and whether the fetch cache answered it.
+        """
+
+        # Pre-cleaning
+        target_url = URLValidator.prepare_url(url)
+
         res = {
             "url": target_url,
             "reachable": False,
@@ -26,41 +233,32 @@ class URLValidator:
             "id_match": False,
             "error": None
         }
+        stats = {"bytes": 0, "cached": False}
+        started = time.perf_counter()
 
         try:
-            # User Agent to avoid bot blocking
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-            resp = requests.get(target_url, timeout=5, allow_redirects=True, headers=headers)
-            res["status_code"] = resp.status_code
-            
+            if matcher is None:
+                matcher = CertificateMatcher(candidate_names, ids)
+            scan = matcher.scan()
+            status_code = URLValidator.fetch_page(target_url, scan, budget, stats)
+            res["status_code"] = status_code
+
             # Consider these status codes as reachable
-            if resp.status_code in (200, 201, 202, 204, 301, 302, 303, 307, 308):
+            if status_code in REACHABLE_STATUS_CODES:
                 res["reachable"] = True
-                try:
-                    page_text = resp.text.lower()
-                except Exception:
-                    # In case of binary content or encoding errors
-                    page_text = ""
-                
-                # Check Name Match
-                for full_name in candidate_names:
-                    # Split name into parts to be more flexible
-                    parts = [p.strip().lower() for p in full_name.split() if p.strip()]
-                    if parts and all(p in page_text for p in parts):
-                        res["name_match"] = True
-                        break
-                
-                # Check ID Match
-                for i in ids:
-                    if len(i) >= 6 and i.lower() in page_text:
-                        res["id_match"] = True
-                        break
-                        
+                res["name_match"] = scan.name_match
+                res["id_match"] = scan.id_match
+
+        except BudgetExhausted:
+            raise
         except requests.Timeout:
-            res["error"] = "Timeout reached (5s)"
+            if budget is not None and budget.exhausted:
+                raise BudgetExhausted(f"timed out on {target_url}")
+            res["error"] = f"Timeout reached ({get_setting('VERIFICATION_READ_TIMEOUT', 5)}s)"
             logger.warning(f"Timeout checking URL: {target_url}")
         except Exception as e:
             res["error"] = str(e)
             logger.warning(f"Error checking URL {target_url}: {e}")
-            
+
+        res.update(stats, ms=round((time.perf_counter() - started) * 1000, 1))
         return res
@@ -1,78 +1,99 @@
+import time
 import logging
 import json
 from typing import Dict, List, Any
 
 # Import modular components
-from .text_extractor import TextExtractor
-from .qr_extractor import QRExtractor
-from .hash_validator import HashValidator
-from .url_validator import URLValidator
 from .decision_engine import DecisionEngine
+from .pipeline import Pipeline, VerificationContext
+from .budget import VerificationBudget
+from .metrics import get_metrics
+from .stages import default_stages
 
 logger = logging.getLogger(__name__)
 
+HASH_MATCH_REASON = "Verified by previously stored hash (tamper-proof)."
+REJECTED_HASH_REASON = "Identical file was previously rejected by faculty. Needs faculty review."
+PARTIAL_REASON = "Verification ran out of time before all checks finished. Needs faculty review."
+
 class VerificationService:
-    def verify(self, file_path: str) -> Dict[str, Any]:
+    def __init__(self, stages=None, budget_seconds: float = None):
+        self.pipeline = Pipeline(stages if stages is not None else default_stages())
+        self.budget_seconds = budget_seconds
+
+    def verify(self, file_path: str, file_hash: str = None) -> Dict[str, Any]:
         """
         Orchestrates the verification process.
         Matches the output format of the old auto_verifier.py.
+
+        file_hash: SHA-256 computed while the upload was written
+        (hashstore.save_and_hash); stages use it instead of re-reading the file.
+
+        The whole run is bounded by VERIFICATION_BUDGET_SECONDS (or
+        budget_seconds); a run cut short is marked "partial" in auto_details
+        and left for faculty review unless a strong match was already found.
+
+        Stage, URL fetch, decision and total timings go into auto_details
+        ("stages", "link_checks", "timings") and into the process
+        histograms (see metrics.py).
         """
         logger.info(f"Starting verification for: {file_path}")
-        
-        # 1. Extract Text
-        logger.debug("Extracting text...")
-        cert_text_raw = TextExtractor.extract_from_file(file_path)
-        cert_text = TextExtractor.clean_text(cert_text_raw)
-        
-        # 2. Extract QR
-        logger.debug("Extracting QR...")
-        qr_values_raw = QRExtractor.extract(file_path)
-        # Note: qr_values_raw are already strings from the reader
-        
-        # 3. Parse Data
-        logger.debug("Parsing data...")
-        parsed = TextExtractor.extract_urls_and_ids(cert_text)
-        candidate_names = TextExtractor.guess_candidate_names(cert_text)
-        
-        # Clean and Prepare URLs
-        urls_from_text = parsed['urls']
-        ids = parsed['ids']
-        clean_qr_values = [QRExtractor.clean_url(v) for v in qr_values_raw]
-        
-        # Merge URLs for checking
-        urls_for_check = []
-        urls_for_check.extend(urls_from_text)
-        
-        # Filter QR values that are URLs
-        qr_urls = QRExtractor.filter_urls(clean_qr_values)
-        urls_for_check.extend(qr_urls)
-        
-        # Deduplicate
-        urls_for_check = list(dict.fromkeys(urls_for_check))
-        
-        logger.info(f"URLs to check: {urls_for_check}")
-        
-        # 4. Check Links
-        logger.debug("Validating links...")
-        link_checks = [URLValidator.check_url_with_text(u, candidate_names, ids) for u in urls_for_check]
-        
+
+        # 1-4. Hash lookup, extraction, parsing and link checks (see stages.py)
+        budget = VerificationBudget(self.budget_seconds)
+        ctx = self.pipeline.run(VerificationContext(file_path, file_hash, budget))
+        ctx.document.release()
+        logger.info(f"URLs to check: {ctx.urls_for_check}")
+
+        link_checks = ctx.ordered_link_checks()
+
         # 5. Make Decision
         logger.debug(" evaluating decision...")
+        started = time.perf_counter()
         status, verification_mode, reason, strong_match_url, strong_auto, auto_details = DecisionEngine.evaluate(
-            link_checks, clean_qr_values
+            link_checks, ctx.clean_qr_values
         )
-        
-        logger.info(f"Decision: {status}, Mode: {verification_mode}")
+        decision_ms = (time.perf_counter() - started) * 1000
+
+        details = json.loads(auto_details)
+        if ctx.hash_match is not None:
+            status, verification_mode, reason, strong_auto = "auto_verified", "hash_match", HASH_MATCH_REASON, True
+            details["reason"] = reason
+            details["hash_match_activity_id"] = ctx.hash_match.id
+        elif ctx.rejected_match is not None:
+            status, verification_mode, reason, strong_auto = "pending", "rejected_hash_match", REJECTED_HASH_REASON, False
+            details["reason"] = reason
+            details["rejected_match_activity_id"] = ctx.rejected_match.id
+        elif ctx.partial and not strong_auto:
+            reason = PARTIAL_REASON
+            details["reason"] = reason
+        details["partial"] = ctx.partial
+        details["budget"] = budget.as_dict()
+        details["stages"] = ctx.stage_log
+        details["skipped_urls"] = [u for u in ctx.urls_for_check if u not in ctx.link_checks]
+        if ctx.page_timings:
+            details["pdf_pages"] = ctx.page_timings
+        if ctx.qr_attempts:
+            details["qr_attempts"] = ctx.qr_attempts
+        total_ms = budget.elapsed() * 1000
+        details["timings"] = {"decision_ms": round(decision_ms, 1), "total_ms": round(total_ms, 1)}
+        auto_details = json.dumps(details)
+
+        get_metrics().record_verification(ctx.stage_log, link_checks, decision_ms, total_ms)
+        logger.info(f"Decision: {status}, Mode: {verification_mode} ({total_ms:.0f} ms)")
 
         # 6. Format Output (Exactly matching old format)
         return {
-            "cert_text": cert_text,
-            "urls": urls_for_check,
-            "ids": ids,
-            "candidate_names": candidate_names,
+            "cert_text": ctx.cert_text,
+            "urls": ctx.urls_for_check,
+            "ids": ctx.ids,
+            "candidate_names": ctx.candidate_names,
             "link_checks": link_checks,
             "strong_auto": strong_auto,
             "auto_decision": reason, # Old key was 'auto_decision' holding the reason string
             "verification_mode": verification_mode,
-            "auto_details": auto_details
+            "auto_details": auto_details,
+            "file_hash": file_hash,
+            "hash_match": ctx.hash_match is not None,
+            "rejected_hash_match": ctx.rejected_match is not None
         }
@@ -0,0 +1,213 @@
+"""
+In-memory membership filter for certificate hashes.
+
+Keeps the SHA-256 digests of verified and rejected certificates as sorted
+arrays of raw 32-byte digests (one contiguous bytearray each, ~32 bytes per
+certificate). hashstore consults it before querying: a hash that is not in
+the filter is unknown and needs no DB round trip. A hash that is in the
+filter is still confirmed against the DB, since statuses can change after
+it was loaded.
+
+Each process keeps its own copy. It is loaded at worker start, updated on
+approve/reject, and refreshed from recently updated rows every
+HASH_FILTER_REFRESH_SECONDS. Approvals and rejections made by other
+processes are picked up sooner: at most every HASH_FILTER_VERSION_CHECK_SECONDS
+a miss compares the newest student_activities.updated_at (an indexed max)
+with the one seen at the last sync, and refreshes if it moved. Other misses
+are answered without touching the DB.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import func
+
+from app.models import db, StudentActivity
+from app.services.verification.settings import get_setting
+
+logger = logging.getLogger(__name__)
+
+DIGEST_SIZE = 32
+VERIFIED_STATUSES = ('auto_verified', 'faculty_verified')
+REJECTED_STATUSES = ('rejected',)
+
+def to_digest(file_hash: str) -> Optional[bytes]:
+    """Hex SHA-256 -> 32 raw bytes; None for anything else."""
+    if not file_hash or len(file_hash) != DIGEST_SIZE * 2:
+        return None
+    try:
+        return bytes.fromhex(file_hash)
+    except ValueError:
+        return None
+
+class DigestSet:
+    """Sorted array of fixed-size digests with binary-search lookups."""
+    def __init__(self, digests: Iterable[bytes] = ()):
+        self._buf = bytearray(b"".join(sorted(set(digests))))
+
+    def __len__(self):
+        return len(self._buf) // DIGEST_SIZE
+
+    def _at(self, i: int) -> bytes:
+        return bytes(self._buf[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE])
+
+    def _position(self, digest: bytes) -> int:
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._at(mid) < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def __contains__(self, digest: bytes) -> bool:
+        i = self._position(digest)
+        return i < len(self) and self._at(i) == digest
+
+    def add(self, digest: bytes):
+        i = self._position(digest)
+        if i < len(self) and self._at(i) == digest:
+            return
+        self._buf[i * DIGEST_SIZE:i * DIGEST_SIZE] = digest
+
+class HashMembership:
+    def __init__(self):
+        self.verified = DigestSet()
+        self.rejected = DigestSet()
+        self.loaded = False
+        # Newest activity updated_at at the last sync: the cross-process data version
+        self._version: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._version_checked_at = 0.0
+        self._lock = threading.Lock()
+        self.db_skipped = 0
+        self.db_confirmed = 0
+        self.db_synced = 0
+
+    @staticmethod
+    def _data_version() -> Optional[datetime]:
+        return db.session.query(func.max(StudentActivity.updated_at)).scalar()
+
+    def load(self):
+        """Full load of verified/rejected hashes (worker start)."""
+        version = self._data_version()
+        rows = db.session.query(StudentActivity.certificate_hash, StudentActivity.status).filter(
+            StudentActivity.certificate_hash.isnot(None),
+            StudentActivity.status.in_(VERIFIED_STATUSES + REJECTED_STATUSES)
+        ).all()
+
+        verified, rejected = [], []
+        for file_hash, status in rows:
+            digest = to_digest(file_hash)
+            if digest:
+                (verified if status in VERIFIED_STATUSES else rejected).append(digest)
+
+        with self._lock:
+            self.verified = DigestSet(verified)
+            self.rejected = DigestSet(rejected)
+            self.loaded = True
+            self._version = version
+            self._checked_at = self._version_checked_at = time.monotonic()
+        logger.info(f"Hash filter loaded: {len(verified)} verified, {len(rejected)} rejected")
+
+    def refresh(self, version: Optional[datetime] = None):
+        """Add hashes whose activity changed since the last sync."""
+        if not self.loaded or self._version is None:
+            return self.load()
+
+        # Small overlap so rows committed around the last sync are not missed
+        since = self._version - timedelta(seconds=5)
+        if version is None:
+            version = self._data_version()
+        rows = db.session.query(StudentActivity.certificate_hash, StudentActivity.status).filter(
+            StudentActivity.certificate_hash.isnot(None),
+            StudentActivity.status.in_(VERIFIED_STATUSES + REJECTED_STATUSES),
+            StudentActivity.updated_at >= since
+        ).all()
+        for file_hash, status in rows:
+            self.add(file_hash, status)
+        with self._lock:
+            self._version = version
+            self._checked_at = self._version_checked_at = time.monotonic()
+
+    def ensure_fresh(self) -> bool:
+        """Load or refresh if due; True if that queried the DB."""
+        if not self.loaded:
+            self.load()
+        elif time.monotonic() - self._checked_at > get_setting('HASH_FILTER_REFRESH_SECONDS', 300):
+            self.refresh()
+        else:
+            return False
+        return True
+
+    def _sync_if_written(self) -> bool:
+        """Refresh if another process wrote since the last sync; checked at most every few seconds."""
+        if time.monotonic() - self._version_checked_at < get_setting('HASH_FILTER_VERSION_CHECK_SECONDS', 10):
+            return False
+        version = self._data_version()
+        if version != self._version:
+            self.refresh(version)
+        else:
+            with self._lock:
+                self._version_checked_at = time.monotonic()
+        return True
+
+    def add(self, file_hash: str, status: str):
+        digest = to_digest(file_hash)
+        if digest is None:
+            return
+        with self._lock:
+            if status in VERIFIED_STATUSES:
+                self.verified.add(digest)
+            elif status in REJECTED_STATUSES:
+                self.rejected.add(digest)
+
+    def _might_contain(self, digest_set_name: str, file_hash: str) -> bool:
+        synced = self.ensure_fresh()
+        digest = to_digest(file_hash)
+        # Non-SHA-256 values are not tracked; let the DB answer
+        if digest is None:
+            return True
+        with self._lock:
+            present = digest in getattr(self, digest_set_name)
+        if not present and not synced and self._sync_if_written():
+            synced = True
+            with self._lock:
+                present = digest in getattr(self, digest_set_name)
+        with self._lock:
+            if present:
+                self.db_confirmed += 1
+            elif synced:
+                self.db_synced += 1
+            else:
+                self.db_skipped += 1
+        return present
+
+    def might_be_verified(self, file_hash: str) -> bool:
+        return self._might_contain('verified', file_hash)
+
+    def might_be_rejected(self, file_hash: str) -> bool:
+        return self._might_contain('rejected', file_hash)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "verified": len(self.verified),
+                "rejected": len(self.rejected),
+                "db_skipped": self.db_skipped,
+                "db_confirmed": self.db_confirmed,
+                "db_synced": self.db_synced
+            }
+
+_membership = HashMembership()
+
+def get_hash_membership() -> HashMembership:
+    return _membership
+
+def reset_hash_membership():
+    """Drop the loaded filter (tests, DB switches); reloaded on next use."""
+    global _membership
+    _membership = HashMembership()
@@ -1,24 +1,76 @@
 import hashlib
 from app.models import StudentActivity
+from app.services.verification.settings import get_setting
+from app.verification import hash_filter
+
+# Large blocks: one syscall per MB instead of per 4 KB
+HASH_CHUNK_SIZE = 1024 * 1024
+SIGNATURE_BYTES = 2048
 
 def calculate_file_hash(filepath):
     sha256_hash = hashlib.sha256()
     try:
         with open(filepath, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
+            for byte_block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
                 sha256_hash.update(byte_block)
     except FileNotFoundError:
         return None
     return sha256_hash.hexdigest()
 
+def save_and_hash(file_stream, filepath, header_check=None):
+    """
+    Write an upload stream to filepath and compute its SHA-256 in the same pass,
+    so the saved file never has to be read back just to hash it.
+
+    header_check(first_bytes) validates the file signature before anything is
+    written; if it fails, nothing is saved and None is returned.
+    """
+    sha256_hash = hashlib.sha256()
+
+    # Collect at least SIGNATURE_BYTES for the signature check
+    head = b""
+    while len(head) < SIGNATURE_BYTES:
+        block = file_stream.read(HASH_CHUNK_SIZE)
+        if not block:
+            break
+        head += block
+
+    if header_check is not None and not header_check(head[:SIGNATURE_BYTES]):
+        return None
+
+    with open(filepath, "wb") as f:
+        sha256_hash.update(head)
+        f.write(head)
+        for byte_block in iter(lambda: file_stream.read(HASH_CHUNK_SIZE), b""):
+            sha256_hash.update(byte_block)
+            f.write(byte_block)
+    return sha256_hash.hexdigest()
+
+def _filter_enabled():
+    return get_setting('HASH_FILTER_ENABLED', True)
+
 def lookup_hash(file_hash):
+    # Unknown to the in-memory filter -> no verified record, skip the DB
+    if _filter_enabled() and not hash_filter.get_hash_membership().might_be_verified(file_hash):
+        return None
+
     # Look for approved/verified activities with this hash
     record = StudentActivity.query.filter_by(certificate_hash=file_hash).filter(
         StudentActivity.status.in_(['auto_verified', 'faculty_verified'])
     ).first()
     return record
 
+def find_rejected_by_hash(file_hash):
+    if _filter_enabled() and not hash_filter.get_hash_membership().might_be_rejected(file_hash):
+        return None
+
+    # Check if this certificate was previously rejected
+    return StudentActivity.query.filter_by(certificate_hash=file_hash, status='rejected').first()
+
 def store_approved_hash(file_hash, roll_no, filename, request_id, faculty_comment):
     # DB is updated via app.py directly on the Activity record.
-    # This function exists to satisfy the interface or future extension.
-    pass
+    # Here we only keep this process's hash filter in step.
+    hash_filter.get_hash_membership().add(file_hash, 'faculty_verified')
+
+def store_rejected_hash(file_hash):
+    hash_filter.get_hash_membership().add(file_hash, 'rejected')
@@ -1,43 +1,141 @@
+"""
+QR decoding engine.
 
-from typing import List
-import cv2
+Phone photos of certificates are large (12-16 MP) and the QR code is a small
+part of them, so decoding the full-resolution image first is both slow and
+unreliable. Each image goes through cheap-to-expensive passes and stops at
+the first one that decodes anything:
+
+    downscaled   whole image, longest side capped at VERIFICATION_QR_FAST_MAX_SIDE
+    roi:<corner> the four corners at original resolution, where issuers
+                 usually print the code
+    full         whole image at original resolution, last resort for codes
+                 that no corner contains whole (e.g. a large centred code)
+
+Small codes in large photos are found by a corner pass at a fraction of
+the cost of a full-resolution pass. Even overlapping corners
+(VERIFICATION_QR_ROI_FRACTION > 0.5) only contain codes smaller than the
+overlap, so the full pass always runs when the others find nothing.
+
+Detectors are kept per thread (cv2.QRCodeDetector is not thread-safe) and
+every pass is timed into the optional attempts list. With a deadline (the
+verification budget's), no pass is started after it.
+"""
 import os
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import cv2
+
+from app.services.verification.settings import get_setting
+from app.services.verification.budget import BudgetExhausted, past
+
+logger = logging.getLogger(__name__)
+
+# (name, top, left) as fractions of the image; each ROI spans ROI_FRACTION of both sides
+ROI_CORNERS = (
+    ("top-left", 0.0, 0.0),
+    ("top-right", 0.0, 1.0),
+    ("bottom-left", 1.0, 0.0),
+    ("bottom-right", 1.0, 1.0),
+)
+
+_local = threading.local()
+
+def get_detector() -> cv2.QRCodeDetector:
+    """The calling thread's detector, created on first use."""
+    detector = getattr(_local, "detector", None)
+    if detector is None:
+        detector = _local.detector = cv2.QRCodeDetector()
+    return detector
+
+def _detect(img) -> List[str]:
+    retval, decoded_info, points, straight_qrcode = get_detector().detectAndDecodeMulti(img)
+    if not retval:
+        return []
+    return [s for s in decoded_info if s]
+
+def _downscale(img, max_side: int):
+    height, width = img.shape[:2]
+    scale = max_side / max(height, width)
+    if scale >= 1:
+        return img
+    return cv2.resize(img, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+def _corner(img, top: float, left: float, fraction: float):
+    height, width = img.shape[:2]
+    h, w = int(height * fraction), int(width * fraction)
+    y = int((height - h) * top)
+    x = int((width - w) * left)
+    return img[y:y + h, x:x + w]
+
+def _passes(img, fast_max_side: int, roi_fraction: float, small=None):
+    """Yield (pass name, image) from cheapest to most expensive."""
+    if small is None:
+        small = _downscale(img, fast_max_side)
+    yield "downscaled", small
+    if small is img:
+        return  # already decoded at full resolution
+    for name, top, left in ROI_CORNERS:
+        yield f"roi:{name}", _corner(img, top, left, roi_fraction)
+    yield "full", img
+
+def decode_qr_image(img, attempts: Optional[List[Dict]] = None,
+                    fast_max_side: int = None, roi_fraction: float = None, small=None,
+                    deadline: float = None) -> List[str]:
+    """
+    Detect and decode every QR code in an already loaded image
+    (BGR or grayscale numpy array). Returns the non-empty decoded strings
+    of the first pass that finds any; appends {"pass", "ms", "found"} per
+    pass to attempts if given.
 
-def extract_qr_data(image_path: str) -> List[str]:
+    small: grayscale copy already downscaled to fast_max_side (e.g. from a
+    DecodedDocument), returned as-is when img needed no downscaling.
+    deadline: time.monotonic() value after which no pass is started
+    (BudgetExhausted is raised instead).
+    """
+    if fast_max_side is None:
+        fast_max_side = get_setting('VERIFICATION_QR_FAST_MAX_SIDE', 1000)
+    if roi_fraction is None:
+        roi_fraction = get_setting('VERIFICATION_QR_ROI_FRACTION', 0.55)
+
+    if img.ndim == 3:
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    for name, candidate in _passes(img, fast_max_side, roi_fraction, small):
+        if past(deadline):
+            raise BudgetExhausted(f"QR decoding stopped before pass {name}")
+        started = time.perf_counter()
+        try:
+            values = _detect(candidate)
+        except cv2.error as e:
+            logger.debug(f"QR pass {name} failed: {e}")
+            values = []
+        if attempts is not None:
+            attempts.append({"pass": name, "ms": round((time.perf_counter() - started) * 1000, 1),
+                             "found": len(values)})
+        if values:
+            return values
+    return []
+
+def extract_qr_data(image_path: str, attempts: Optional[List[Dict]] = None,
+                    deadline: float = None) -> List[str]:
     """
     Given a path to an image (PNG/JPG) of a certificate page,
     detect and decode any QR codes and return the decoded strings.
     If no QR codes are found, return an empty list.
     """
-    print(f"[QR] Trying to decode: {image_path}")
     if not os.path.exists(image_path):
-        print(f"[QR] File not found: {image_path}")
+        logger.warning(f"QR image not found: {image_path}")
         return []
 
-    try:
-        # Load image via OpenCV
-        img = cv2.imread(image_path)
-        if img is None:
-            print("[QR] Failed to load image with OpenCV")
-            return []
-
-        # Initialize QRCode Detector
-        detector = cv2.QRCodeDetector()
-        
-        # Detect and decode
-        print("[QR] Detecting...")
-        retval, decoded_info, points, straight_qrcode = detector.detectAndDecodeMulti(img)
-        
-        if retval:
-            print(f"[QR] Raw results: {decoded_info}")
-            # decoded_info provides a list of strings if multiple found (or tuple/list)
-            # Filter empty strings
-            valid_qr = [s for s in decoded_info if s]
-            print(f"[QR] Decoded values: {valid_qr}")
-            return valid_qr
-            
-        print("[QR] No QR codes found.")
-        return []
-    except Exception as e:
-        print(f"[QR] Error while decoding: {e}")
+    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        logger.warning(f"Failed to load {image_path} with OpenCV")
         return []
+
+    values = decode_qr_image(img, attempts, deadline=deadline)
+    logger.debug(f"QR values for {image_path}: {values}")
+    return values
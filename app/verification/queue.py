@@ -1,5 +1,209 @@
-from app.models import StudentActivity
+"""
+DB-backed verification job queue.
 
-def find_rejected_by_hash(file_hash):
-    # Check if this certificate was previously rejected
-    return StudentActivity.query.filter_by(certificate_hash=file_hash, status='rejected').first()
+Uploads insert a StudentActivity in the 'verifying' state plus a
+VerificationJob row; worker processes claim jobs from the table, run the
+verification pipeline and write the result back onto the activity.
+No broker is needed: the database is the queue.
+"""
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Process
+
+from flask import current_app
+from sqlalchemy import or_, and_
+
+from app.models import db, VerificationJob
+from app.verification import hash_filter
+from app.services.verification.host_health import get_host_health
+from app.services.verification.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+def enqueue(activity, file_path):
+    """
+    Add a verification job for an activity. The caller commits, so the
+    activity and its job become visible to workers atomically.
+    """
+    job = VerificationJob(activity=activity, file_path=file_path, status='queued')
+    db.session.add(job)
+    return job
+
+def _runnable(stale_before):
+    return or_(
+        VerificationJob.status == 'queued',
+        and_(VerificationJob.status == 'running', VerificationJob.locked_at < stale_before)
+    )
+
+def _stale_before():
+    return datetime.utcnow() - timedelta(seconds=current_app.config['VERIFICATION_JOB_STALE_SECONDS'])
+
+def claim(job_id, attempts, worker_id):
+    """
+    Claim one job, or return None if another worker got it first.
+
+    The claim is an UPDATE guarded on the attempts counter and on the job
+    still being runnable, so two workers racing for the same row cannot
+    both win and a job being processed cannot be taken over.
+    """
+    claimed = VerificationJob.query.filter(
+        VerificationJob.id == job_id,
+        VerificationJob.attempts == attempts,
+        _runnable(_stale_before())
+    ).update({
+        'status': 'running',
+        'attempts': attempts + 1,
+        'locked_by': worker_id,
+        'locked_at': datetime.utcnow()
+    }, synchronize_session=False)
+    db.session.commit()
+    if claimed:
+        return db.session.get(VerificationJob, job_id)
+    return None
+
+def _fall_back_to_review(job, error):
+    from app.services.activity_service import ActivityService
+
+    activity = job.activity
+    job.status = 'failed'
+    job.last_error = error
+    activity.status = 'pending'
+    activity.auto_decision = "Automatic verification failed. Queued for faculty review."
+    activity.assigned_reviewer_id = ActivityService.find_reviewer_id(
+        activity.activity_type, activity.student.department
+    )
+
+def fail_abandoned():
+    """
+    Fail stale 'running' jobs that used their last attempt: the worker died
+    on it (e.g. killed on a pathological file) and no worker may retry it.
+    Their activities go to faculty review. Returns the number failed.
+    """
+    max_attempts = current_app.config['VERIFICATION_JOB_MAX_ATTEMPTS']
+    stale_before = _stale_before()
+    abandoned = VerificationJob.query.filter(
+        VerificationJob.status == 'running',
+        VerificationJob.locked_at < stale_before,
+        VerificationJob.attempts >= max_attempts
+    ).with_entities(VerificationJob.id).all()
+
+    failed = 0
+    for (job_id,) in abandoned:
+        # Guarded like claim(), so only one worker sweeps each job
+        swept = VerificationJob.query.filter(
+            VerificationJob.id == job_id,
+            VerificationJob.status == 'running',
+            VerificationJob.locked_at < stale_before
+        ).update({'status': 'failed'}, synchronize_session=False)
+        if swept:
+            job = db.session.get(VerificationJob, job_id)
+            _fall_back_to_review(job, job.last_error or "Worker stopped during the last attempt")
+            logger.warning(f"Job {job_id} abandoned on attempt {job.attempts}; sent to faculty review")
+            failed += 1
+        db.session.commit()
+    return failed
+
+def claim_next(worker_id):
+    """
+    Claim the oldest runnable job for this worker, or return None.
+
+    Runnable means 'queued', or 'running' with a lock older than
+    VERIFICATION_JOB_STALE_SECONDS (the worker holding it died). Stale jobs
+    that already used their last attempt are failed first (fail_abandoned).
+    """
+    max_attempts = current_app.config['VERIFICATION_JOB_MAX_ATTEMPTS']
+    fail_abandoned()
+
+    candidates = VerificationJob.query.filter(
+        _runnable(_stale_before()),
+        VerificationJob.attempts < max_attempts
+    ).order_by(VerificationJob.id).with_entities(VerificationJob.id, VerificationJob.attempts).limit(5).all()
+
+    for job_id, attempts in candidates:
+        job = claim(job_id, attempts, worker_id)
+        if job is not None:
+            return job
+    return None
+
+def process_job(job, retry=True):
+    """
+    Run the verification pipeline for a claimed job and store the result.
+    On the last failed attempt (or any failure with retry=False) the
+    activity falls back to faculty review.
+    """
+    from app.services.activity_service import ActivityService
+    from app.services.verification.verification_service import VerificationService
+
+    activity = job.activity
+    try:
+        verification = VerificationService().verify(job.file_path, file_hash=activity.certificate_hash)
+        status = ActivityService.apply_verification(activity, verification)
+        job.status = 'done'
+        job.last_error = None
+        db.session.commit()
+        logger.info(f"Job {job.id}: activity {activity.id} -> {status}")
+    except Exception as e:
+        db.session.rollback()
+        logger.exception(f"Job {job.id} failed (attempt {job.attempts})")
+        if not retry or job.attempts >= current_app.config['VERIFICATION_JOB_MAX_ATTEMPTS']:
+            _fall_back_to_review(job, str(e))
+        else:
+            job.status = 'queued'
+            job.last_error = str(e)
+        db.session.commit()
+    return job
+
+def run_inline(job):
+    """
+    Inline mode (development): claim the job like a worker would and run it
+    in this process. A failure is not requeued, since no worker may be
+    running to retry it; the activity goes to faculty review instead.
+    Returns None if a worker claimed the job first.
+    """
+    job = claim(job.id, job.attempts, f"inline:{socket.gethostname()}:{os.getpid()}")
+    if job is None:
+        return None
+    return process_job(job, retry=False)
+
+def run_worker(app=None, once=False):
+    """
+    Worker loop: claim and process jobs until stopped.
+    With once=True, drain the queue and return (useful for tests and cron).
+    """
+    if app is None:
+        from app import create_app
+        app = create_app()
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    with app.app_context():
+        poll_interval = app.config['VERIFICATION_QUEUE_POLL_SECONDS']
+        if app.config.get('HASH_FILTER_ENABLED', True):
+            hash_filter.get_hash_membership().load()
+        logger.info(f"Verification worker {worker_id} started")
+        while True:
+            job = claim_next(worker_id)
+            if job is None:
+                if once:
+                    return
+                time.sleep(poll_interval)
+                continue
+            process_job(job)
+            db.session.remove()
+            get_host_health().publish()
+            get_metrics().publish()
+
+def start_worker_pool(num_workers):
+    """
+    Start num_workers worker processes. Each creates its own app and DB
+    connections, so nothing is shared across the fork.
+    Workers are not daemonic so they can run the PDF extraction process pool.
+    """
+    processes = []
+    for _ in range(num_workers):
+        p = Process(target=run_worker)
+        p.start()
+        processes.append(p)
+    return processes
@@ -1,8 +1,10 @@
-import requests
+from app.services.verification.http_client import get_session
+from app.services.verification.pattern_matcher import CertificateMatcher
 from . import analyze, hashstore, queue
 
 def verify_links(urls, cert_text, ids, candidate_names):
     results = []
+    matcher = CertificateMatcher(candidate_names, ids)
     for url in urls:
         res_dict = {
             'url': url,
@@ -11,12 +13,13 @@ def verify_links(urls, cert_text, ids, candidate_names):
             'id_match': False
         }
         try:
-            r = requests.get(url, timeout=5)
+            r = get_session().get(url, timeout=5)
             if r.status_code == 200:
                 res_dict['reachable'] = True
-                # Simple check logic could go here
                 content = r.text.lower()
-                # Determine name match ...
+                scan = matcher.match(content)
+                res_dict['name_match'] = scan.name_match
+                res_dict['id_match'] = scan.id_match
         except Exception:
             pass
         results.append(res_dict)
@@ -0,0 +1,64 @@
+"""
+Benchmark: pooled keep-alive session vs. one-shot requests.get
+
+Runs N link checks per host against a local stand-in issuer server and
+reports wall time and how many TCP connections the server accepted.
+Every connection is a handshake (TCP, plus TLS against a real issuer).
+
+Usage:
+    python benchmarks/bench_http_pool.py --checks 200 --hosts 3
+"""
+import sys
+import os
+import time
+import argparse
+
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.issuer_server import IssuerServer
+from app.services.verification.http_client import get_session, reset_session, DEFAULT_HEADERS
+
+def run(fetch, servers, checks):
+    started = time.perf_counter()
+    for i in range(checks):
+        for server in servers:
+            fetch(f"{server.base_url}/verify/CERT-{i:06d}")
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--checks', type=int, default=200, help="Checks per host")
+    parser.add_argument('--hosts', type=int, default=3, help="Number of stand-in issuer hosts")
+    args = parser.parse_args()
+
+    def one_shot(url):
+        requests.get(url, timeout=5, headers=DEFAULT_HEADERS).text
+
+    def pooled(url):
+        get_session().get(url, timeout=5).text
+
+    results = {}
+    for label, fetch in (("requests.get", one_shot), ("pooled session", pooled)):
+        reset_session()
+        servers = [IssuerServer(page_text="Asha Rao CERT-000001").__enter__() for _ in range(args.hosts)]
+        try:
+            elapsed = run(fetch, servers, args.checks)
+            connections = sum(s.connections for s in servers)
+        finally:
+            for s in servers:
+                s.__exit__(None, None, None)
+        results[label] = (elapsed, connections)
+
+    total = args.checks * args.hosts
+    print(f"{total} checks over {args.hosts} host(s), {args.checks} per host")
+    print(f"{'mode':<16} {'wall (s)':>10} {'checks/s':>10} {'connections':>12}")
+    for label, (elapsed, connections) in results.items():
+        print(f"{label:<16} {elapsed:>10.3f} {total / elapsed:>10.1f} {connections:>12}")
+
+    saved = results["requests.get"][1] - results["pooled session"][1]
+    print(f"Handshakes saved: {saved} ({saved / total:.0%} of checks)")
+
+if __name__ == '__main__':
+    main()
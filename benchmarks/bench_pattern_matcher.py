@@ -0,0 +1,76 @@
+"""
+Micro-benchmark: name/ID matching over issuer pages
+
+Compares the old per-pattern loop (one `in` scan per name part and per ID)
+with CertificateMatcher in both modes (substring scan and Aho-Corasick
+automaton) for realistic page sizes and ID counts.
+
+Usage:
+    python benchmarks/bench_pattern_matcher.py
+"""
+import sys
+import os
+import time
+import random
+import string
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.verification.pattern_matcher import CertificateMatcher, MultiPatternMatcher
+
+rng = random.Random(42)
+
+def random_id():
+    return "".join(rng.choice(string.ascii_uppercase + string.digits) for _ in range(rng.randint(10, 40)))
+
+def make_page(size):
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9))) for _ in range(3000)]
+    out, length = [], 0
+    while length < size:
+        w = rng.choice(words)
+        out.append(w)
+        length += len(w) + 1
+    return " ".join(out)
+
+def naive(page_text, candidate_names, ids):
+    # The pre-matcher URLValidator logic
+    name_match = id_match = False
+    for full_name in candidate_names:
+        parts = [p.strip().lower() for p in full_name.split() if p.strip()]
+        if parts and all(p in page_text for p in parts):
+            name_match = True
+            break
+    for i in ids:
+        if len(i) >= 6 and i.lower() in page_text:
+            id_match = True
+            break
+    return name_match, id_match
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    names = ["Asha Rao", "ASHA RAO KUMAR", "Department Of Computer"]
+    print(f"{'page':>8} {'ids':>6} {'naive (ms)':>11} {'substring (ms)':>15} {'automaton (ms)':>15}")
+    for page_kb in (50, 500, 2048):
+        page = make_page(page_kb * 1024)
+        for id_count in (30, 300, 3000):
+            ids = [random_id() for _ in range(id_count)]
+            # Same certificate, each mode forced
+            substring = CertificateMatcher(names, ids)
+            substring.matcher = MultiPatternMatcher(substring.matcher.patterns, automaton_min_patterns=10**9)
+            automaton = CertificateMatcher(names, ids)
+            automaton.matcher = MultiPatternMatcher(automaton.matcher.patterns, automaton_min_patterns=1)
+
+            t_naive = timed(lambda: naive(page, names, ids))
+            t_sub = timed(lambda: substring.match(page))
+            t_auto = timed(lambda: automaton.match(page), repeat=1)
+            print(f"{page_kb:>6}KB {id_count:>6} {t_naive * 1000:>11.1f} {t_sub * 1000:>15.1f} {t_auto * 1000:>15.1f}")
+
+if __name__ == '__main__':
+    main()
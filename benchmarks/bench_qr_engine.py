@@ -0,0 +1,95 @@
+"""
+Benchmark: QR decoding over a synthetic photo corpus
+
+Generates certificate-like photos (noisy paper, a QR code of varying module
+size in a random corner, optional blur, some without any code) and reports
+success rate and latency for:
+
+    legacy   a new cv2.QRCodeDetector per image, full resolution only
+    engine   qr_reader.decode_qr_image (downscaled -> corner ROIs -> ...)
+
+plus how often each engine pass was the one that decoded the code.
+
+Usage:
+    python benchmarks/bench_qr_engine.py [--images 40] [--width 4000]
+"""
+import sys
+import os
+import time
+import argparse
+from collections import Counter
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.verification.qr_reader import decode_qr_image
+
+def make_corpus(count, width, seed=7):
+    """[(image, expected value or None)]; every fifth image has no QR code."""
+    rng = np.random.default_rng(seed)
+    height = width * 3 // 4
+    encoder = cv2.QRCodeEncoder.create()
+    corpus = []
+    for n in range(count):
+        img = (np.full((height, width), 230, np.float32) + rng.normal(0, 10, (height, width)))
+        img = img.clip(0, 255).astype(np.uint8)
+        expected = None
+        if n % 5:
+            expected = f"https://verify.issuer.org/c/CERT{n:06d}"
+            module = int(rng.integers(3, 12))
+            code = cv2.resize(encoder.encode(expected), None, fx=module, fy=module, interpolation=cv2.INTER_NEAREST)
+            margin = int(rng.integers(40, 200))
+            y = margin if rng.random() < 0.5 else height - code.shape[0] - margin
+            x = margin if rng.random() < 0.5 else width - code.shape[1] - margin
+            img[y:y + code.shape[0], x:x + code.shape[1]] = code
+            if rng.random() < 0.3:
+                img = cv2.GaussianBlur(img, (3, 3), 0)
+        corpus.append((img, expected))
+    return corpus
+
+def legacy(img):
+    retval, decoded, _, _ = cv2.QRCodeDetector().detectAndDecodeMulti(img)
+    return [s for s in decoded if s] if retval else []
+
+def run(name, corpus, decode):
+    correct, times = 0, []
+    for img, expected in corpus:
+        started = time.perf_counter()
+        values = decode(img)
+        times.append(time.perf_counter() - started)
+        correct += (expected in values) if expected else (values == [])
+    times.sort()
+    print(f"{name:<8} success {correct}/{len(corpus)} ({correct / len(corpus):.0%})  "
+          f"mean {np.mean(times) * 1000:7.1f} ms  p50 {times[len(times) // 2] * 1000:7.1f} ms  "
+          f"max {times[-1] * 1000:7.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark QR decoding passes.")
+    parser.add_argument('--images', type=int, default=40)
+    parser.add_argument('--width', type=int, default=4000, help="Photo width in pixels")
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.images, args.width)
+    print(f"{len(corpus)} photos at {args.width}x{args.width * 3 // 4}")
+    run("legacy", corpus, legacy)
+
+    decided_by = Counter()
+    pass_ms = Counter()
+    def engine(img):
+        attempts = []
+        values = decode_qr_image(img, attempts, fast_max_side=1000, roi_fraction=0.55)
+        for a in attempts:
+            pass_ms[a["pass"]] += a["ms"]
+        decided_by[attempts[-1]["pass"] if values else "none"] += 1
+        return values
+    run("engine", corpus, engine)
+
+    print("\nengine pass    decoded  total ms")
+    for name in ("downscaled", "roi:top-left", "roi:top-right", "roi:bottom-left", "roi:bottom-right", "full", "none"):
+        if decided_by[name] or pass_ms[name]:
+            print(f"{name:<16} {decided_by[name]:>5} {pass_ms[name]:>9.0f}")
+
+if __name__ == '__main__':
+    main()
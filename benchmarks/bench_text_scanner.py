@@ -0,0 +1,113 @@
+"""
+Benchmark: certificate text parsing throughput
+
+Compares the pre-scanner parse (clean_text, two uncompiled findall passes,
+per-match cleaning, line split + blocklist scan for names) with
+text_scanner.clean_lines + scan, in MB/s over a corpus of extracted texts.
+
+By default the corpus is synthetic certificate text built from common issuer
+templates. Point --corpus at a directory of .txt files (e.g. cert_text dumped
+from verified activities) to measure on real extractions.
+
+Usage:
+    python benchmarks/bench_text_scanner.py [--corpus DIR] [--repeat 5]
+"""
+import sys
+import os
+import re
+import time
+import random
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.verification import text_scanner
+
+TEMPLATES = [
+    "Certificate of Completion\nThis is to certify that\n{name}\nhas successfully completed\n{course}\n"
+    "Certificate ID: UC-{code}\nVerify at https://www.udemy.com/certificate/UC-{code}/\nDate {date}\n",
+    "NPTEL Online Certification\n(Funded by the MoE, Govt. of India)\nThis certificate is awarded to\n{upper}\n"
+    "for successfully completing the course\n{course}\nwith a consolidated score of 78 %\n"
+    "Roll No: NPTEL23CS{digits}\nOnline Assignments 22.5/25 Proctored Exam 55.5/75\n"
+    "Jan-Apr 2023 (12 week course)\nProf. Ramesh Kumar Indian Institute of Technology Madras\n"
+    "To verify the certificate https://nptel.ac.in/noc/E_Certificate/NPTEL23CS{digits}\n",
+    "{name}\nCOURSE CERTIFICATE\n{date}\n{course}\nan online non-credit course authorized by University of Michigan "
+    "and offered through Coursera\nVerify at: https://coursera.org/verify/{code}{digits}\n"
+    "Coursera has confirmed the identity of this individual and their participation in the course.\n",
+]
+NAMES = ["Asha Rao", "Ravi Kumar Sharma", "Meera Nair", "Sofia Mathew", "John Peter Doe"]
+COURSES = ["Introduction to Machine Learning", "Data Structures and Algorithms", "Cloud Computing", "Python for Everybody"]
+
+def synthetic_corpus(count=400, seed=3):
+    rng = random.Random(seed)
+    docs = []
+    for _ in range(count):
+        name = rng.choice(NAMES)
+        doc = rng.choice(TEMPLATES).format(
+            name=name, upper=name.upper(), course=rng.choice(COURSES),
+            code="".join(rng.choice("ABCDEFGHJKLMNPQRSTUVWXYZ23456789") for _ in range(10)),
+            digits="".join(rng.choice("0123456789") for _ in range(8)),
+            date=f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-2023",
+        )
+        # Transcript-like tail on some documents
+        if rng.random() < 0.2:
+            doc += "\n".join(f"Week {w} Assignment score {rng.randint(0, 100)}/100 submitted" for w in range(1, 60))
+        docs.append(doc)
+    return docs
+
+def load_corpus(directory):
+    docs = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".txt"):
+            with open(os.path.join(directory, name), encoding="utf-8", errors="replace") as f:
+                docs.append(f.read())
+    return docs
+
+def legacy_clean_text(s):
+    return "".join(ch for ch in s if ch.isprintable()).strip()
+
+def legacy_parse(raw):
+    # ExtractTextStage + ParseStage before the scanner
+    text = legacy_clean_text(raw)
+    urls = [legacy_clean_text(u).replace(" ", "") for u in re.findall(r'(?:https?://|www\.)\S+', text)]
+    ids = [legacy_clean_text(i) for i in re.findall(r'\b[A-Za-z0-9\-]{10,40}\b', text)]
+    blocklist = ['CERTIFICATE', 'UNIVERSITY', 'PROFESSOR', 'COMPLETION', 'OF', 'THE', 'BY', 'DEPARTMENT', 'EDUCATION']
+    names = []
+    for line in text.split('\n'):
+        line = line.strip()
+        words = line.split()
+        if line and 2 <= len(words) <= 4:
+            is_title = all(w[0].isupper() and w[1:].islower() for w in words if len(w) > 1)
+            if any(b in line.upper() for b in blocklist):
+                continue
+            if is_title or line.isupper():
+                names.append(legacy_clean_text(line))
+    return urls, ids, names[:3]
+
+def scanner_parse(raw):
+    return text_scanner.scan(text_scanner.clean_lines(raw))
+
+def throughput(docs, fn, repeat):
+    size = sum(len(d.encode("utf-8")) for d in docs)
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for d in docs:
+            fn(d)
+        best = min(best, time.perf_counter() - started)
+    return size / best / 1e6, best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark certificate text parsing.")
+    parser.add_argument('--corpus', help="Directory of extracted-text .txt files")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    docs = load_corpus(args.corpus) if args.corpus else synthetic_corpus()
+    print(f"{len(docs)} documents, {sum(len(d) for d in docs) / 1e6:.2f} MB")
+    for label, fn in (("legacy", legacy_parse), ("scanner", scanner_parse)):
+        mbps, seconds = throughput(docs, fn, args.repeat)
+        print(f"{label:<8} {mbps:8.2f} MB/s  ({seconds * 1000:.1f} ms per corpus pass)")
+
+if __name__ == '__main__':
+    main()
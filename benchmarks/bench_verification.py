@@ -0,0 +1,263 @@
+"""
+Benchmark: end-to-end certificate verification throughput
+
+Generates a synthetic certificate corpus and runs VerificationService.verify
+over it against local stand-in issuer servers:
+
+    pdf    text pages (name, certificate ID, verification link) with the QR
+           code as an embedded image, plus optional filler pages
+    photo  PNG/JPG photos of a printed certificate at several resolutions,
+           QR code in a corner (text needs OCR, used when installed)
+
+Every certificate links to the issuer servers (QR and text URLs), which
+answer with configurable latency, page size and failure rate. The corpus is
+verified serially and then by --concurrency threads. For each run it reports
+certificates/sec, p50/p95/p99 per pipeline stage and URL fetch (from the
+pipeline's own histograms, see metrics.py), outcomes and peak RSS.
+
+--output writes the results as JSON; --compare prints the change against an
+earlier results file.
+
+Usage:
+    python benchmarks/bench_verification.py [--pdfs 20] [--photos 10] [--concurrency 4]
+        [--latency 0.05] [--page-size 20000] [--failure-rate 0.0]
+        [--output results.json] [--compare baseline.json]
+"""
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.issuer_server import IssuerServer
+from tests.pdf_factory import write_pdf
+from app.services.verification.verification_service import VerificationService
+from app.services.verification.fetch_cache import get_fetch_cache
+from app.services.verification.host_health import get_host_health
+from app.services.verification.metrics import get_metrics, summarize
+
+NAMES = ["Asha Rao", "Ravi Kumar Sharma", "Meera Nair", "Sofia Mathew", "John Peter Doe"]
+COURSES = ["Introduction to Machine Learning", "Data Structures and Algorithms", "Cloud Computing"]
+PHOTO_WIDTHS = (1600, 3000, 4000)
+
+def qr_code(value, module):
+    code = cv2.QRCodeEncoder.create().encode(value)
+    code = cv2.resize(code, None, fx=module, fy=module, interpolation=cv2.INTER_NEAREST)
+    return cv2.copyMakeBorder(code, 16, 16, 16, 16, cv2.BORDER_CONSTANT, value=255)
+
+def make_pdf(path, name, cert_id, qr_url, text_url, filler_pages):
+    pages = [
+        "Certificate of Completion",
+        "This is to certify that",
+        name,
+        f"has completed {random.choice(COURSES)}",
+        f"Certificate ID: {cert_id}",
+        f"Verify at {text_url}",
+    ]
+    pages += [f"Course outline part {i + 1}" for i in range(filler_pages)]
+    write_pdf(path, pages, images={0: [qr_code(qr_url, 3)]})
+
+def make_photo(path, name, cert_id, qr_url, text_url, width, rng):
+    height = width * 3 // 4
+    img = (np.full((height, width), 235, np.float32) + rng.normal(0, 8, (height, width)))
+    img = img.clip(0, 255).astype(np.uint8)
+    scale = width / 1000
+    lines = ["Certificate of Completion", name, f"Certificate ID: {cert_id}", f"Verify at {text_url}"]
+    for i, line in enumerate(lines):
+        cv2.putText(img, line, (int(80 * scale), int((120 + 90 * i) * scale)), cv2.FONT_HERSHEY_SIMPLEX,
+                    scale, 20, max(1, int(2 * scale)), cv2.LINE_AA)
+    code = qr_code(qr_url, max(3, width // 400))
+    margin = int(40 * scale)
+    img[height - code.shape[0] - margin:height - margin, width - code.shape[1] - margin:width - margin] = code
+    cv2.imwrite(path, img)
+
+def make_corpus(directory, servers, pdfs, photos, filler_pages, seed=7):
+    """[(path, kind)] written to directory; links spread over the issuer servers."""
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for n in range(pdfs + photos):
+        name = NAMES[n % len(NAMES)]
+        cert_id = f"CERT-2024-{n:06d}"
+        server = servers[n % len(servers)]
+        qr_url = f"{server.base_url}/verify/{cert_id}"
+        text_url = f"{server.base_url}/certificate/{cert_id}"
+        if n < pdfs:
+            path = os.path.join(directory, f"cert{n:04d}.pdf")
+            make_pdf(path, name, cert_id, qr_url, text_url, filler_pages)
+            kind = "pdf"
+        else:
+            width = PHOTO_WIDTHS[n % len(PHOTO_WIDTHS)]
+            ext = ".jpg" if n % 2 else ".png"
+            path = os.path.join(directory, f"photo{n:04d}_{width}{ext}")
+            make_photo(path, name, cert_id, qr_url, text_url, width, rng)
+            kind = f"photo{ext}"
+        corpus.append((path, kind))
+    return corpus
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its waited-for children (PDF pool)."""
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return round(own, 1), round(children, 1)
+
+def reset_state():
+    """Start a run with cold link caches, closed circuits and empty histograms."""
+    get_fetch_cache().clear()
+    get_host_health().clear()
+    get_metrics().clear()
+
+def run(label, corpus, concurrency):
+    reset_state()
+    service = VerificationService()
+    outcomes = Counter()
+
+    def verify(item):
+        path, kind = item
+        result = service.verify(path)
+        details = json.loads(result["auto_details"])
+        if details.get("partial"):
+            return "partial"
+        return result["verification_mode"] if result["strong_auto"] else "pending"
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        modes = [verify(item) for item in corpus]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            modes = list(pool.map(verify, corpus))
+    wall = time.perf_counter() - started
+    outcomes.update(modes)
+
+    own_rss, children_rss = peak_rss_mb()
+    return {
+        "label": label,
+        "concurrency": concurrency,
+        "certificates": len(corpus),
+        "wall_s": round(wall, 3),
+        "certs_per_s": round(len(corpus) / wall, 2),
+        "outcomes": dict(outcomes),
+        "stages": summarize([get_metrics().to_dict()]),
+        "fetch_cache": get_fetch_cache().stats(),
+        "peak_rss_mb": own_rss,
+        "peak_children_rss_mb": children_rss,
+    }
+
+def print_run(result):
+    print(f"\n== {result['label']} (concurrency {result['concurrency']}) ==")
+    print(f"{result['certificates']} certificates in {result['wall_s']:.2f} s "
+          f"-> {result['certs_per_s']:.2f} certs/s; peak RSS {result['peak_rss_mb']:.0f} MB "
+          f"(children {result['peak_children_rss_mb']:.0f} MB)")
+    print("outcomes: " + ", ".join(f"{k}={v}" for k, v in sorted(result["outcomes"].items())))
+    print(f"{'stage':<18} {'count':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)")
+    for name, s in result["stages"].items():
+        print(f"{name:<18} {s['count']:>6} {s['mean_ms']:>9.1f} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} "
+              f"{s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}")
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(baseline, current):
+    """Print the change of throughput and per-stage p95 between two results files."""
+    print(f"\n== change vs {baseline['meta'].get('commit') or 'baseline'} ==")
+    differing = sorted(k for k, v in current["meta"]["args"].items()
+                       if k not in ('output', 'compare', 'corpus_dir') and baseline["meta"]["args"].get(k) != v)
+    if differing:
+        print(f"note: runs used different settings ({', '.join(differing)}); numbers are not like for like")
+    print(f"{'run':<12} {'metric':<28} {'before':>10} {'after':>10} {'change':>8}")
+    for label, new in current["runs"].items():
+        old = baseline["runs"].get(label)
+        if old is None:
+            continue
+        rows = [("certs/s", old["certs_per_s"], new["certs_per_s"]),
+                ("peak RSS MB", old["peak_rss_mb"], new["peak_rss_mb"])]
+        for stage, stats in new["stages"].items():
+            if stage in old["stages"]:
+                rows.append((f"{stage} p95 ms", old["stages"][stage]["p95_ms"], stats["p95_ms"]))
+        for metric, before, after in rows:
+            change = f"{(after - before) / before:+.0%}" if before else "n/a"
+            print(f"{label:<12} {metric:<28} {before:>10.1f} {after:>10.1f} {change:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end certificate verification.")
+    parser.add_argument('--pdfs', type=int, default=20, help="PDF certificates in the corpus")
+    parser.add_argument('--photos', type=int, default=10, help="PNG/JPG photo certificates in the corpus")
+    parser.add_argument('--filler-pages', type=int, default=4, help="Extra text pages per PDF")
+    parser.add_argument('--hosts', type=int, default=2, help="Stand-in issuer servers")
+    parser.add_argument('--latency', type=float, default=0.05, help="Issuer response latency (s)")
+    parser.add_argument('--page-size', type=int, default=20000, help="Issuer page size (bytes)")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of issuer responses that are 503")
+    parser.add_argument('--concurrency', type=int, default=4, help="Threads for the concurrent run")
+    parser.add_argument('--corpus-dir', help="Keep the generated corpus here (default: temporary directory)")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    page_text = " ".join(NAMES)
+    servers = [IssuerServer(page_text=page_text, page_size=args.page_size, latency=args.latency,
+                            failure_rate=args.failure_rate).__enter__() for _ in range(args.hosts)]
+    tmp = None
+    try:
+        directory = args.corpus_dir
+        if directory is None:
+            tmp = tempfile.TemporaryDirectory(prefix="bench-certs-")
+            directory = tmp.name
+        os.makedirs(directory, exist_ok=True)
+        corpus = make_corpus(directory, servers, args.pdfs, args.photos, args.filler_pages)
+        kinds = Counter(kind for _, kind in corpus)
+        print(f"Corpus: {len(corpus)} certificates ({', '.join(f'{v} {k}' for k, v in sorted(kinds.items()))}) "
+              f"in {directory}")
+        print(f"Issuers: {args.hosts} server(s), latency {args.latency * 1000:.0f} ms, "
+              f"page {args.page_size} bytes, failure rate {args.failure_rate:.0%}")
+
+        runs = {}
+        for label, concurrency in (("serial", 1), ("concurrent", args.concurrency)):
+            runs[label] = run(label, corpus, concurrency)
+            print_run(runs[label])
+        connections = sum(s.connections for s in servers)
+    finally:
+        for s in servers:
+            s.__exit__(None, None, None)
+        if tmp is not None:
+            tmp.cleanup()
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": vars(args),
+            "corpus": dict(kinds),
+            "issuer_connections": connections,
+        },
+        "runs": runs,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(json.load(f), results)
+
+if __name__ == '__main__':
+    main()
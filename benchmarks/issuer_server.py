@@ -0,0 +1,73 @@
+"""
+Local stand-in for certificate issuer websites.
+
+Serves a verification page for any path, over HTTP/1.1 with keep-alive, and
+counts the TCP connections it accepts so benchmarks can show how many
+handshakes the link checker paid for.
+"""
+import sys
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class IssuerHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+
+        if server.failure_rate and random.random() < server.failure_rate:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = server.page_bytes
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class IssuerServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, page_text='', page_size=2048, latency=0.0, failure_rate=0.0):
+        super().__init__(('127.0.0.1', 0), IssuerHandler)
+        filler = '<p>Lorem ipsum dolor sit amet.</p>' * (page_size // 34 + 1)
+        self.page_bytes = f'<html><body><h1>Certificate</h1><p>{page_text}</p>{filler}</body></html>'.encode()
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.connections = 0
+        self._count_lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        # Link checks close the connection once they have what they need
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+    def process_request(self, request, client_address):
+        with self._count_lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
@@ -20,3 +20,78 @@ class Config:
     # Let's make it absolute to be safe.
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'app', 'uploads')
+
+    # Background Verification Queue
+    # When enabled, uploads are stored as 'verifying' and picked up by
+    # scripts/run_verification_workers.py instead of being verified inline.
+    VERIFICATION_ASYNC = os.getenv('VERIFICATION_ASYNC', 'true').lower() == 'true'
+    VERIFICATION_WORKERS = int(os.getenv('VERIFICATION_WORKERS', 2))
+    VERIFICATION_QUEUE_POLL_SECONDS = float(os.getenv('VERIFICATION_QUEUE_POLL_SECONDS', 2))
+    VERIFICATION_JOB_MAX_ATTEMPTS = 3
+    VERIFICATION_JOB_STALE_SECONDS = 10 * 60
+
+    # Time Budget (per certificate; see app/services/verification/budget.py)
+    VERIFICATION_BUDGET_SECONDS = float(os.getenv('VERIFICATION_BUDGET_SECONDS', 45))  # 0 = unlimited
+    VERIFICATION_BUDGET_MIN_SLICE = 0.5   # seconds; with less left no further work is started
+    VERIFICATION_CONNECT_TIMEOUT = 3.05   # per link request, capped by the time left
+    VERIFICATION_READ_TIMEOUT = 5
+
+    # Link Checking
+    VERIFICATION_LINK_MAX_WORKERS = 6  # in-flight URL checks per certificate
+    VERIFICATION_LINK_PER_HOST = 2     # in-flight URL checks per issuer host (per process)
+    VERIFICATION_HTTP_POOL_HOSTS = 32    # distinct issuer hosts kept in the connection pool
+    VERIFICATION_HTTP_POOL_MAXSIZE = 8   # keep-alive connections per host
+
+    # Issuer Page Fetch Cache
+    VERIFICATION_FETCH_CACHE_ENTRIES = 512        # in-memory LRU size
+    VERIFICATION_FETCH_CACHE_TTL = 60 * 60        # seconds
+    VERIFICATION_FETCH_CACHE_MAX_TEXT = 256 * 1024  # characters of page text kept per entry
+    # Optional shared on-disk tier (e.g. instance/fetch_cache) used by all worker processes
+    VERIFICATION_FETCH_CACHE_DIR = os.getenv('VERIFICATION_FETCH_CACHE_DIR')
+    VERIFICATION_FETCH_MAX_BYTES = 2 * 1024 * 1024  # stop reading an issuer page after this many bytes
+
+    # Issuer Host Circuit Breaker (see app/services/verification/host_health.py)
+    VERIFICATION_HOST_FAILURE_THRESHOLD = 3    # consecutive failures before a host is skipped
+    VERIFICATION_HOST_COOLDOWN_SECONDS = 120   # how long an open circuit skips the host
+    VERIFICATION_DNS_NEGATIVE_TTL = 5 * 60     # seconds a failed name lookup is remembered
+    # Where queue workers publish breaker state for the admin endpoint; must be
+    # shared by the web and worker processes
+    VERIFICATION_HOST_HEALTH_DIR = os.getenv('VERIFICATION_HOST_HEALTH_DIR', os.path.join(BASE_DIR, 'instance', 'host_health'))
+
+    # PDF Text Extraction
+    VERIFICATION_PDF_MAX_PAGES = 8           # pages read per PDF (0 = all); first and last pages kept
+    VERIFICATION_PDF_TAIL_PAGES = 2          # of those, taken from the end of the document
+    VERIFICATION_PDF_PARALLEL_MIN_PAGES = 8  # selected pages before the process pool is used
+    VERIFICATION_PDF_WORKERS = 2
+    VERIFICATION_PDF_QR_PAGES = 2        # pages whose embedded images are scanned for QR codes
+    VERIFICATION_PDF_QR_MIN_SIZE = 64    # pixels; smaller images (logos, icons) are ignored
+    VERIFICATION_PDF_QR_MAX_IMAGES = 8
+
+    # QR Decoding (see app/verification/qr_reader.py)
+    VERIFICATION_QR_FAST_MAX_SIDE = 1000  # pixels; first pass runs on a downscaled copy
+    VERIFICATION_QR_ROI_FRACTION = 0.55   # corner regions (fraction of each side), tried before the full-resolution pass
+
+    # OCR for image certificates. Optional and not in requirements.txt (both need the
+    # native Tesseract library): tesserocr, else pytesseract + the tesseract binary;
+    # without either, image certificates get no text
+    VERIFICATION_OCR_WORKERS = 2       # OCR worker processes per app process
+    VERIFICATION_OCR_TIMEOUT = 30      # seconds per image; a stuck worker is killed
+    VERIFICATION_OCR_TARGET_DPI = 300  # images are downscaled to an A4 page at this DPI
+    VERIFICATION_OCR_LANG = 'eng'
+
+    # Stage timing histograms (see app/services/verification/metrics.py);
+    # where queue workers publish theirs for the admin endpoint
+    VERIFICATION_METRICS_DIR = os.getenv('VERIFICATION_METRICS_DIR', os.path.join(BASE_DIR, 'instance', 'metrics'))
+
+    # Analytics result cache (see app/services/analytics_cache.py). Writes from any
+    # process invalidate it through the analytics_versions table; the TTL only
+    # bounds staleness when that bump fails
+    ANALYTICS_CACHE_ENABLED = True
+    ANALYTICS_CACHE_TTL_SECONDS = 60
+    ANALYTICS_CACHE_MAX_ENTRIES = 512
+
+    # In-memory verified/rejected certificate hash filter (see app/verification/hash_filter.py)
+    HASH_FILTER_ENABLED = True
+    HASH_FILTER_REFRESH_SECONDS = 5 * 60
+    # How often a miss checks whether other processes approved or rejected since the last sync
+    HASH_FILTER_VERSION_CHECK_SECONDS = 10
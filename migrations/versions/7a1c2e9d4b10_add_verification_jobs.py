@@ -0,0 +1,44 @@
+"""Add verification_jobs queue table
+
+Revision ID: 7a1c2e9d4b10
+Revises: 2bd3043d53d6
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a1c2e9d4b10'
+down_revision = '2bd3043d53d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('verification_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('activity_id', sa.Integer(), nullable=False),
+        sa.Column('file_path', sa.String(length=512), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('locked_by', sa.String(length=100), nullable=True),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['activity_id'], ['student_activities.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('verification_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_verification_jobs_activity_id'), ['activity_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_verification_jobs_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('verification_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_verification_jobs_status'))
+        batch_op.drop_index(batch_op.f('ix_verification_jobs_activity_id'))
+
+    op.drop_table('verification_jobs')
@@ -0,0 +1,37 @@
+"""Add extraction_cache table
+
+Revision ID: 9d4e6b3a1f27
+Revises: 7a1c2e9d4b10
+Create Date: 2026-10-17 11:03:52.640117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4e6b3a1f27'
+down_revision = '7a1c2e9d4b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('extraction_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('file_hash', sa.String(length=64), nullable=False),
+        sa.Column('extractor_version', sa.String(length=20), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('file_hash', 'extractor_version', name='uq_extraction_cache_hash_version')
+    )
+    with op.batch_alter_table('extraction_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_extraction_cache_file_hash'), ['file_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('extraction_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_extraction_cache_file_hash'))
+
+    op.drop_table('extraction_cache')
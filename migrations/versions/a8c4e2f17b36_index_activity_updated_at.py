@@ -0,0 +1,27 @@
+"""Index student_activities.updated_at
+
+Revision ID: a8c4e2f17b36
+Revises: e5b1d7c94a02
+Create Date: 2026-10-17 18:04:51.227306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8c4e2f17b36'
+down_revision = 'e5b1d7c94a02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The hash filter reads max(updated_at) before trusting a miss
+    with op.batch_alter_table('student_activities', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_student_activities_updated_at'), ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('student_activities', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_student_activities_updated_at'))
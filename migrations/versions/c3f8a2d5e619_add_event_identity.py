@@ -0,0 +1,43 @@
+"""Add persisted event_identity to student_activities
+
+Revision ID: c3f8a2d5e619
+Revises: 9d4e6b3a1f27
+Create Date: 2026-10-17 15:22:08.413920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a2d5e619'
+down_revision = '9d4e6b3a1f27'
+branch_labels = None
+depends_on = None
+
+
+# Same rule as app.models.event_identity, which maintains the column from now on
+BACKFILL = """
+UPDATE student_activities SET event_identity = CASE
+    WHEN activity_type_id IS NOT NULL
+        THEN 'TYPE-' || CAST(activity_type_id AS VARCHAR) || '-' || COALESCE(CAST(start_date AS VARCHAR), 'nodate')
+    ELSE 'CUSTOM-' || COALESCE(custom_category, 'other') || '-' || LOWER(TRIM(title)) || '-'
+        || COALESCE(CAST(start_date AS VARCHAR), 'nodate')
+END
+"""
+
+
+def upgrade():
+    with op.batch_alter_table('student_activities', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('event_identity', sa.String(length=512), nullable=True))
+
+    op.execute(BACKFILL)
+
+    with op.batch_alter_table('student_activities', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_student_activities_event_identity'), ['event_identity'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('student_activities', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_student_activities_event_identity'))
+        batch_op.drop_column('event_identity')
@@ -0,0 +1,28 @@
+"""Add analytics_versions shared by the analytics result caches
+
+Revision ID: d2f6b8a3c571
+Revises: a8c4e2f17b36
+Create Date: 2026-10-17 19:12:37.480215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f6b8a3c571'
+down_revision = 'a8c4e2f17b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analytics_versions',
+        sa.Column('scope', sa.String(length=120), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('scope')
+    )
+
+
+def downgrade():
+    op.drop_table('analytics_versions')
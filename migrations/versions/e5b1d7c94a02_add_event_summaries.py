@@ -0,0 +1,82 @@
+"""Add event_summaries rollup table
+
+Revision ID: e5b1d7c94a02
+Revises: c3f8a2d5e619
+Create Date: 2026-10-17 16:40:31.205874
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b1d7c94a02'
+down_revision = 'c3f8a2d5e619'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('event_summaries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_identity', sa.String(length=512), nullable=False),
+        sa.Column('department', sa.String(length=100), nullable=False),
+        sa.Column('batch_year', sa.String(length=20), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('activity_type_id', sa.Integer(), nullable=True),
+        sa.Column('custom_category', sa.String(length=100), nullable=True),
+        sa.Column('title', sa.String(length=200), nullable=True),
+        sa.Column('event_date', sa.Date(), nullable=True),
+        sa.Column('participations', sa.Integer(), nullable=False),
+        sa.Column('unique_students', sa.Integer(), nullable=False),
+        sa.Column('new_students', sa.Integer(), nullable=False),
+        sa.Column('verified_count', sa.Integer(), nullable=False),
+        sa.Column('pending_count', sa.Integer(), nullable=False),
+        sa.Column('rejected_count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('event_identity', 'department', 'batch_year', 'year', name='uq_event_summaries_key')
+    )
+    with op.batch_alter_table('event_summaries', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_event_summaries_event_identity'), ['event_identity'], unique=False)
+        batch_op.create_index(batch_op.f('ix_event_summaries_year'), ['year'], unique=False)
+
+    # Populate from existing activities (same query as app.models.rebuild_event_summaries)
+    activities = sa.table('student_activities', sa.column('id'), sa.column('student_id'), sa.column('event_identity'),
+                          sa.column('activity_type_id'), sa.column('custom_category'), sa.column('title'),
+                          sa.column('status'), sa.column('start_date', sa.Date), sa.column('created_at', sa.DateTime))
+    users = sa.table('users', sa.column('id'), sa.column('department'), sa.column('batch_year'))
+    summaries = sa.table('event_summaries', *(sa.column(name) for name in (
+        'event_identity', 'department', 'batch_year', 'year', 'activity_type_id', 'custom_category', 'title',
+        'event_date', 'participations', 'unique_students', 'new_students', 'verified_count', 'pending_count',
+        'rejected_count')))
+
+    event_date = sa.func.coalesce(activities.c.start_date, sa.func.date(activities.c.created_at))
+    year = sa.func.coalesce(sa.extract('year', event_date), 0)
+    key = (activities.c.event_identity, sa.func.coalesce(users.c.department, ''),
+           sa.func.coalesce(users.c.batch_year, ''), year)
+    first_years = sa.select(activities.c.event_identity, activities.c.student_id, sa.func.min(year).label('year')) \
+        .group_by(activities.c.event_identity, activities.c.student_id).subquery()
+    status = activities.c.status
+    rollup = sa.select(
+        *key,
+        sa.func.max(activities.c.activity_type_id), sa.func.max(activities.c.custom_category),
+        sa.func.max(activities.c.title), sa.func.max(event_date),
+        sa.func.count(activities.c.id), sa.func.count(sa.distinct(activities.c.student_id)),
+        sa.func.count(sa.distinct(sa.case((year == first_years.c.year, activities.c.student_id)))),
+        sa.func.sum(sa.case((status.in_(('faculty_verified', 'auto_verified')), 1), else_=0)),
+        sa.func.sum(sa.case((status == 'pending', 1), else_=0)),
+        sa.func.sum(sa.case((status == 'rejected', 1), else_=0))
+    ).select_from(activities.join(users, activities.c.student_id == users.c.id).join(
+        first_years, (first_years.c.event_identity == activities.c.event_identity)
+        & (first_years.c.student_id == activities.c.student_id))) \
+     .where(activities.c.event_identity.isnot(None)) \
+     .group_by(*key)
+    op.execute(summaries.insert().from_select([c.name for c in summaries.columns], rollup))
+
+
+def downgrade():
+    with op.batch_alter_table('event_summaries', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_event_summaries_year'))
+        batch_op.drop_index(batch_op.f('ix_event_summaries_event_identity'))
+
+    op.drop_table('event_summaries')
@@ -0,0 +1,43 @@
+"""
+Verification Worker Runner
+Starts the background worker processes that drain the verification_jobs queue
+"""
+
+import sys
+import os
+import logging
+import argparse
+
+# Add parent dir to path to import app
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from app.verification import queue
+
+def main():
+    parser = argparse.ArgumentParser(description="Run certificate verification workers.")
+    parser.add_argument('--workers', type=int, default=Config.VERIFICATION_WORKERS,
+                        help="Number of worker processes")
+    parser.add_argument('--once', action='store_true',
+                        help="Drain the queue in this process and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(processName)s %(levelname)s %(message)s')
+
+    if args.once:
+        queue.run_worker(once=True)
+        return 0
+
+    print(f"🔧 Starting {args.workers} verification worker(s)...")
+    processes = queue.start_worker_pool(args.workers)
+    try:
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        print("Stopping workers...")
+        for p in processes:
+            p.terminate()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
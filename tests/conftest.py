@@ -0,0 +1,25 @@
+import pytest
+from config import Config
+from app import create_app
+from app.models import db
+from app.verification.hash_filter import reset_hash_membership
+from app.services.analytics_cache import reset_analytics_cache
+
+class SqliteTestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    WTF_CSRF_ENABLED = False
+    # Tests that publish snapshots pass their own directory
+    VERIFICATION_HOST_HEALTH_DIR = None
+    VERIFICATION_METRICS_DIR = None
+
+@pytest.fixture
+def app():
+    app = create_app(SqliteTestConfig)
+    reset_hash_membership()
+    reset_analytics_cache()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
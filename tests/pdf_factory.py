@@ -0,0 +1,71 @@
+"""Minimal hand-written PDFs for extraction tests (one text line per page, optional images)."""
+import zlib
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def _image_object(img, encoding):
+    """Grayscale uint8 array -> image XObject dictionary + stream bytes."""
+    height, width = img.shape
+    if encoding == "jpeg":
+        import cv2
+        data = cv2.imencode(".jpg", img)[1].tobytes()
+        return b"/Filter /DCTDecode /ColorSpace /DeviceGray /BitsPerComponent 8", width, height, data
+    if encoding == "bits":
+        import numpy as np
+        data = zlib.compress(np.packbits(img > 127, axis=1).tobytes())
+        return b"/Filter /FlateDecode /ColorSpace /DeviceGray /BitsPerComponent 1", width, height, data
+    data = zlib.compress(img.tobytes())
+    return b"/Filter /FlateDecode /ColorSpace /DeviceGray /BitsPerComponent 8", width, height, data
+
+def build_pdf(page_texts, images=None, encoding="flate"):
+    """
+    Return the bytes of a PDF whose page i shows page_texts[i] in Helvetica.
+    images maps a page index to grayscale uint8 arrays drawn on that page.
+    """
+    images = images or {}
+    objects = []  # index 0 -> object 1
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(None)
+    pages = add(None)
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    kids = []
+    for index, text in enumerate(page_texts):
+        stream = f"BT /F1 12 Tf 72 720 Td ({_escape(text)}) Tj ET".encode("latin-1")
+        xobjects = b""
+        for n, img in enumerate(images.get(index, [])):
+            header, width, height, data = _image_object(img, encoding)
+            ref = add(b"<< /Type /XObject /Subtype /Image /Width %d /Height %d %s /Length %d >>\nstream\n%s\nendstream"
+                      % (width, height, header, len(data), data))
+            xobjects += b"/Im%d %d 0 R " % (n, ref)
+            stream += b"\nq %d 0 0 %d 72 400 cm /Im%d Do Q" % (width, height, n)
+        content = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        kids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> /XObject << %s>> >> /Contents %d 0 R >>"
+            % (pages, font, xobjects, content)
+        ))
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages
+    objects[pages - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for num, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (num, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for off in offsets:
+        out += b"%010d 00000 n \n" % off
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+def write_pdf(path, page_texts, images=None, encoding="flate"):
+    with open(path, "wb") as f:
+        f.write(build_pdf(page_texts, images, encoding))
+    return str(path)
@@ -0,0 +1,98 @@
+from werkzeug.security import generate_password_hash
+from app.models import db, User, StudentActivity, ActivityType
+from app.services.analytics_cache import DataVersions, get_analytics_cache
+from app.services.analytics_service import AnalyticsService
+from tests.test_analytics_kpis import query_log, activities
+
+def kpis(filters=None):
+    return AnalyticsService.get_institution_kpis(filters)
+
+class TestResultCache:
+    def test_repeated_calls_hit(self, activities, query_log):
+        first = kpis({'year': 2024})
+        second = kpis({'year': '2024', 'department': None})
+
+        assert second == first
+        assert len(query_log) == 1
+        stats = get_analytics_cache().stats()
+        assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    def test_write_invalidates_its_department(self, activities, query_log):
+        kpis(), kpis({'department': 'CSE'}), kpis({'department': 'ECE'})
+        activity = StudentActivity.query.filter_by(status='rejected').one()  # Asha, CSE
+        activity.status = 'faculty_verified'
+        db.session.commit()
+        query_log.clear()
+
+        assert kpis({'department': 'ECE'})["verified_rate"] == 0.0
+        assert len(query_log) == 0
+        assert kpis({'department': 'CSE'})["verified_rate"] == 80.0
+        assert kpis()["verified_rate"] == 66.7
+        assert len(query_log) == 2
+
+    def test_irrelevant_update_keeps_entries(self, activities, query_log):
+        kpis()
+        StudentActivity.query.first().faculty_comment = 'Looks fine'
+        db.session.commit()
+        query_log.clear()
+
+        kpis()
+        assert len(query_log) == 0
+
+    def test_other_process_write_invalidates(self, activities, query_log):
+        kpis({'department': 'CSE'}), kpis({'department': 'ECE'})
+        cache = get_analytics_cache()
+        own_versions, cache.versions = cache.versions, DataVersions()  # written by a worker process
+        activity = StudentActivity.query.filter_by(status='rejected').one()  # Asha, CSE
+        activity.status = 'faculty_verified'
+        db.session.commit()
+        cache.versions = own_versions
+        query_log.clear()
+
+        assert kpis({'department': 'ECE'})["verified_rate"] == 0.0
+        assert len(query_log) == 0
+        assert kpis({'department': 'CSE'})["verified_rate"] == 80.0
+        assert len(query_log) == 1
+
+    def test_activity_type_change_invalidates_all(self, activities):
+        kpis({'department': 'ECE'})
+        ActivityType.query.one().name = 'Hackathon 2024'
+        db.session.commit()
+
+        kpis({'department': 'ECE'})
+        assert get_analytics_cache().stats()["hits"] == 0
+
+    def test_bounded_and_expiring(self, app, activities, monkeypatch):
+        monkeypatch.setitem(app.config, "ANALYTICS_CACHE_MAX_ENTRIES", 2)
+        for department in ('CSE', 'ECE', 'MECH'):
+            kpis({'department': department})
+        assert get_analytics_cache().stats()["entries"] == 2
+        assert get_analytics_cache().stats()["evictions"] == 1
+
+        monkeypatch.setitem(app.config, "ANALYTICS_CACHE_TTL_SECONDS", 0)
+        kpis({'department': 'MECH'})
+        assert get_analytics_cache().stats()["expired"] == 1
+
+class TestRoleScope:
+    def get(self, app, user, url):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["_user_id"] = str(user.id)
+        with app.app_context():  # fresh g, as for a request served on its own
+            return client.get(url).get_json()
+
+    def test_admins_share_students_do_not(self, app, activities):
+        admins = [User(email=f"admin{i}@college.edu", password_hash=generate_password_hash("x"), role="admin",
+                       full_name="Admin") for i in range(2)]
+        db.session.add_all(admins)
+        db.session.commit()
+        asha = User.query.filter_by(email='asha@college.edu').one()
+
+        first = self.get(app, admins[0], "/analytics/api/kpis?year=2024")
+        second = self.get(app, admins[1], "/analytics/api/kpis?year=2024")
+        own = self.get(app, asha, "/analytics/api/kpis?year=2024")
+
+        assert second == first
+        assert own["total_participations"] < first["total_participations"]
+        stats = self.get(app, admins[0], "/analytics/api/cache-stats")
+        assert (stats["hits"], stats["misses"]) == (1, 2)
@@ -0,0 +1,100 @@
+from datetime import date
+import pytest
+from sqlalchemy import event
+from app.models import db, User, StudentActivity, ActivityType
+from app.services.analytics_service import AnalyticsService
+
+@pytest.fixture
+def query_log(app):
+    statements = []
+    def record(conn, cursor, statement, *args):
+        # Result cache bookkeeping, not an analytics query
+        if "analytics_versions" not in statement:
+            statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
+
+@pytest.fixture
+def activities(app):
+    asha = User(email='asha@college.edu', password_hash='x', full_name='Asha Rao', department='CSE', batch_year='2024')
+    ravi = User(email='ravi@college.edu', password_hash='x', full_name='Ravi Kumar', department='CSE', batch_year='2025')
+    meera = User(email='meera@college.edu', password_hash='x', full_name='Meera Nair', department='ECE', batch_year='2024')
+    gone = User(email='gone@college.edu', password_hash='x', full_name='Old Student', department='CSE', is_active=False)
+    hackathon = ActivityType(name='Hackathon')
+    db.session.add_all([asha, ravi, meera, gone, hackathon])
+    db.session.commit()
+
+    def add(student, status, type_id=None, title='Workshop', start=date(2024, 3, 1)):
+        db.session.add(StudentActivity(student_id=student.id, activity_type_id=type_id, title=title,
+                                       custom_category=None if type_id else 'Seminar', start_date=start,
+                                       certificate_file='c.pdf', status=status))
+
+    # One hackathon event (same type and date) attended by three students
+    add(asha, 'faculty_verified', hackathon.id)
+    add(ravi, 'auto_verified', hackathon.id)
+    add(meera, 'pending', hackathon.id)
+    # Custom events: identity is category + normalized title + date
+    add(asha, 'rejected', title='AI Workshop')
+    add(ravi, 'faculty_verified', title=' ai workshop ')
+    add(asha, 'pending', title='AI Workshop', start=None)
+    db.session.commit()
+
+class TestInstitutionKpis:
+    def test_values(self, activities):
+        assert AnalyticsService.get_institution_kpis() == {
+            "total_students": 3,
+            "total_events": 3,
+            "total_participations": 6,
+            "unique_students": 3,
+            "engagement_rate": 100.0,
+            "avg_activities_per_student": 2.0,
+            "verified_rate": 50.0
+        }
+
+    def test_department_filter(self, activities):
+        kpis = AnalyticsService.get_institution_kpis({'department': 'CSE'})
+
+        assert kpis["total_students"] == 2
+        assert kpis["total_events"] == 3
+        assert kpis["total_participations"] == 5
+        assert kpis["unique_students"] == 2
+        assert kpis["verified_rate"] == 60.0
+
+    def test_empty_scope(self, app):
+        kpis = AnalyticsService.get_institution_kpis({'department': 'MECH'})
+
+        assert kpis == {"total_students": 0, "total_events": 0, "total_participations": 0, "unique_students": 0,
+                        "engagement_rate": 0, "avg_activities_per_student": 0, "verified_rate": 0}
+
+    def test_single_query(self, activities, query_log):
+        AnalyticsService.get_institution_kpis({'department': 'CSE', 'year': 2024})
+
+        assert len(query_log) == 1
+
+class TestEventIdentity:
+    def test_maintained_on_insert_and_update(self, activities):
+        rows = StudentActivity.query.order_by(StudentActivity.id).all()
+        assert rows[0].event_identity == f"TYPE-{rows[0].activity_type_id}-2024-03-01"
+        assert rows[3].event_identity == rows[4].event_identity == "CUSTOM-Seminar-ai workshop-2024-03-01"
+        assert rows[5].event_identity == "CUSTOM-Seminar-ai workshop-nodate"
+
+        rows[4].title = 'ML Workshop'
+        db.session.commit()
+        assert rows[4].event_identity == "CUSTOM-Seminar-ml workshop-2024-03-01"
+
+    def test_matches_migration_backfill(self, activities):
+        from importlib import import_module
+        backfill = import_module("migrations.versions.c3f8a2d5e619_add_event_identity").BACKFILL
+        maintained = [a.event_identity for a in StudentActivity.query.order_by(StudentActivity.id)]
+
+        db.session.execute(db.text("UPDATE student_activities SET event_identity = NULL"))
+        db.session.execute(db.text(backfill))
+        db.session.expire_all()
+
+        assert [a.event_identity for a in StudentActivity.query.order_by(StudentActivity.id)] == maintained
+
+    def test_drilldown_filters_on_column(self, activities, query_log):
+        identity = "CUSTOM-Seminar-ai workshop-2024-03-01"
+        assert AnalyticsService._get_base_query({'event_identity': identity}).count() == 2
+        assert "student_activities.event_identity = " in query_log[-1]
@@ -0,0 +1,41 @@
+from app.services.analytics_memo import memo_scope, canonical_filters
+from app.services.analytics_service import AnalyticsService
+from tests.test_analytics_kpis import query_log, activities
+
+class TestMemoScope:
+    def test_no_scope_recomputes(self, app, activities, query_log, monkeypatch):
+        monkeypatch.setitem(app.config, "ANALYTICS_CACHE_ENABLED", False)
+        AnalyticsService.get_institution_kpis()
+        AnalyticsService.get_institution_kpis()
+
+        assert len(query_log) == 2
+
+    def test_nested_calls_share_results(self, activities, query_log):
+        with memo_scope() as scope:
+            AnalyticsService.get_admin_insights({'year': 2024})
+            queries = len(query_log)
+            kpis = AnalyticsService.get_institution_kpis({'year': '2024', 'department': None})
+
+        assert len(query_log) == queries
+        assert kpis == AnalyticsService.get_institution_kpis({'year': 2024})
+        assert scope.stats() == {"computed": 5, "saved": 1}
+
+    def test_results_are_copies(self, activities):
+        with memo_scope():
+            AnalyticsService.get_institution_kpis()["total_events"] = 99
+            assert AnalyticsService.get_institution_kpis()["total_events"] == 3
+
+    def test_snapshot_export(self, activities):
+        with memo_scope() as scope:
+            AnalyticsService.generate_snapshot_export({'year': 2024})
+
+        # KPIs for the sheet, insights and the comparison's current year are computed once
+        assert scope.saved == 2
+
+class TestCanonicalFilters:
+    def test_equivalent_filters(self):
+        assert canonical_filters({'year': '2024', 'event_type_id': 3, 'verified_only': False, 'department': ''}) \
+            == canonical_filters({'activity_type_id': '3', 'year': 2024})
+
+    def test_distinct_filters(self):
+        assert canonical_filters({'department': 'CSE'}) != canonical_filters({'department': 'ECE'})
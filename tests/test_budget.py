@@ -0,0 +1,155 @@
+import json
+import time
+import numpy as np
+import pytest
+import requests
+from config import Config
+from app.services.verification import fetch_cache, host_health, pdf_extractor
+from app.services.verification.budget import VerificationBudget, BudgetExhausted, BUDGET_EXHAUSTED
+from app.services.verification.pipeline import Pipeline, Stage, VerificationContext
+from app.services.verification.verification_service import VerificationService, PARTIAL_REASON
+from app.services.verification.url_validator import URLValidator
+from app.verification.qr_reader import decode_qr_image
+from tests.pdf_factory import write_pdf
+from tests.test_url_validator import ChunkedResponse
+from tests.test_verification_pipeline import certificate, QR_URL
+
+class SleepStage(Stage):
+    name = "sleep"
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def run(self, ctx):
+        time.sleep(self.seconds)
+
+class RecordStage(Stage):
+    name = "record"
+
+    def __init__(self):
+        self.ran = False
+
+    def run(self, ctx):
+        self.ran = True
+
+class CancelStage(Stage):
+    name = "cancel"
+
+    def run(self, ctx):
+        raise BudgetExhausted("2 of 3 links not checked")
+
+class TestBudget:
+    def test_unlimited(self):
+        budget = VerificationBudget(0)
+        assert budget.remaining() == float('inf')
+        assert not budget.exhausted
+        assert budget.http_timeouts() == (Config.VERIFICATION_CONNECT_TIMEOUT, Config.VERIFICATION_READ_TIMEOUT)
+
+    def test_timeouts_capped_by_time_left(self):
+        budget = VerificationBudget(2, min_slice=0.1)
+        connect, read = budget.http_timeouts()
+        assert connect <= 2 and read <= 2
+        assert budget.timeout(30) <= 2
+
+    def test_exhausted_budget_refuses_work(self):
+        budget = VerificationBudget(0.05, min_slice=0.1)
+        assert budget.exhausted
+        with pytest.raises(BudgetExhausted):
+            budget.http_timeouts()
+
+class TestPipelineBudget:
+    def test_no_stage_starts_after_the_budget(self):
+        after = RecordStage()
+        ctx = VerificationContext("cert.png", budget=VerificationBudget(0.3, min_slice=0.1))
+
+        Pipeline([SleepStage(0.3), after]).run(ctx)
+
+        assert not after.ran
+        assert ctx.partial
+        assert ctx.stage_log[-1] == {"stage": "record", "cost": "cpu", "status": "skipped",
+                                     "reason": BUDGET_EXHAUSTED}
+
+    def test_cancelled_stage_is_logged(self):
+        ctx = VerificationContext("cert.png", budget=VerificationBudget(0))
+
+        Pipeline([CancelStage(), RecordStage()]).run(ctx)
+
+        assert ctx.partial
+        assert ctx.stage_log[0]["status"] == "cancelled"
+        assert ctx.stage_log[0]["reason"] == "2 of 3 links not checked"
+        assert ctx.stage_log[1]["status"] == "ran"
+
+class TestPartialVerification:
+    def test_partial_result_goes_to_faculty(self, certificate, monkeypatch):
+        def slow_check_urls(urls, names, ids, budget=None, **kwargs):
+            time.sleep(0.6)
+            return [None] * len(urls)
+        monkeypatch.setattr(URLValidator, "check_urls", staticmethod(slow_check_urls))
+
+        result = VerificationService(budget_seconds=1).verify("cert.png")
+        details = json.loads(result["auto_details"])
+
+        assert result["strong_auto"] is False
+        assert result["auto_decision"] == PARTIAL_REASON
+        assert details["partial"] is True
+        assert details["budget"]["exhausted"] is True
+        stages = {s["stage"]: s for s in details["stages"]}
+        assert stages["check_qr_links"]["status"] == "cancelled"
+        assert stages["check_text_links"]["reason"] == BUDGET_EXHAUSTED
+
+    def test_strong_match_found_in_time_is_kept(self, certificate):
+        result = VerificationService(budget_seconds=30).verify("cert.png")
+        details = json.loads(result["auto_details"])
+
+        assert result["strong_auto"] is True
+        assert details["partial"] is False
+
+class TestBoundedWork:
+    @pytest.fixture(autouse=True)
+    def fresh_state(self, monkeypatch):
+        monkeypatch.setattr(fetch_cache, "_cache", fetch_cache.FetchCache())
+        monkeypatch.setattr(host_health, "_health", host_health.HostHealth())
+
+    def test_request_timeouts_come_from_the_budget(self, monkeypatch):
+        seen = []
+        class FakeSession:
+            def get(self, url, **kwargs):
+                seen.append(kwargs["timeout"])
+                return ChunkedResponse([b"Asha Rao"])
+        monkeypatch.setattr("app.services.verification.url_validator.get_session", lambda: FakeSession())
+
+        URLValidator.check_urls([QR_URL], ["Asha Rao"], [], budget=VerificationBudget(2, min_slice=0.1))
+
+        connect, read = seen[0]
+        assert 0 < connect <= 2 and 0 < read <= 2
+
+    def test_capped_timeout_is_not_a_host_failure(self, monkeypatch):
+        class FakeSession:
+            def get(self, url, **kwargs):
+                raise requests.ReadTimeout("read timed out")
+        monkeypatch.setattr("app.services.verification.url_validator.get_session", lambda: FakeSession())
+
+        for _ in range(3):
+            with pytest.raises(BudgetExhausted, match="timed out"):
+                URLValidator.check_url_with_text(QR_URL, ["Asha Rao"], [], budget=VerificationBudget(2, min_slice=0.1))
+
+        assert host_health.get_host_health().snapshot()["verify.issuer.org"]["failures"] == 0
+        # Uncapped, the same timeout is the host's fault
+        URLValidator.check_url_with_text(QR_URL, ["Asha Rao"], [], budget=VerificationBudget(60))
+        assert host_health.get_host_health().snapshot()["verify.issuer.org"]["failures"] == 1
+
+    def test_unstarted_links_are_none(self):
+        checks = URLValidator.check_urls(["https://a.org/1", "https://b.org/2"], [], [],
+                                         budget=VerificationBudget(0.01, min_slice=0.1))
+        assert checks == [None, None]
+
+    def test_pdf_pages_stop_at_deadline(self, tmp_path):
+        path = str(tmp_path / "long.pdf")
+        write_pdf(path, [f"Page {i}" for i in range(4)])
+
+        with pytest.raises(BudgetExhausted, match="read 0 of 4"):
+            pdf_extractor.extract_text(path, workers=1, deadline=time.monotonic())
+
+    def test_qr_passes_stop_at_deadline(self):
+        with pytest.raises(BudgetExhausted):
+            decode_qr_image(np.zeros((100, 100), dtype=np.uint8), deadline=time.monotonic())
@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+import pytest
+from app.services.verification import ocr, pdf_extractor
+from app.services.verification.document import DecodedDocument
+from app.services.verification.url_validator import URLValidator
+from app.services.verification.verification_service import VerificationService
+from tests.pdf_factory import write_pdf
+
+QR_URL = "https://verify.issuer.org/c/ABC123XYZ9"
+
+def qr_photo(size=(1500, 2000)):
+    img = np.full(size, 230, np.uint8)
+    code = cv2.resize(cv2.QRCodeEncoder.create().encode(QR_URL), None, fx=12, fy=12, interpolation=cv2.INTER_NEAREST)
+    img[100:100 + code.shape[0], 100:100 + code.shape[1]] = code
+    return img
+
+@pytest.fixture
+def offline(monkeypatch):
+    monkeypatch.setattr(URLValidator, "check_urls", staticmethod(
+        lambda urls, names, ids, **kwargs: [{"url": u, "reachable": False, "status_code": None,
+                                             "name_match": False, "id_match": False, "error": "offline"} for u in urls]
+    ))
+
+def test_image_decoded_once_for_qr_and_ocr(tmp_path, monkeypatch, offline):
+    path = str(tmp_path / "cert.png")
+    cv2.imwrite(path, qr_photo())
+
+    decodes = []
+    real_imdecode = cv2.imdecode
+    monkeypatch.setattr(cv2, "imdecode", lambda *a: decodes.append(1) or real_imdecode(*a))
+    monkeypatch.setattr(cv2, "imread", lambda *a: pytest.fail("file decoded again"))
+    monkeypatch.setattr(ocr, "_available", True)
+    # Runs in an OCR worker process: report the input shape through the text
+    monkeypatch.setattr(ocr, "_recognize", lambda img, timeout, lang: f"Asha Rao\nocr input {img.shape}")
+
+    try:
+        result = VerificationService().verify(path)
+    finally:
+        ocr.shutdown_pool()
+
+    assert len(decodes) == 1
+    assert result["urls"] == [QR_URL]
+    assert "ocr input (1500, 2000)" in result["cert_text"]
+
+def test_pdf_parsed_once_for_text_and_images(tmp_path, monkeypatch, offline):
+    path = write_pdf(tmp_path / "cert.pdf", ["Awarded to Asha Rao"], images={0: [qr_photo((600, 600))]})
+    monkeypatch.setattr(pdf_extractor, "PdfReader", lambda *a: pytest.fail("PDF parsed again"))
+
+    result = VerificationService().verify(path)
+
+    assert result["cert_text"] == "Awarded to Asha Rao"
+    assert result["urls"] == [QR_URL]
+
+def test_variants_are_cached_and_released(tmp_path):
+    path = str(tmp_path / "cert.png")
+    cv2.imwrite(path, np.full((400, 800), 255, np.uint8))
+    doc = DecodedDocument(path)
+
+    assert doc.gray.shape == (400, 800)
+    assert doc._raw is None  # compressed bytes dropped once pixels exist
+    assert doc.downscaled(200) is doc.downscaled(200)
+    assert doc.downscaled(200).shape == (100, 200)
+    assert doc.downscaled(1000) is doc.gray
+
+    doc.release()
+    assert doc._gray is None and not doc._downscaled
+    assert doc.gray.shape == (400, 800)
+
+def test_undecodable_image(tmp_path):
+    path = tmp_path / "cert.jpg"
+    path.write_bytes(b"not an image")
+    doc = DecodedDocument(str(path))
+
+    assert doc.gray is None
+    assert doc.downscaled(100) is None
@@ -0,0 +1,125 @@
+import pytest
+from datetime import date, datetime
+from flask import current_app
+from app.models import db, User, ActivityType, StudentActivity, EventSummary, rebuild_event_summaries
+from app.services.analytics_service import AnalyticsService
+from tests.test_analytics_kpis import query_log, activities
+
+def rows():
+    return sorted(tuple(r) for r in db.session.query(
+        EventSummary.event_identity, EventSummary.department, EventSummary.batch_year, EventSummary.participations,
+        EventSummary.unique_students, EventSummary.verified_count, EventSummary.pending_count,
+        EventSummary.rejected_count))
+
+def live_summary(monkeypatch, filters):
+    with monkeypatch.context() as m:
+        m.setattr(AnalyticsService, "_can_use_event_summaries", staticmethod(lambda filters=None: False))
+        m.setitem(current_app.config, "ANALYTICS_CACHE_ENABLED", False)
+        return AnalyticsService._get_event_summary_list(filters)
+
+def by_title(summary):
+    return sorted(summary, key=lambda e: e["Event Title"])
+
+class TestIncrementalMaintenance:
+    def test_matches_rebuild(self, activities):
+        maintained = rows()
+        rebuild_event_summaries(db.session.connection())
+
+        assert rows() == maintained
+        workshop = [r for r in maintained if r[0] == "CUSTOM-Seminar-ai workshop-2024-03-01"]
+        assert workshop == [("CUSTOM-Seminar-ai workshop-2024-03-01", "CSE", "2024", 1, 1, 0, 0, 1),
+                            ("CUSTOM-Seminar-ai workshop-2024-03-01", "CSE", "2025", 1, 1, 1, 0, 0)]
+
+    def test_status_change_title_change_and_delete(self, activities):
+        first, _, third, rejected, *_ = StudentActivity.query.order_by(StudentActivity.id).all()
+        third.status = 'faculty_verified'
+        rejected.title = 'ML Workshop'
+        db.session.delete(first)
+        db.session.commit()
+        maintained = rows()
+
+        rebuild_event_summaries(db.session.connection())
+        assert rows() == maintained
+        assert ("CUSTOM-Seminar-ml workshop-2024-03-01", "CSE", "2024", 1, 1, 0, 0, 1) in maintained
+
+    def test_activity_type_delete(self, activities):
+        # Its activities lose activity_type_id in the flush and become custom events
+        activity_type = db.session.get(ActivityType, StudentActivity.query.filter(
+            StudentActivity.activity_type_id.isnot(None)).first().activity_type_id)
+        db.session.delete(activity_type)
+        db.session.commit()
+        maintained = rows()
+
+        rebuild_event_summaries(db.session.connection())
+        assert rows() == maintained
+        assert not any(r[0].startswith(f"TYPE-{activity_type.id}-") for r in maintained)
+
+    def test_student_department_change(self, activities):
+        asha = User.query.filter_by(email='asha@college.edu').one()
+        asha.department = 'EEE'
+        db.session.commit()
+
+        assert {r[1] for r in rows() if r[2] == "2024"} == {"ECE", "EEE"}
+
+    def test_status_change_is_applied_as_a_delta(self, activities, query_log):
+        activity = StudentActivity.query.filter_by(status='pending', start_date=None).one()
+        query_log.clear()
+        activity.status = 'faculty_verified'
+        db.session.commit()
+
+        writes = [q for q in query_log if "event_summaries" in q]
+        assert len(writes) == 1 and "ON CONFLICT" in writes[0]
+        assert not any("FOR UPDATE" in q for q in query_log)
+        assert ("CUSTOM-Seminar-ai workshop-nodate", "CSE", "2024", 1, 1, 1, 0, 0) in rows()
+
+    def test_row_inserted_concurrently_is_merged(self, activities):
+        # Another transaction created the row between this one's snapshot and its write
+        meera = User.query.filter_by(email='meera@college.edu').one()
+        db.session.execute(EventSummary.__table__.insert().values(
+            event_identity="CUSTOM-Seminar-quiz-2024-05-01", department="ECE", batch_year="2024", year=2024,
+            participations=1, unique_students=1, new_students=1, verified_count=1, pending_count=0, rejected_count=0))
+        db.session.add(StudentActivity(student_id=meera.id, title='Quiz', custom_category='Seminar',
+                                       start_date=date(2024, 5, 1), certificate_file='c.pdf', status='pending'))
+        db.session.commit()
+
+        assert [r for r in rows() if r[0] == "CUSTOM-Seminar-quiz-2024-05-01"] == \
+            [("CUSTOM-Seminar-quiz-2024-05-01", "ECE", "2024", 2, 2, 1, 1, 0)]
+
+    def test_rebuild_command(self, app, activities):
+        db.session.execute(EventSummary.__table__.delete())
+        db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=["rebuild-event-summaries"])
+
+        assert result.exit_code == 0
+        assert "6 summary rows (was 0)" in result.output
+
+class TestRollupReads:
+    @pytest.mark.parametrize("filters", [{'year': 2024}, {'year': 2024, 'department': 'CSE'}, {'year': 2024, 'batch': 2025}])
+    def test_same_as_live_query(self, activities, monkeypatch, filters):
+        assert by_title(AnalyticsService._get_event_summary_list(filters)) == by_title(live_summary(monkeypatch, filters))
+
+    @pytest.mark.parametrize("filters", [{}, {'year': 2023}, {'department': 'CSE'}])
+    def test_nodate_event_across_years(self, activities, monkeypatch, filters):
+        # The nodate workshop's year comes from created_at: Asha attended it in 2023 and 2024
+        asha = User.query.filter_by(email='asha@college.edu').one()
+        db.session.add(StudentActivity(student_id=asha.id, title='AI Workshop', custom_category='Seminar',
+                                       certificate_file='c.pdf', status='pending', created_at=datetime(2023, 11, 2)))
+        db.session.commit()
+
+        rollup = by_title(AnalyticsService._get_event_summary_list(filters))
+        assert rollup == by_title(live_summary(monkeypatch, filters))
+        nodate = [e for e in rollup if e["Event Date"] != date(2024, 3, 1)]
+        assert [e["Unique Students"] for e in nodate] == [1]
+
+    def test_reads_only_the_rollup(self, activities, query_log):
+        AnalyticsService._get_event_summary_list({'year': 2024})
+
+        assert len(query_log) == 1
+        assert "FROM event_summaries" in query_log[0]
+        assert "student_activities" not in query_log[0]
+
+    def test_other_filters_use_live_query(self, activities):
+        assert AnalyticsService._can_use_event_summaries({'year': 2024, 'department': None, 'verified_only': False})
+        assert not AnalyticsService._can_use_event_summaries({'verified_only': True})
+        assert not AnalyticsService._can_use_event_summaries({'event_identity': 'TYPE-1-2024-03-01'})
@@ -0,0 +1,59 @@
+import hashlib
+import json
+import pytest
+from app.models import ExtractionCache
+from app.services.verification import extraction_cache
+from app.services.verification.text_extractor import TextExtractor
+from app.services.verification.url_validator import URLValidator
+from app.services.verification.verification_service import VerificationService
+
+CERT_TEXT = "Certificate of Completion awarded to Asha Rao Certificate ID: ABC12345 verify at https://issuer.example.com/c/ABC12345"
+
+def sha(s):
+    return hashlib.sha256(s.encode()).hexdigest()
+
+@pytest.fixture
+def extract_calls(monkeypatch):
+    calls = []
+    def fake_extract(path, **kwargs):
+        calls.append(path)
+        return CERT_TEXT
+    monkeypatch.setattr(TextExtractor, "extract_from_file", staticmethod(fake_extract))
+    monkeypatch.setattr(URLValidator, "check_urls", staticmethod(
+        lambda urls, names, ids, **kwargs: [{"url": u, "reachable": False, "status_code": None, "name_match": False, "id_match": False, "error": "offline"} for u in urls]
+    ))
+    return calls
+
+def stage_status(result, name):
+    stages = json.loads(result["auto_details"])["stages"]
+    return next(s for s in stages if s["stage"] == name)
+
+def test_second_verify_reuses_extraction(app, extract_calls):
+    first = VerificationService().verify("a.pdf", file_hash=sha("a"))
+    second = VerificationService().verify("a-copy.pdf", file_hash=sha("a"))
+
+    assert extract_calls == ["a.pdf"]
+    assert ExtractionCache.query.count() == 1
+    assert stage_status(second, "extract_text")["reason"] == "extraction cache hit"
+    for key in ("cert_text", "urls", "ids", "candidate_names"):
+        assert second[key] == first[key]
+
+def test_extractor_version_bump_invalidates(app, extract_calls, monkeypatch):
+    VerificationService().verify("a.pdf", file_hash=sha("a"))
+    monkeypatch.setattr(extraction_cache, "EXTRACTOR_VERSION", "test-next")
+    VerificationService().verify("a.pdf", file_hash=sha("a"))
+
+    assert len(extract_calls) == 2
+    assert ExtractionCache.query.count() == 2
+
+def test_no_hash_skips_cache(app, extract_calls):
+    result = VerificationService().verify("a.pdf")
+
+    assert stage_status(result, "load_extraction")["status"] == "skipped"
+    assert ExtractionCache.query.count() == 0
+
+def test_duplicate_store_is_ignored(app):
+    extraction_cache.store(sha("a"), {"cert_text": "x"})
+    extraction_cache.store(sha("a"), {"cert_text": "y"})
+
+    assert extraction_cache.load(sha("a")) == {"cert_text": "x"}
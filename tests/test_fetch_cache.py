@@ -0,0 +1,143 @@
+import pytest
+from app.services.verification import fetch_cache, host_health
+from app.services.verification.fetch_cache import FetchCache, normalize_url, compact_text
+from app.services.verification.url_validator import URLValidator
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestNormalizeURL:
+    def test_equivalent_urls_share_a_key(self):
+        """Scheme/host case, punctuation and tracking params do not matter."""
+        variants = [
+            "https://NPTEL.ac.in/verify?id=NPTEL23CS01&utm_source=mail",
+            "HTTPS://nptel.ac.in:443/verify?id=NPTEL23CS01.",
+            "https://nptel.ac.in/verify?fbclid=abc&id=NPTEL23CS01#top",
+        ]
+        keys = {normalize_url(v) for v in variants}
+        assert keys == {"https://nptel.ac.in/verify?id=NPTEL23CS01"}
+
+    def test_certificate_id_params_are_kept(self):
+        """Issuers pass the certificate ID in params like ref; those make distinct keys."""
+        assert normalize_url("https://x.org/verify?ref=CERT123") != normalize_url("https://x.org/verify?ref=CERT456")
+        assert normalize_url("https://x.org/verify?ref_src=CERT123") == "https://x.org/verify?ref_src=CERT123"
+
+    def test_www_gets_scheme_and_path_kept(self):
+        assert normalize_url("www.Coursera.org/verify/ABC123") == "https://www.coursera.org/verify/ABC123"
+
+    def test_path_case_is_preserved(self):
+        """Certificate IDs in paths are case sensitive."""
+        assert normalize_url("https://x.org/Cert/AbC") != normalize_url("https://x.org/cert/abc")
+
+    def test_compact_text(self):
+        assert compact_text("Asha\n\n   RAO\tCERT") == "asha rao cert"
+
+class TestFetchCache:
+    def test_lru_eviction(self):
+        cache = FetchCache(max_entries=2, ttl=60)
+        cache.put("a", 200, "a")
+        cache.put("b", 200, "b")
+        cache.get("a")            # a is now most recent
+        cache.put("c", 200, "c")  # evicts b
+
+        assert cache.get("b") is None
+        assert cache.get("a")["text"] == "a"
+        assert cache.stats()["evictions"] == 1
+
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = FetchCache(ttl=60, clock=clock)
+        cache.put("a", 200, "page")
+
+        clock.now += 59
+        assert cache.get("a") is not None
+        clock.now += 2
+        assert cache.get("a") is None
+
+    def test_disk_tier_shared_between_instances(self, tmp_path):
+        """A second process (new instance) reads entries from disk."""
+        FetchCache(disk_dir=str(tmp_path)).put("https://x.org/", 200, "asha rao")
+
+        other = FetchCache(disk_dir=str(tmp_path))
+        entry = other.get("https://x.org/")
+        assert entry["text"] == "asha rao"
+        assert other.stats()["disk_hits"] == 1
+
+    def test_counters(self):
+        cache = FetchCache()
+        cache.get("missing")
+        cache.put("k", 404, "")
+        cache.get("k")
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+class TestURLValidatorUsesCache:
+    @pytest.mark.parametrize("status_code, fetches", [(404, 1), (503, 2), (429, 2)])
+    def test_transient_errors_are_not_cached(self, monkeypatch, status_code, fetches):
+        calls = []
+
+        class FakeResponse:
+            encoding = "utf-8"
+            headers = {"Content-Type": "text/html"}
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                pass
+
+        FakeResponse.status_code = status_code
+
+        class FakeSession:
+            def get(self, url, **kwargs):
+                calls.append(url)
+                return FakeResponse()
+
+        monkeypatch.setattr(fetch_cache, "_cache", FetchCache())
+        monkeypatch.setattr("app.services.verification.url_validator.get_session", lambda: FakeSession())
+
+        monkeypatch.setattr(host_health, "_health", host_health.HostHealth())
+
+        for _ in range(2):
+            assert not URLValidator.check_url_with_text("https://issuer.org/c?id=1", ["Asha Rao"], [])["reachable"]
+
+        assert len(calls) == fetches
+
+    def test_repeat_check_skips_network(self, monkeypatch):
+        calls = []
+
+        class FakeResponse:
+            status_code = 200
+            encoding = "utf-8"
+            headers = {"Content-Type": "text/html; charset=utf-8"}
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                pass
+
+            def iter_content(self, chunk_size):
+                yield b"<p>Certificate of Asha Rao</p><p>CERT-2024-000123</p>"
+
+        class FakeSession:
+            def get(self, url, **kwargs):
+                calls.append(url)
+                return FakeResponse()
+
+        monkeypatch.setattr(fetch_cache, "_cache", FetchCache())
+        monkeypatch.setattr("app.services.verification.url_validator.get_session", lambda: FakeSession())
+
+        first = URLValidator.check_url_with_text("https://issuer.org/c?id=1", ["Asha Rao"], ["CERT-2024-000123"])
+        second = URLValidator.check_url_with_text("https://ISSUER.org/c?id=1&utm_source=x.", ["Asha Rao"], [])
+
+        assert len(calls) == 1
+        assert first["name_match"] and first["id_match"]
+        assert second["name_match"] and second["reachable"]
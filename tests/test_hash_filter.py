@@ -0,0 +1,125 @@
+import hashlib
+import json
+import pytest
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import event
+from app.models import db, User, StudentActivity
+from app.verification import hashstore
+from app.verification.hash_filter import DigestSet, get_hash_membership, to_digest
+from app.services.verification.verification_service import VerificationService
+
+def sha(s):
+    return hashlib.sha256(s.encode()).hexdigest()
+
+@pytest.fixture
+def query_log(app):
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
+
+@pytest.fixture
+def stored(app):
+    student = User(email='s@college.edu', password_hash='x', full_name='Asha Rao')
+    db.session.add(student)
+    db.session.commit()
+    db.session.add_all([
+        StudentActivity(student_id=student.id, title='A', certificate_file='a.pdf', certificate_hash=sha('a'), status='faculty_verified'),
+        StudentActivity(student_id=student.id, title='B', certificate_file='b.pdf', certificate_hash=sha('b'), status='rejected'),
+    ])
+    db.session.commit()
+    return student
+
+class TestDigestSet:
+    def test_sorted_insert_and_lookup(self):
+        digests = [to_digest(sha(str(i))) for i in range(200)]
+        s = DigestSet(digests[:100])
+        for d in digests[100:]:
+            s.add(d)
+        s.add(digests[0])  # duplicate
+
+        assert len(s) == 200
+        assert all(d in s for d in digests)
+        assert to_digest(sha("unknown")) not in s
+
+class TestHashMembership:
+    def test_unknown_hash_skips_db(self, stored, query_log):
+        get_hash_membership().load()
+        query_log.clear()
+
+        assert hashstore.lookup_hash(sha('never-seen')) is None
+        assert hashstore.find_rejected_by_hash(sha('never-seen')) is None
+        assert query_log == []
+        assert get_hash_membership().stats()["db_skipped"] == 2
+
+    def test_misses_after_uploads_skip_db(self, stored, query_log):
+        get_hash_membership().load()
+        db.session.add(StudentActivity(student_id=stored.id, title='C', certificate_file='c.pdf',
+                                       certificate_hash=sha('c'), status='pending'))
+        db.session.commit()
+        query_log.clear()
+
+        for name in ('d', 'e'):
+            assert hashstore.lookup_hash(sha(name)) is None
+        assert query_log == []
+
+    def test_due_version_check_is_not_counted_as_skipped(self, stored, query_log, monkeypatch):
+        get_hash_membership().load()
+        monkeypatch.setitem(current_app.config, "HASH_FILTER_VERSION_CHECK_SECONDS", 0)
+        query_log.clear()
+
+        assert hashstore.lookup_hash(sha('never-seen')) is None
+        # Version unchanged: one indexed max, no refresh scan
+        assert len(query_log) == 1 and "max(student_activities.updated_at)" in query_log[0]
+        assert get_hash_membership().stats()["db_skipped"] == 0
+        assert get_hash_membership().stats()["db_synced"] == 1
+
+    def test_other_process_approval_is_seen_after_version_check(self, stored, monkeypatch):
+        get_hash_membership().load()
+        # Written by another process: this process's filter is not told
+        db.session.execute(StudentActivity.__table__.update()
+                           .where(StudentActivity.title == 'B')
+                           .values(status='faculty_verified', updated_at=datetime.utcnow() + timedelta(seconds=1)))
+        db.session.commit()
+        assert hashstore.lookup_hash(sha('b')) is None
+
+        monkeypatch.setitem(current_app.config, "HASH_FILTER_VERSION_CHECK_SECONDS", 0)
+        record = hashstore.lookup_hash(sha('b'))
+        assert record is not None and record.title == 'B'
+
+    def test_known_hash_is_confirmed_against_db(self, stored, query_log):
+        get_hash_membership().load()
+        query_log.clear()
+
+        record = hashstore.lookup_hash(sha('a'))
+        assert record is not None and record.title == 'A'
+        assert len(query_log) == 1
+
+    def test_false_positive_is_caught_by_db(self, stored):
+        """A hash approved and later rejected stays in the verified set, but the DB says no."""
+        get_hash_membership().load()
+        act = StudentActivity.query.filter_by(title='A').one()
+        act.status = 'rejected'
+        db.session.commit()
+
+        assert get_hash_membership().might_be_verified(sha('a')) is True
+        assert hashstore.lookup_hash(sha('a')) is None
+
+    def test_approve_updates_filter(self, stored):
+        get_hash_membership().load()
+        hashstore.store_approved_hash(sha('c'), roll_no=None, filename='c.pdf', request_id=3, faculty_comment='')
+        assert get_hash_membership().might_be_verified(sha('c'))
+
+    def test_rejected_file_is_fast_flagged(self, stored, monkeypatch):
+        from app.services.verification.text_extractor import TextExtractor
+        monkeypatch.setattr(TextExtractor, "extract_from_file", staticmethod(lambda p, **kwargs: pytest.fail("should not extract")))
+
+        result = VerificationService().verify("b-again.pdf", file_hash=sha('b'))
+
+        assert result["rejected_hash_match"] is True
+        assert result["strong_auto"] is False
+        assert result["verification_mode"] == "rejected_hash_match"
+        assert json.loads(result["auto_details"])["rejected_match_activity_id"]
@@ -31,3 +31,28 @@ class TestHashValidator:
         # implementation currently returns None for FileNotFoundError
         result = HashValidator.compute_hash("non_existent_file_12345.txt")
         assert result is None
+
+    def test_save_and_hash_single_pass(self, tmp_path):
+        """Upload stream is written and hashed in one pass."""
+        import io
+        from app.verification import hashstore
+
+        content = b"%PDF-1.7\n" + os.urandom(3 * 1024 * 1024)
+        target = tmp_path / "upload.pdf"
+
+        digest = hashstore.save_and_hash(io.BytesIO(content), str(target), header_check=lambda h: h.startswith(b"%PDF"))
+
+        assert digest == hashlib.sha256(content).hexdigest()
+        assert target.read_bytes() == content
+        assert HashValidator.compute_hash(str(target)) == digest
+
+    def test_save_and_hash_rejects_bad_signature(self, tmp_path):
+        """Nothing is written when the signature check fails."""
+        import io
+        from app.verification import hashstore
+
+        target = tmp_path / "upload.pdf"
+        digest = hashstore.save_and_hash(io.BytesIO(b"MZ\x90\x00 not a pdf"), str(target), header_check=lambda h: h.startswith(b"%PDF"))
+
+        assert digest is None
+        assert not target.exists()
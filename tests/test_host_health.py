@@ -0,0 +1,214 @@
+import re
+import os
+import socket
+import pytest
+import requests
+from werkzeug.security import generate_password_hash
+from app.models import db, User
+from app.services.verification import host_health
+from app.services.verification.host_health import (
+    HostHealth, HostUnavailable, CIRCUIT_OPEN_ERROR, DNS_CACHED_ERROR,
+    OPEN, HALF_OPEN, CLOSED, is_dns_failure, read_snapshots
+)
+from app.services.verification.budget import VerificationBudget, BudgetExhausted
+from app.services.verification.url_validator import URLValidator
+from tests.test_url_validator import ChunkedResponse
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def health(clock):
+    return HostHealth(failure_threshold=3, cooldown=60, dns_ttl=300, clock=clock)
+
+def dns_error():
+    try:
+        raise socket.gaierror(-2, "Name or service not known")
+    except socket.gaierror as e:
+        try:
+            raise requests.ConnectionError("Failed to resolve 'nope.example'") from e
+        except requests.ConnectionError as wrapped:
+            return wrapped
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold_failures(self, health):
+        for _ in range(2):
+            health.acquire("issuer.org")
+            health.record_failure("issuer.org", "timeout")
+        health.acquire("issuer.org")  # still closed below the threshold
+        health.record_failure("issuer.org", "timeout")
+
+        with pytest.raises(HostUnavailable, match=CIRCUIT_OPEN_ERROR):
+            health.acquire("issuer.org")
+        assert health.snapshot()["issuer.org"]["state"] == OPEN
+        assert health.snapshot()["issuer.org"]["retry_in"] == 60
+
+    def test_success_resets_failure_count(self, health):
+        health.record_failure("issuer.org", "timeout")
+        health.record_failure("issuer.org", "timeout")
+        health.record_success("issuer.org")
+        health.record_failure("issuer.org", "timeout")
+        health.acquire("issuer.org")
+        assert health.snapshot()["issuer.org"]["state"] == CLOSED
+
+    def test_half_open_lets_one_probe_through(self, health, clock):
+        for _ in range(3):
+            health.record_failure("issuer.org", "timeout")
+        clock.now += 61
+
+        health.acquire("issuer.org")  # the probe
+        assert health.snapshot()["issuer.org"]["state"] == HALF_OPEN
+        with pytest.raises(HostUnavailable):
+            health.acquire("issuer.org")
+
+        health.record_success("issuer.org")
+        health.acquire("issuer.org")
+        assert health.snapshot()["issuer.org"]["state"] == CLOSED
+
+    def test_released_probe_lets_the_next_request_probe(self, health, clock):
+        for _ in range(3):
+            health.record_failure("issuer.org", "timeout")
+        clock.now += 61
+
+        assert health.acquire("issuer.org") is True
+        health.release("issuer.org")
+
+        assert health.acquire("issuer.org") is True
+        assert health.snapshot()["issuer.org"]["state"] == HALF_OPEN
+        health.record_success("issuer.org")
+        assert health.acquire("issuer.org") is False
+
+    def test_failed_probe_reopens(self, health, clock):
+        for _ in range(3):
+            health.record_failure("issuer.org", "timeout")
+        clock.now += 61
+        health.acquire("issuer.org")
+        health.record_failure("issuer.org", "timeout")
+
+        with pytest.raises(HostUnavailable, match=CIRCUIT_OPEN_ERROR):
+            health.acquire("issuer.org")
+        assert health.snapshot()["issuer.org"]["retry_in"] == 60
+
+    def test_hosts_are_independent(self, health):
+        for _ in range(3):
+            health.record_failure("down.org", "timeout")
+        health.acquire("up.org")
+
+    def test_dns_failure_is_cached(self, health, clock):
+        err = dns_error()
+        assert is_dns_failure(err)
+        assert not is_dns_failure(requests.ConnectTimeout("timed out"))
+
+        health.record_failure("nope.example", str(err), dns=True)
+        with pytest.raises(HostUnavailable, match=re.escape(DNS_CACHED_ERROR)):
+            health.acquire("nope.example")
+        clock.now += 301
+        health.acquire("nope.example")
+
+class TestLinkChecks:
+    @pytest.fixture(autouse=True)
+    def fresh_state(self, monkeypatch):
+        from app.services.verification import fetch_cache
+        monkeypatch.setattr(fetch_cache, "_cache", fetch_cache.FetchCache())
+        monkeypatch.setattr(host_health, "_health", HostHealth(failure_threshold=2, cooldown=60))
+
+    def serve(self, monkeypatch, handler):
+        calls = []
+        class FakeSession:
+            def get(self, url, **kwargs):
+                calls.append(url)
+                return handler(url)
+        monkeypatch.setattr("app.services.verification.url_validator.get_session", lambda: FakeSession())
+        return calls
+
+    def test_open_circuit_skips_requests(self, monkeypatch):
+        def handler(url):
+            raise requests.ConnectTimeout("connect timed out")
+        calls = self.serve(monkeypatch, handler)
+
+        for i in range(2):
+            res = URLValidator.check_url_with_text(f"https://slow.org/{i}", ["Asha Rao"], [])
+            assert res["reachable"] is False
+        res = URLValidator.check_url_with_text("https://slow.org/2", ["Asha Rao"], [])
+
+        assert res["error"] == CIRCUIT_OPEN_ERROR
+        assert len(calls) == 2
+
+    def test_probe_cut_short_by_budget_is_released(self, monkeypatch):
+        health = host_health.get_host_health()
+        for _ in range(2):
+            health.record_failure("slow.org", "timeout")
+        health._hosts["slow.org"]["opened_at"] -= 61
+        def handler(url):
+            raise requests.ReadTimeout("read timed out")
+        self.serve(monkeypatch, handler)
+
+        # The probe's timeout was cut short by the budget: neither a success nor a failure
+        with pytest.raises(BudgetExhausted):
+            URLValidator.check_url_with_text("https://slow.org/a", ["Asha Rao"], [],
+                                             budget=VerificationBudget(2, min_slice=0.1))
+        assert health.snapshot()["slow.org"]["state"] == HALF_OPEN
+        assert health.snapshot()["slow.org"]["failures"] == 2
+
+        self.serve(monkeypatch, lambda url: ChunkedResponse([b"<p>Asha Rao</p>"]))
+        assert URLValidator.check_url_with_text("https://slow.org/b", ["Asha Rao"], [])["name_match"] is True
+        assert health.snapshot()["slow.org"]["state"] == CLOSED
+
+    def test_server_errors_count_as_failures(self, monkeypatch):
+        calls = self.serve(monkeypatch, lambda url: ChunkedResponse([b""], status_code=503))
+
+        for i in range(3):
+            URLValidator.check_url_with_text(f"https://broken.org/{i}", [], [])
+
+        assert len(calls) == 2
+        assert host_health.get_host_health().snapshot()["broken.org"]["last_error"] == "HTTP 503"
+
+    def test_dns_failure_is_not_retried(self, monkeypatch):
+        def handler(url):
+            raise dns_error()
+        calls = self.serve(monkeypatch, handler)
+
+        URLValidator.check_url_with_text("https://nope.example/a", [], [])
+        res = URLValidator.check_url_with_text("https://nope.example/b", [], [])
+
+        assert res["error"] == DNS_CACHED_ERROR
+        assert len(calls) == 1
+
+class TestPublishedSnapshots:
+    def test_round_trip_and_dead_pids_removed(self, health, tmp_path):
+        health.record_failure("issuer.org", "timeout")
+        health.publish(str(tmp_path))
+        (tmp_path / "hosts-0.json").write_text('{"pid": 0, "hosts": {}}')
+
+        snapshots = read_snapshots(str(tmp_path))
+
+        assert [s["pid"] for s in snapshots] == [os.getpid()]
+        assert snapshots[0]["hosts"]["issuer.org"]["consecutive_failures"] == 1
+        assert not (tmp_path / "hosts-0.json").exists()
+
+    def test_admin_endpoint(self, app, monkeypatch, tmp_path):
+        monkeypatch.setitem(app.config, "VERIFICATION_HOST_HEALTH_DIR", str(tmp_path))
+        health = HostHealth(failure_threshold=1)
+        health.record_failure("down.org", "timeout")
+        monkeypatch.setattr(host_health, "_health", health)
+
+        admin = User(email="admin@example.org", password_hash=generate_password_hash("x"),
+                     role="admin", full_name="Admin")
+        db.session.add(admin)
+        db.session.commit()
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["_user_id"] = str(admin.id)
+
+        data = client.get("/admin/verification/hosts").get_json()
+
+        assert data["unhealthy_hosts"] == ["down.org"]
+        assert data["processes"][0]["pid"] == os.getpid()
@@ -0,0 +1,98 @@
+import os
+import json
+import pytest
+from werkzeug.security import generate_password_hash
+from app.models import db, User
+from app.services.verification import metrics, fetch_cache, host_health
+from app.services.verification.metrics import Histogram, PipelineMetrics, summarize
+from app.services.verification.verification_service import VerificationService
+from app.services.verification.url_validator import URLValidator
+from tests.test_url_validator import ChunkedResponse
+from tests.test_verification_pipeline import certificate, QR_URL
+
+@pytest.fixture
+def fresh_metrics(monkeypatch):
+    fresh = PipelineMetrics()
+    monkeypatch.setattr(metrics, "_metrics", fresh)
+    monkeypatch.setattr(metrics, "_metrics_pid", os.getpid())
+    return fresh
+
+class TestHistogram:
+    def test_quantiles_within_one_bucket(self):
+        h = Histogram()
+        for ms in range(1, 1001):
+            h.record(ms)
+
+        summary = h.summary()
+        assert summary["count"] == 1000
+        assert 500 <= summary["p50_ms"] <= 500 * 1.19
+        assert 950 <= summary["p95_ms"] <= 1000
+        assert 990 <= summary["p99_ms"] <= 1000
+        assert summary["max_ms"] == 1000
+
+    def test_merge_adds_counts(self):
+        fast, slow = PipelineMetrics(), PipelineMetrics()
+        for _ in range(90):
+            fast.record("extract_text", 10)
+        for _ in range(10):
+            slow.record("extract_text", 5000)
+
+        stats = summarize([fast.to_dict(), slow.to_dict()])["extract_text"]
+
+        assert stats["count"] == 100
+        assert stats["p50_ms"] <= 12
+        assert stats["p95_ms"] == 5000
+
+class TestVerificationTimings:
+    def test_stages_are_timed_and_sized(self, certificate, fresh_metrics):
+        result = VerificationService().verify("cert.png")
+        details = json.loads(result["auto_details"])
+
+        stages = {s["stage"]: s for s in details["stages"]}
+        assert all("ms" in s for s in details["stages"] if s["status"] == "ran")
+        assert stages["parse"]["sizes"]["urls"] == 2
+        assert stages["check_qr_links"]["sizes"]["urls"] == 1
+        assert details["timings"]["total_ms"] >= details["timings"]["decision_ms"]
+
+        recorded = summarize([fresh_metrics.to_dict()])
+        assert {"extract_text", "parse", "check_qr_links", "decision", "total"} <= set(recorded)
+        assert "hash_lookup" not in recorded  # skipped stages are not timed
+
+    def test_url_checks_report_time_and_bytes(self, monkeypatch):
+        monkeypatch.setattr(fetch_cache, "_cache", fetch_cache.FetchCache())
+        monkeypatch.setattr(host_health, "_health", host_health.HostHealth())
+        class FakeSession:
+            def get(self, url, **kwargs):
+                return ChunkedResponse([b"x" * 100, b"Asha Rao"])
+        monkeypatch.setattr("app.services.verification.url_validator.get_session", lambda: FakeSession())
+
+        first = URLValidator.check_url_with_text(QR_URL, ["Asha Rao"], [])
+        second = URLValidator.check_url_with_text(QR_URL, ["Asha Rao"], [])
+
+        assert first["bytes"] == 108 and first["cached"] is False
+        assert first["ms"] >= 0
+        assert second["cached"] is True and second["bytes"] == 0
+
+class TestTimingsEndpoint:
+    def test_merges_published_processes(self, app, fresh_metrics, monkeypatch, tmp_path):
+        monkeypatch.setitem(app.config, "VERIFICATION_METRICS_DIR", str(tmp_path))
+        fresh_metrics.record("extract_text", 20)
+        worker = PipelineMetrics()
+        worker.record("extract_text", 40)
+        # As published by another live process (the test runner's parent)
+        (tmp_path / "metrics-1.json").write_text(
+            json.dumps({"pid": os.getppid(), "histograms": worker.to_dict()}))
+
+        admin = User(email="admin@example.org", password_hash=generate_password_hash("x"),
+                     role="admin", full_name="Admin")
+        db.session.add(admin)
+        db.session.commit()
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess["_user_id"] = str(admin.id)
+
+        data = client.get("/admin/verification/timings").get_json()
+
+        assert data["processes"] == 2
+        assert data["stages"]["extract_text"]["count"] == 2
+        assert data["stages"]["extract_text"]["max_ms"] == 40
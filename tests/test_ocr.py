@@ -0,0 +1,84 @@
+import time
+import cv2
+import numpy as np
+import pytest
+from app.services.verification import ocr
+from app.services.verification.text_extractor import TextExtractor
+
+@pytest.fixture
+def engine(monkeypatch):
+    """Pretend tesseract is installed; recognition echoes the image height (pool workers are forked with the fake)."""
+    calls = []
+    def fake_recognize(img, timeout, lang):
+        calls.append(img)
+        return f"h={img.shape[0]}"
+    monkeypatch.setattr(ocr, "_available", True)
+    monkeypatch.setattr(ocr, "_recognize", fake_recognize)
+    yield calls
+    ocr.shutdown_pool()
+
+def test_preprocess_downscales_and_binarizes():
+    img = np.random.default_rng(0).integers(0, 256, (6000, 4000, 3), dtype=np.uint8)
+    out = ocr.preprocess(img, target_dpi=100)
+
+    assert out.ndim == 2
+    assert max(out.shape) == int(100 * ocr.A4_LONG_EDGE_INCHES)
+    assert set(np.unique(out)) <= {0, 255}
+
+def test_preprocess_never_upscales():
+    assert ocr.preprocess(np.zeros((200, 100), np.uint8), target_dpi=300).shape == (200, 100)
+
+def test_batch_keeps_order_and_uses_pool(engine):
+    images = [np.full((h, 50), 200, np.uint8) for h in (10, 20, 30, 40)]
+
+    assert ocr.ocr_batch(images) == ["h=10", "h=20", "h=30", "h=40"]
+    # Recognized in the worker processes, not here
+    assert engine == []
+
+def test_timeout_and_errors_yield_empty_text(monkeypatch, engine):
+    def slow_or_broken(img, timeout, lang):
+        if img.shape[0] == 1:
+            raise RuntimeError("tesseract crashed")
+        time.sleep(0.5)
+        return "late"
+    monkeypatch.setattr(ocr, "_recognize", slow_or_broken)
+
+    assert ocr.ocr_batch([np.zeros((1, 5), np.uint8), np.zeros((2, 5), np.uint8)], timeout=0.1) == ["", ""]
+
+def test_stuck_recognition_is_killed(monkeypatch, engine):
+    def stuck(img, timeout, lang):
+        if img.shape[0] == 1:
+            time.sleep(60)  # like tesserocr, ignores the timeout
+        return "ok"
+    monkeypatch.setattr(ocr, "_recognize", stuck)
+    pool = ocr._get_pool(2, 'eng')
+    workers = list(pool._pool)
+
+    started = time.monotonic()
+    assert ocr.ocr_batch([np.zeros((1, 5), np.uint8)], timeout=0.2) == [""]
+    assert time.monotonic() - started < 5
+    assert ocr._pool is None
+    for worker in workers:
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+
+    assert ocr.ocr_batch([np.zeros((2, 5), np.uint8)]) == ["ok"]
+
+def test_in_process_when_daemonic(monkeypatch, engine):
+    monkeypatch.setattr(ocr.multiprocessing.current_process(), "daemon", True, raising=False)
+
+    assert ocr.ocr_batch([np.zeros((3, 5), np.uint8)]) == ["h=3"]
+    assert len(engine) == 1 and ocr._pool is None
+
+def test_unavailable_ocr_returns_no_placeholder(tmp_path, monkeypatch):
+    monkeypatch.setattr(ocr, "_available", False)
+    path = str(tmp_path / "cert.png")
+    cv2.imwrite(path, np.full((50, 50), 255, np.uint8))
+
+    assert TextExtractor.extract_from_file(path) == ""
+
+def test_text_extractor_ocrs_images(tmp_path, engine):
+    path = str(tmp_path / "cert.jpg")
+    cv2.imwrite(path, np.full((64, 48), 255, np.uint8))
+
+    assert TextExtractor.extract_from_file(path) == "h=64"
@@ -0,0 +1,55 @@
+import random
+import string
+import pytest
+from app.services.verification.pattern_matcher import MultiPatternMatcher, CertificateMatcher
+
+PAGE = "certificate of completion awarded to asha rao. id: nptel24cs101s3345 issued by nptel"
+
+class TestMultiPatternMatcher:
+    @pytest.mark.parametrize("threshold", [1, 10_000])
+    def test_reports_all_occurring_patterns(self, threshold):
+        """Automaton and substring modes agree, including overlapping patterns."""
+        patterns = ["asha", "rao", "nptel24cs101s3345", "cs101", "s3345", "missing-id", "he", "she", "hers"]
+        matcher = MultiPatternMatcher(patterns, automaton_min_patterns=threshold)
+        assert matcher.uses_automaton is (threshold == 1)
+
+        found = matcher.find_all(PAGE + " ushers")
+        assert found == {"asha", "rao", "nptel24cs101s3345", "cs101", "s3345", "he", "she", "hers"}
+
+    @pytest.mark.parametrize("threshold", [1, 10_000])
+    def test_streaming_across_chunks(self, threshold):
+        matcher = MultiPatternMatcher(["nptel24cs101s3345"], automaton_min_patterns=threshold)
+        stream = matcher.stream()
+        for i in range(0, len(PAGE), 7):
+            stream.feed(PAGE[i:i + 7])
+        assert stream.found == {"nptel24cs101s3345"}
+
+    def test_modes_agree_on_random_text(self):
+        rng = random.Random(7)
+        text = "".join(rng.choice("abcd ") for _ in range(5000))
+        patterns = ["".join(rng.choice("abcd") for _ in range(rng.randint(2, 6))) for _ in range(200)]
+
+        automaton = MultiPatternMatcher(patterns, automaton_min_patterns=1).find_all(text)
+        substring = MultiPatternMatcher(patterns, automaton_min_patterns=10_000).find_all(text)
+        assert automaton == substring == {p for p in patterns if p in text}
+
+class TestCertificateMatcher:
+    def test_name_needs_all_parts(self):
+        matcher = CertificateMatcher(["Asha Rao", "Ravi Kumar"], [])
+        scan = matcher.match(PAGE)
+        assert scan.name_match is True
+
+        scan = CertificateMatcher(["Ravi Rao"], []).match(PAGE)
+        assert scan.name_match is False
+
+    def test_short_ids_ignored(self):
+        scan = CertificateMatcher([], ["NPTEL", "NPTEL24CS101S3345"]).match(PAGE)
+        assert scan.id_match is True
+        assert "nptel" not in scan.found
+
+    def test_done_when_everything_found(self):
+        scan = CertificateMatcher(["Asha Rao"], ["NPTEL24CS101S3345"]).scan()
+        scan.feed("asha rao")
+        assert not scan.done
+        scan.feed(" nptel24cs101s3345")
+        assert scan.done
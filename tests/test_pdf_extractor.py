@@ -0,0 +1,47 @@
+import pytest
+from app.services.verification import pdf_extractor
+from app.services.verification.pdf_extractor import select_pages
+from app.services.verification.text_extractor import TextExtractor
+from tests.pdf_factory import write_pdf
+
+@pytest.fixture
+def long_pdf(tmp_path):
+    return write_pdf(tmp_path / "transcript.pdf", [f"Page {i + 1} of transcript" for i in range(20)])
+
+class TestSelectPages:
+    def test_short_document_is_read_whole(self):
+        assert select_pages(5, 8, 2) == [0, 1, 2, 3, 4]
+
+    def test_long_document_keeps_head_and_tail(self):
+        assert select_pages(20, 5, 2) == [0, 1, 2, 18, 19]
+
+    def test_zero_means_no_cap(self):
+        assert select_pages(30, 0, 2) == list(range(30))
+
+class TestExtractText:
+    def test_page_cap_and_timings(self, long_pdf):
+        timings = []
+        text = pdf_extractor.extract_text(long_pdf, timings, max_pages=4, tail_pages=1, workers=1)
+
+        assert text.split("\n") == ["Page 1 of transcript", "Page 2 of transcript",
+                                    "Page 3 of transcript", "Page 20 of transcript"]
+        assert [t["page"] for t in timings] == [1, 2, 3, 20]
+        assert all(t["ms"] >= 0 and t["chars"] > 0 for t in timings)
+
+    def test_process_pool_matches_serial(self, long_pdf):
+        serial = pdf_extractor.extract_text(long_pdf, max_pages=0, workers=1)
+        timings = []
+        try:
+            parallel = pdf_extractor.extract_text(long_pdf, timings, max_pages=0, parallel_min_pages=4, workers=3)
+        finally:
+            pdf_extractor.shutdown_pool()
+
+        assert parallel == serial
+        assert [t["page"] for t in timings] == list(range(1, 21))
+
+    def test_text_extractor_uses_page_bounded_engine(self, tmp_path):
+        path = write_pdf(tmp_path / "cert.pdf", ["Asha Rao", "ID ABC123XYZ9"])
+        timings = []
+
+        assert TextExtractor.extract_from_file(path, page_timings=timings) == "Asha Rao\nID ABC123XYZ9"
+        assert len(timings) == 2
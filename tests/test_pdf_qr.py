@@ -0,0 +1,32 @@
+import cv2
+import numpy as np
+import pytest
+from app.services.verification import pdf_extractor
+from app.services.verification.qr_extractor import QRExtractor
+from tests.pdf_factory import write_pdf
+
+QR_URL = "https://verify.issuer.org/c/ABC123XYZ9"
+
+def qr_image(value, scale=4):
+    img = cv2.QRCodeEncoder.create().encode(value)
+    img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST)
+    return cv2.copyMakeBorder(img, 16, 16, 16, 16, cv2.BORDER_CONSTANT, value=255)
+
+@pytest.mark.parametrize("encoding", ["flate", "jpeg", "bits"])
+def test_qr_decoded_from_embedded_image(tmp_path, encoding):
+    path = write_pdf(tmp_path / "cert.pdf", ["Certificate"], images={0: [qr_image(QR_URL)]}, encoding=encoding)
+
+    assert QRExtractor.supports(path)
+    assert QRExtractor.extract(path) == [QR_URL]
+
+def test_small_images_and_late_pages_are_not_scanned(tmp_path):
+    logo = np.full((32, 32), 128, dtype=np.uint8)
+    path = write_pdf(tmp_path / "cert.pdf", ["Certificate", "Details", "Annexure"],
+                     images={0: [logo], 2: [qr_image(QR_URL)]})
+
+    assert list(pdf_extractor.iter_images(path, max_pages=2, min_size=64)) == []
+    assert [page for page, _ in pdf_extractor.iter_images(path, max_pages=3, min_size=64)] == [3]
+
+def test_pdf_without_images(tmp_path):
+    path = write_pdf(tmp_path / "cert.pdf", ["Certificate"])
+    assert QRExtractor.extract(path) == []
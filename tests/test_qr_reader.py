@@ -0,0 +1,62 @@
+import threading
+import cv2
+import numpy as np
+from app.verification.qr_reader import decode_qr_image, extract_qr_data, get_detector
+
+QR_URL = "https://verify.issuer.org/c/ABC123XYZ9"
+
+def photo(module, corner="bottom-right", size=(1500, 2000)):
+    """Noisy grayscale 'photo' with a QR code of the given module size near a corner (or centred)."""
+    rng = np.random.default_rng(0)
+    img = (np.full(size, 230, np.float32) + rng.normal(0, 8, size)).clip(0, 255).astype(np.uint8)
+    code = cv2.resize(cv2.QRCodeEncoder.create().encode(QR_URL), None, fx=module, fy=module,
+                      interpolation=cv2.INTER_NEAREST)
+    if corner == "centre":
+        y, x = (size[0] - code.shape[0]) // 2, (size[1] - code.shape[1]) // 2
+    else:
+        y = 60 if corner.startswith("top") else size[0] - code.shape[0] - 60
+        x = 60 if corner.endswith("left") else size[1] - code.shape[1] - 60
+    img[y:y + code.shape[0], x:x + code.shape[1]] = code
+    return img
+
+def test_large_code_decodes_on_downscaled_pass():
+    attempts = []
+    assert decode_qr_image(photo(12), attempts, fast_max_side=1000) == [QR_URL]
+    assert [a["pass"] for a in attempts] == ["downscaled"]
+
+def test_small_code_falls_back_to_corner_roi():
+    attempts = []
+    assert decode_qr_image(photo(3, "top-left"), attempts, fast_max_side=500) == [QR_URL]
+    assert attempts[0] == {"pass": "downscaled", "ms": attempts[0]["ms"], "found": 0}
+    assert attempts[-1]["pass"] == "roi:top-left" and attempts[-1]["found"] == 1
+
+def test_centred_code_falls_back_to_full_pass():
+    # 264 px wide: larger than the corners' overlap, so no corner holds all of it
+    attempts = []
+    assert decode_qr_image(photo(8, "centre"), attempts, fast_max_side=500, roi_fraction=0.55) == [QR_URL]
+    assert [a["pass"] for a in attempts] == ["downscaled", "roi:top-left", "roi:top-right",
+                                             "roi:bottom-left", "roi:bottom-right", "full"]
+
+def test_small_image_is_decoded_once():
+    attempts = []
+    assert decode_qr_image(np.full((300, 300), 255, np.uint8), attempts, fast_max_side=1000) == []
+    assert len(attempts) == 1
+
+def test_detector_reused_per_thread():
+    first = get_detector()
+    assert get_detector() is first
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(get_detector()))
+    t.start()
+    t.join()
+    assert other[0] is not first
+
+def test_extract_qr_data_from_file(tmp_path):
+    path = str(tmp_path / "cert.png")
+    cv2.imwrite(path, photo(8))
+    attempts = []
+
+    assert extract_qr_data(path, attempts) == [QR_URL]
+    assert attempts
+    assert extract_qr_data(str(tmp_path / "missing.png")) == []
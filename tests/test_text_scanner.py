@@ -0,0 +1,46 @@
+from app.services.verification import text_scanner
+from app.services.verification.text_extractor import TextExtractor
+
+CERT = """Certificate of Completion
+This is to certify that
+ASHA RAO
+has completed Introduction To Databases
+Certificate ID: UC-9f8e7d6c5b
+Verify at https://www.udemy.com/certificate/UC-9f8e7d6c5b/
+Instructor Ravi Kumar Sharma
+Professor Of Computer Science
+"""
+
+def test_scan_finds_urls_ids_and_names_together():
+    result = text_scanner.scan(CERT)
+
+    assert result.urls == ["https://www.udemy.com/certificate/UC-9f8e7d6c5b/"]
+    assert result.ids[0] == "UC-9f8e7d6c5b"
+    assert result.ids.count("UC-9f8e7d6c5b") == 1
+    assert result.names == ["ASHA RAO", "Instructor Ravi Kumar Sharma"]
+
+def test_ids_ranked_label_then_mixed_then_words():
+    result = text_scanner.scan("Participation award 2023ABCDEF99\nRoll No: CSE2021000123")
+    assert result.ids == ["CSE2021000123", "2023ABCDEF99", "Participation"]
+
+def test_ids_inside_urls_are_found():
+    assert text_scanner.scan("https://nptel.ac.in/noc/NOC23CS1234567").ids == ["NOC23CS1234567"]
+
+def test_blocklist_matches_whole_words_only():
+    # "Sofia" contains OF and "Mathew" contains THE; neither is a blocked word
+    assert text_scanner.scan("Sofia Mathew").names == ["Sofia Mathew"]
+    assert text_scanner.scan("University Of Mumbai").names == []
+
+def test_names_capped_and_scan_continues_after_cap():
+    text = "Asha Rao\nRavi Kumar\nMeera Nair\nJohn Doe\nID ABCDEF123456"
+    result = text_scanner.scan(text)
+    assert result.names == ["Asha Rao", "Ravi Kumar", "Meera Nair"]
+    assert result.ids == ["ABCDEF123456"]
+
+def test_clean_lines_keeps_line_structure():
+    assert text_scanner.clean_lines("  Asha\x00 Rao \r\n\n\tID 12​34  ") == "Asha Rao\nID 1234"
+
+def test_text_extractor_wrappers():
+    parsed = TextExtractor.extract_urls_and_ids(CERT)
+    assert parsed["urls"] == text_scanner.scan(CERT).urls
+    assert TextExtractor.guess_candidate_names(CERT)[0] == "ASHA RAO"
@@ -0,0 +1,147 @@
+import time
+import threading
+import pytest
+from app.services.verification.url_validator import URLValidator
+
+class TestConcurrentLinkChecks:
+    def test_results_keep_input_order(self, monkeypatch):
+        """Slow first URL must still come back first."""
+        delays = {"https://a.example/1": 0.2, "https://b.example/2": 0.0, "https://c.example/3": 0.1}
+
+        def fake_check(url, names, ids, matcher=None, **kwargs):
+            time.sleep(delays[url])
+            return {"url": url, "reachable": True, "name_match": False, "id_match": False}
+
+        monkeypatch.setattr(URLValidator, "check_url_with_text", staticmethod(fake_check))
+        results = URLValidator.check_urls(list(delays), [], [], max_workers=3, per_host=2)
+
+        assert [r["url"] for r in results] == list(delays)
+
+    def test_wall_clock_is_slowest_not_sum(self, monkeypatch):
+        """Six slow URLs on different hosts run in parallel."""
+        def fake_check(url, names, ids, matcher=None, **kwargs):
+            time.sleep(0.2)
+            return {"url": url}
+
+        monkeypatch.setattr(URLValidator, "check_url_with_text", staticmethod(fake_check))
+        urls = [f"https://host{i}.example/cert" for i in range(6)]
+
+        started = time.monotonic()
+        URLValidator.check_urls(urls, [], [], max_workers=6, per_host=2)
+        assert time.monotonic() - started < 0.6
+
+    @pytest.mark.parametrize("per_host", [2, 1])
+    def test_per_host_cap(self, monkeypatch, per_host):
+        """No more than per_host requests hit the same host at once, whatever limit the host saw first."""
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def fake_check(url, names, ids, matcher=None, **kwargs):
+            with lock:
+                in_flight.append(url)
+                peak.append(len(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.remove(url)
+            return {"url": url}
+
+        monkeypatch.setattr(URLValidator, "check_url_with_text", staticmethod(fake_check))
+        urls = [f"https://percap.example/cert/{i}" for i in range(6)]
+        URLValidator.check_urls(urls, [], [], max_workers=6, per_host=per_host)
+
+        assert max(peak) <= per_host
+
+class TestPooledSession:
+    def test_session_is_shared_and_pooled(self):
+        """Every link checker in the process gets the same pooled session."""
+        from app.services.verification import http_client
+        from config import Config
+
+        http_client.reset_session()
+        session = http_client.get_session()
+
+        assert http_client.get_session() is session
+        adapter = session.get_adapter('https://onlinecourses.nptel.ac.in/')
+        assert adapter._pool_connections == Config.VERIFICATION_HTTP_POOL_HOSTS
+        assert adapter._pool_maxsize == Config.VERIFICATION_HTTP_POOL_MAXSIZE
+        http_client.reset_session()
+
+class ChunkedResponse:
+    """Streaming response stand-in that records how many chunks were pulled."""
+    def __init__(self, chunks, content_type="text/html; charset=utf-8", status_code=200):
+        self.chunks = chunks
+        self.pulled = 0
+        self.status_code = status_code
+        self.encoding = "utf-8"
+        self.headers = {"Content-Type": content_type}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            self.pulled += 1
+            yield chunk
+
+class TestStreamingFetch:
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        from app.services.verification import fetch_cache
+        monkeypatch.setattr(fetch_cache, "_cache", fetch_cache.FetchCache())
+
+    def serve(self, monkeypatch, response):
+        class FakeSession:
+            def get(self, url, **kwargs):
+                assert kwargs.get("stream") is True
+                return response
+        monkeypatch.setattr("app.services.verification.url_validator.get_session", lambda: FakeSession())
+
+    def test_stops_once_name_and_id_found(self, monkeypatch):
+        resp = ChunkedResponse([b"Asha Rao ", b"CERT-2024-000123 ", b"x" * 1000, b"y" * 1000])
+        self.serve(monkeypatch, resp)
+
+        res = URLValidator.check_url_with_text("https://issuer.org/a", ["Asha Rao"], ["CERT-2024-000123"])
+
+        assert res["name_match"] and res["id_match"]
+        assert resp.pulled == 2  # stops right after the chunk that completed the match
+
+    def test_match_across_chunk_boundary(self, monkeypatch):
+        self.serve(monkeypatch, ChunkedResponse([b"... CERT-2024-00", b"0123 ..."]))
+
+        res = URLValidator.check_url_with_text("https://issuer.org/b", [], ["CERT-2024-000123"])
+        assert res["id_match"]
+
+    def test_binary_content_is_not_downloaded(self, monkeypatch):
+        resp = ChunkedResponse([b"%PDF-1.7 ..."], content_type="application/pdf")
+        self.serve(monkeypatch, resp)
+
+        res = URLValidator.check_url_with_text("https://issuer.org/c.pdf", ["Asha Rao"], [])
+        assert res["reachable"] is True
+        assert resp.pulled == 0
+
+    def test_byte_cap(self, monkeypatch):
+        monkeypatch.setattr("config.Config.VERIFICATION_FETCH_MAX_BYTES", 64 * 1024)
+        resp = ChunkedResponse([b"z" * 16 * 1024] * 100 + [b"Asha Rao"])
+        self.serve(monkeypatch, resp)
+
+        res = URLValidator.check_url_with_text("https://issuer.org/huge", ["Asha Rao"], [])
+        assert res["name_match"] is False
+        assert resp.pulled == 4
+
+    def test_truncated_text_is_cached_incomplete(self, monkeypatch):
+        """Text past VERIFICATION_FETCH_CACHE_MAX_TEXT is not cached, so the entry cannot answer alone."""
+        from app.services.verification.fetch_cache import get_fetch_cache, normalize_url
+        monkeypatch.setattr("config.Config.VERIFICATION_FETCH_CACHE_MAX_TEXT", 1000)
+        self.serve(monkeypatch, ChunkedResponse([b"x" * 2000, b" Asha Rao"]))
+
+        assert not URLValidator.check_url_with_text("https://issuer.org/long", ["Ravi Kumar"], [])["name_match"]
+        assert get_fetch_cache().get(normalize_url("https://issuer.org/long"))["complete"] is False
+
+        # Asha Rao is past the cached text: the page is fetched again rather than answered "no match"
+        self.serve(monkeypatch, ChunkedResponse([b"x" * 2000, b" Asha Rao"]))
+        again = URLValidator.check_url_with_text("https://issuer.org/long", ["Asha Rao"], [])
+        assert again["name_match"] and again["cached"] is False
@@ -0,0 +1,74 @@
+import json
+import pytest
+from app.models import db, User, StudentActivity
+from app.services.verification.verification_service import VerificationService
+from app.services.verification.text_extractor import TextExtractor
+from app.services.verification.qr_extractor import QRExtractor
+from app.services.verification.url_validator import URLValidator
+
+QR_URL = "https://verify.issuer.org/c/ABC123XYZ9"
+TEXT_URL = "https://issuer.org/about"
+
+@pytest.fixture
+def certificate(monkeypatch):
+    """A PNG certificate with one text URL and one QR URL; records link checks."""
+    checked = []
+    text = f"Certificate awarded to Asha Rao. Visit {TEXT_URL} ID ABC123XYZ9"
+    monkeypatch.setattr(TextExtractor, "extract_from_file", staticmethod(lambda path, **kwargs: text))
+    monkeypatch.setattr(QRExtractor, "extract", staticmethod(lambda path, **kwargs: [QR_URL]))
+
+    def fake_check_urls(urls, names, ids, **kwargs):
+        checked.append(list(urls))
+        return [{"url": u, "reachable": True, "status_code": 200,
+                 "name_match": u == QR_URL, "id_match": False, "error": None} for u in urls]
+
+    monkeypatch.setattr(URLValidator, "check_urls", staticmethod(fake_check_urls))
+    return checked
+
+class TestVerificationPipeline:
+    def test_strong_qr_link_skips_text_urls(self, certificate):
+        result = VerificationService().verify("cert.png")
+        details = json.loads(result["auto_details"])
+
+        assert certificate == [[QR_URL]]
+        assert result["verification_mode"] == "qr+link"
+        assert result["urls"] == [TEXT_URL, QR_URL]
+        assert [lc["url"] for lc in result["link_checks"]] == [QR_URL]
+        assert details["skipped_urls"] == [TEXT_URL]
+
+        stages = {s["stage"]: s for s in details["stages"]}
+        assert stages["check_text_links"]["status"] == "skipped"
+        assert stages["check_text_links"]["reason"] == "strong QR link match"
+        assert stages["hash_lookup"]["reason"] == "no file hash"
+
+    def test_weak_qr_link_checks_remaining_urls(self, certificate, monkeypatch):
+        monkeypatch.setattr(QRExtractor, "extract", staticmethod(lambda path, **kwargs: ["https://other.org/x"]))
+        result = VerificationService().verify("cert.png")
+
+        assert certificate == [["https://other.org/x"], [TEXT_URL]]
+        # link_checks keep urls_for_check order: text URLs first, then QR
+        assert [lc["url"] for lc in result["link_checks"]] == [TEXT_URL, "https://other.org/x"]
+
+    def test_stored_hash_short_circuits_everything(self, app, monkeypatch):
+        student = User(email='s@college.edu', password_hash='x', full_name='Asha Rao')
+        db.session.add(student)
+        db.session.commit()
+        db.session.add(StudentActivity(student_id=student.id, title='NPTEL', certificate_file='a.pdf',
+                                       certificate_hash='f' * 64, status='faculty_verified',
+                                       urls_json=json.dumps([QR_URL]), ids_json=json.dumps(["ABC123XYZ9"])))
+        db.session.commit()
+
+        def must_not_run(*args, **kwargs):
+            raise AssertionError("extraction should have been skipped")
+        monkeypatch.setattr(TextExtractor, "extract_from_file", staticmethod(must_not_run))
+
+        result = VerificationService().verify("copy.pdf", file_hash='f' * 64)
+        details = json.loads(result["auto_details"])
+
+        assert result["strong_auto"] is True
+        assert result["hash_match"] is True
+        assert result["verification_mode"] == "hash_match"
+        assert all(s["status"] == "skipped" for s in details["stages"][1:])
+        # Shown on the faculty review page, copied from the matched activity
+        assert result["urls"] == [QR_URL]
+        assert result["ids"] == ["ABC123XYZ9"]
@@ -0,0 +1,143 @@
+import json
+import pytest
+from datetime import datetime, timedelta
+from app.models import db, User, ActivityType, StudentActivity, VerificationJob
+from app.verification import queue
+from tests.conftest import SqliteTestConfig
+
+@pytest.fixture
+def activity(app):
+    student = User(email='s@college.edu', password_hash='x', role='student', full_name='Asha Rao', department='CSE')
+    hod = User(email='hod@college.edu', password_hash='x', role='faculty', position='hod', full_name='HOD', department='CSE')
+    db.session.add_all([student, hod])
+    db.session.commit()
+    act = StudentActivity(student_id=student.id, title='Workshop', certificate_file='c.pdf',
+                          certificate_hash='abc', status='verifying')
+    db.session.add(act)
+    db.session.commit()
+    return act
+
+def fake_verification(strong):
+    return {
+        "cert_text": "",
+        "urls": ["https://issuer.example/cert/1"],
+        "ids": ["CERT-1234567"],
+        "candidate_names": [],
+        "link_checks": [],
+        "strong_auto": strong,
+        "auto_decision": "reason",
+        "verification_mode": "link_only" if strong else "text_only",
+        "auto_details": json.dumps({"reason": "reason"})
+    }
+
+class TestVerificationQueue:
+    def test_claim_is_exclusive(self, app, activity):
+        """A job can only be claimed by one worker."""
+        queue.enqueue(activity, '/tmp/c.pdf')
+        db.session.commit()
+
+        job = queue.claim_next('worker-a')
+        assert job is not None
+        assert job.status == 'running'
+        assert job.attempts == 1
+        assert queue.claim_next('worker-b') is None
+
+    def test_process_job_writes_back_result(self, app, activity, monkeypatch):
+        """Strong result marks the activity auto_verified with a token."""
+        monkeypatch.setattr(
+            'app.services.verification.verification_service.VerificationService.verify',
+            lambda self, path, **kwargs: fake_verification(True)
+        )
+        queue.enqueue(activity, '/tmp/c.pdf')
+        db.session.commit()
+
+        queue.run_worker(app, once=True)
+
+        act = db.session.get(StudentActivity, activity.id)
+        assert act.status == 'auto_verified'
+        assert act.verification_mode == 'link_only'
+        assert act.verification_token
+        assert json.loads(act.urls_json) == ["https://issuer.example/cert/1"]
+        assert VerificationJob.query.one().status == 'done'
+
+    def test_process_job_routes_pending_to_hod(self, app, activity, monkeypatch):
+        """Weak result leaves the activity pending and assigns the HOD."""
+        monkeypatch.setattr(
+            'app.services.verification.verification_service.VerificationService.verify',
+            lambda self, path, **kwargs: fake_verification(False)
+        )
+        queue.enqueue(activity, '/tmp/c.pdf')
+        db.session.commit()
+
+        queue.run_worker(app, once=True)
+
+        act = db.session.get(StudentActivity, activity.id)
+        hod = User.query.filter_by(position='hod').one()
+        assert act.status == 'pending'
+        assert act.assigned_reviewer_id == hod.id
+
+    def test_failed_job_falls_back_to_faculty_review(self, app, activity, monkeypatch):
+        """After the last attempt the activity is handed to faculty."""
+        def boom(self, path, **kwargs):
+            raise RuntimeError("parser crashed")
+        monkeypatch.setattr(
+            'app.services.verification.verification_service.VerificationService.verify', boom
+        )
+        queue.enqueue(activity, '/tmp/c.pdf')
+        db.session.commit()
+
+        queue.run_worker(app, once=True)
+
+        job = VerificationJob.query.one()
+        act = db.session.get(StudentActivity, activity.id)
+        assert job.status == 'failed'
+        assert job.attempts == SqliteTestConfig.VERIFICATION_JOB_MAX_ATTEMPTS
+        assert "parser crashed" in job.last_error
+        assert act.status == 'pending'
+
+    def test_running_job_cannot_be_claimed(self, app, activity):
+        """A job being processed is not taken over, even with the attempts it was read with."""
+        job = queue.enqueue(activity, '/tmp/c.pdf')
+        db.session.commit()
+        attempts = job.attempts
+
+        assert queue.claim(job.id, attempts, 'worker-a') is not None
+        assert queue.claim(job.id, attempts, 'worker-b') is None
+
+    def test_inline_failure_goes_to_faculty_review(self, app, activity, monkeypatch):
+        """Inline mode claims the job and does not requeue it on failure."""
+        def boom(self, path, **kwargs):
+            raise RuntimeError("parser crashed")
+        monkeypatch.setattr(
+            'app.services.verification.verification_service.VerificationService.verify', boom
+        )
+        job = queue.enqueue(activity, '/tmp/c.pdf')
+        db.session.commit()
+
+        queue.run_inline(job)
+
+        job = VerificationJob.query.one()
+        act = db.session.get(StudentActivity, activity.id)
+        assert job.status == 'failed'
+        assert job.attempts == 1
+        assert act.status == 'pending'
+        assert queue.claim_next('worker-a') is None
+
+    def test_worker_dying_on_last_attempt_goes_to_faculty_review(self, app, activity):
+        """A stale running job with no attempts left is failed, not left running."""
+        job = queue.enqueue(activity, '/tmp/c.pdf')
+        job.status = 'running'
+        job.attempts = SqliteTestConfig.VERIFICATION_JOB_MAX_ATTEMPTS
+        job.locked_by = 'dead-worker'
+        job.locked_at = datetime.utcnow() - timedelta(seconds=SqliteTestConfig.VERIFICATION_JOB_STALE_SECONDS + 1)
+        db.session.commit()
+
+        assert queue.claim_next('worker-a') is None
+
+        job = VerificationJob.query.one()
+        act = db.session.get(StudentActivity, activity.id)
+        hod = User.query.filter_by(position='hod').one()
+        assert job.status == 'failed'
+        assert act.status == 'pending'
+        assert act.assigned_reviewer_id == hod.id
+        assert queue.fail_abandoned() == 0